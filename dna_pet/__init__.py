@@ -0,0 +1 @@
+"""펫고객관리시스템 데이터 처리 패키지 (Streamlit 없이 import 가능)"""
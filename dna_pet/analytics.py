@@ -0,0 +1,401 @@
+"""펫 고객 분석 구조 (카테고리 역색인, 배치 추천, 빈도 그룹 순위, 수익 예측, 재고 계획)"""
+import numpy as np
+import pandas as pd
+
+from dna_pet.data import (
+    PREMIUM_SPEND_THRESHOLD, find_extract, rank_pet_recommendations, read_extract, related_product_list,
+)
+
+# === 펫 카테고리 역색인 (카테고리별 가구 비트맵) ===
+def pet_category_labels(pet_categories):
+    """pet_categories 조합 문자열에 나오는 개별 카테고리 목록 (정렬, 비트 위치 순서)"""
+    combos = pd.Categorical(pet_categories).categories
+    return sorted({item for combo in combos for item in combo.split(', ')})
+
+def encode_pet_categories(pet_categories, labels):
+    """pet_categories 조합 문자열 → 가구별 카테고리 비트마스크 (labels 의 순서가 비트 위치)"""
+    if len(labels) > 64:
+        raise ValueError(f"펫 카테고리가 너무 많습니다 ({len(labels)}개, 최대 64개)")
+    # 조합별 비트마스크를 한 번 계산한 뒤 가구에 전개 (마지막 항목은 결측 코드 -1 용)
+    categories = pd.Categorical(pet_categories)
+    mask_dtype = next(t for t in (np.uint8, np.uint16, np.uint32, np.uint64)
+                      if np.iinfo(t).bits >= max(len(labels), 1))
+    position = {label: bit for bit, label in enumerate(labels)}
+    combo_masks = [sum(1 << position[item] for item in set(combo.split(', '))) for combo in categories.categories]
+    return np.array(combo_masks + [0], dtype=mask_dtype)[categories.codes]
+
+class PetCategoryIndex:
+    """pet_categories 문자열을 한 번만 파싱한 멀티핫 비트셋과 카테고리 → 가구 역색인
+
+    카테고리 조건 조회는 카테고리별 비트맵(np.packbits)의 AND/OR 로 처리한다.
+    """
+
+    def __init__(self, pet_categories, household_keys):
+        labels = pet_category_labels(pet_categories)
+        self._set_masks(labels, encode_pet_categories(pet_categories, labels), household_keys)
+
+    @classmethod
+    def from_masks(cls, labels, masks, household_keys):
+        """사전 계산된 가구별 비트마스크(빌드 산출물)로 색인 생성"""
+        index = cls.__new__(cls)
+        index._set_masks(labels, masks, household_keys)
+        return index
+
+    def _set_masks(self, labels, masks, household_keys):
+        self.labels = list(labels)
+        self.household_keys = np.asarray(household_keys)
+        self.size = len(self.household_keys)
+        self.masks = masks
+        mask_dtype = masks.dtype.type
+        self.bitmaps = {
+            label: np.packbits(((masks >> mask_dtype(bit)) & 1).astype(bool))
+            for bit, label in enumerate(self.labels)
+        }
+
+    def _to_mask(self, bitmap):
+        return np.unpackbits(bitmap, count=self.size).astype(bool)
+
+    def match_all(self, labels):
+        """모든 카테고리를 구매한 가구 여부 (행 단위 불리언 배열, 빈 조건이면 전체 True)"""
+        if not labels:
+            return np.ones(self.size, dtype=bool)
+        return self._to_mask(np.bitwise_and.reduce([self.bitmaps[label] for label in labels]))
+
+    def match_any(self, labels):
+        """하나 이상의 카테고리를 구매한 가구 여부 (빈 조건이면 전체 False)"""
+        if not labels:
+            return np.zeros(self.size, dtype=bool)
+        return self._to_mask(np.bitwise_or.reduce([self.bitmaps[label] for label in labels]))
+
+    def households(self, label):
+        """카테고리를 구매한 가구 ID 목록"""
+        return self.household_keys[self._to_mask(self.bitmaps[label])]
+
+    def counts(self):
+        """카테고리별 구매 가구 수"""
+        return pd.Series({label: int(np.unpackbits(bitmap, count=self.size).sum())
+                          for label, bitmap in self.bitmaps.items()})
+
+# === 배치 추천 (카테고리 조합별로 한 번만 계산한 추천 결과표) ===
+def pet_recommendation_sets(unique_masks, labels, top_k=6):
+    """카테고리 비트마스크 조합별 함께 구매 펫 추천 제품"""
+    return [
+        tuple(rank_pet_recommendations([label for bit, label in enumerate(labels) if int(mask) >> bit & 1], top_k))
+        for mask in unique_masks
+    ]
+
+def related_product_codes(masks, labels, total_spend):
+    """가구별 연관 제품 조합 코드 (고지출 여부 * 2 + 강아지 카테고리 구매 여부)"""
+    dog_bits = sum(1 << bit for bit, label in enumerate(labels) if label.startswith('DOG-'))
+    has_dog = (masks & masks.dtype.type(dog_bits)) != 0
+    is_premium = np.asarray(total_spend, dtype=np.float64) > PREMIUM_SPEND_THRESHOLD
+    return is_premium.astype(np.int8) * 2 + has_dog.astype(np.int8)
+
+RELATED_PRODUCT_SETS = [tuple(related_product_list(bool(code & 2), bool(code & 1))) for code in range(4)]
+
+class RecommendationTable:
+    """전체 가구의 함께 구매 펫 추천 / 연관 제품 추천 결과표
+
+    추천 결과는 구매 카테고리 조합(비트셋)과 고지출/강아지 여부에만 의존하므로,
+    고유 조합별로 한 번만 순위를 계산하고 가구에는 조합 코드만 저장한다.
+    """
+
+    def __init__(self, category_index, total_spend, top_k=6):
+        self.household_keys = category_index.household_keys
+        unique_masks, self.pet_codes = np.unique(category_index.masks, return_inverse=True)
+        self.pet_sets = pet_recommendation_sets(unique_masks, category_index.labels, top_k)
+        self.related_codes = related_product_codes(category_index.masks, category_index.labels, total_spend)
+        self.related_sets = RELATED_PRODUCT_SETS
+
+    @classmethod
+    def from_codes(cls, household_keys, pet_sets, pet_codes, related_codes):
+        """사전 계산된 조합 코드(빌드 산출물)로 결과표 생성"""
+        table = cls.__new__(cls)
+        table.household_keys = np.asarray(household_keys)
+        table.pet_sets = [tuple(product_set) for product_set in pet_sets]
+        table.pet_codes = pet_codes
+        table.related_codes = related_codes
+        table.related_sets = RELATED_PRODUCT_SETS
+        return table
+
+    def pet_recommendations(self, position):
+        """행 위치의 펫 추천 제품 목록"""
+        return list(self.pet_sets[self.pet_codes[position]])
+
+    def related_products(self, position):
+        """행 위치의 연관 제품 목록"""
+        return list(self.related_sets[self.related_codes[position]])
+
+    def to_frame(self, kind='pet'):
+        """전체 가구 추천 결과를 (household_key, rank, product) 형식으로 전개 (일괄 발송용)"""
+        sets, codes = (self.pet_sets, self.pet_codes) if kind == 'pet' else (self.related_sets, self.related_codes)
+        products = sorted({product for product_set in sets for product in product_set})
+        width = max((len(product_set) for product_set in sets), default=0)
+        table = np.full((len(sets), width), -1, dtype=np.int32)
+        for i, product_set in enumerate(sets):
+            table[i, :len(product_set)] = [products.index(product) for product in product_set]
+
+        per_row = table[codes]
+        valid = per_row >= 0
+        return pd.DataFrame({
+            'household_key': np.repeat(self.household_keys, valid.sum(axis=1)),
+            'rank': np.tile(np.arange(1, width + 1), len(codes))[valid.ravel()],
+            'product': pd.Categorical.from_codes(per_row[valid], products),
+        })
+
+# === 동일 빈도 그룹 내 순위 (그룹별 정렬 배열과 요약 통계를 한 번만 계산) ===
+# (컬럼, 제목, 값 표시 형식)
+FREQUENCY_COMPARISON_METRICS = [
+    ('pet_spend', "**📈 펫 지출 분포**", "£{:.2f}"),
+    ('total_spend', "**💰 총 지출 분포**", "£{:.2f}"),
+    ('pet_ratio', "**📊 펫 지출 비율 분포**", "{:.2f}%"),
+]
+
+class FrequencyGroupRanking:
+    """구매 빈도 그룹별 지표 정렬 배열 (순위/백분위는 이진 탐색으로 조회)
+
+    지표마다 (빈도 코드, 값) 순으로 한 번 정렬해 그룹이 연속 구간이 되도록 하고,
+    그룹 경계 오프셋과 describe() 와 같은 요약 통계를 함께 보관한다.
+    """
+
+    def __init__(self, pet_customers, metrics=('pet_spend', 'total_spend', 'pet_ratio')):
+        frequency = pd.Categorical(pet_customers['frequency_category'])
+        codes = frequency.codes
+        self._group_code = {label: code for code, label in enumerate(frequency.categories)}
+        offsets = np.zeros(len(frequency.categories) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes[codes >= 0], minlength=len(frequency.categories)), out=offsets[1:])
+        self._offsets = offsets
+        self._sorted = {}
+        self._stats = {}
+        valid = codes >= 0
+        for metric in metrics:
+            values = pet_customers[metric].to_numpy(dtype=np.float64)[valid]
+            ordered = values[np.lexsort((values, codes[valid]))]
+            self._sorted[metric] = ordered
+            self._stats[metric] = {
+                label: self._describe(ordered[offsets[code]:offsets[code + 1]])
+                for label, code in self._group_code.items()
+            }
+
+    @staticmethod
+    def _describe(group):
+        # 정렬 시 NaN 은 그룹 끝에 모이므로 앞부분만 통계에 사용 (describe() 와 동일하게 결측 제외)
+        group = group[:len(group) - np.count_nonzero(np.isnan(group))]
+        if len(group) == 0:
+            return pd.Series({'count': 0.0}, dtype=np.float64)
+        return pd.Series({
+            'count': float(len(group)),
+            'mean': group.mean(),
+            'std': group.std(ddof=1) if len(group) > 1 else np.nan,
+            'min': group[0],
+            '25%': np.percentile(group, 25),
+            '50%': np.percentile(group, 50),
+            '75%': np.percentile(group, 75),
+            'max': group[-1],
+        })
+
+    def _group(self, frequency, metric):
+        code = self._group_code[frequency]
+        return self._sorted[metric][self._offsets[code]:self._offsets[code + 1]]
+
+    def group_size(self, frequency):
+        """빈도 그룹의 고객 수"""
+        code = self._group_code.get(frequency)
+        return 0 if code is None else int(self._offsets[code + 1] - self._offsets[code])
+
+    def rank(self, frequency, metric, value):
+        """그룹 내 순위 (값이 더 작은 고객 수 + 1)"""
+        return int(np.searchsorted(self._group(frequency, metric), value, side='left')) + 1
+
+    def percentile(self, frequency, metric, value):
+        """그룹 내 백분위 (값이 더 작은 고객 비율, %)"""
+        size = self.group_size(frequency)
+        return (self.rank(frequency, metric, value) - 1) / size * 100 if size else 0.0
+
+    def stats(self, frequency, metric):
+        """그룹 내 분포 요약 통계 (describe() 형식)"""
+        return self._stats[metric][frequency]
+
+# === 주기상향 수익 예측 (시나리오 전체를 한 번에 계산하는 몬테카를로 시뮬레이션) ===
+REVENUE_SCENARIOS = [
+    {'name': '주간구매 → 초고빈도', 'freq': '주간구매', 'multiplier': 1.5},
+    {'name': '월간구매 → 저빈도', 'freq': '월간구매', 'multiplier': 1.1},
+    {'name': '고빈도 → 주간구매', 'freq': '고빈도', 'multiplier': 1.3},
+    {'name': '저빈도 → 고빈도', 'freq': '저빈도', 'multiplier': 1.2},
+    {'name': '한달이상 → 월간구매', 'freq': '한달이상', 'multiplier': 1.05},
+    {'name': '초고빈도 VIP 유지', 'freq': '초고빈도', 'multiplier': 1.15}
+]
+REVENUE_FORECAST_DRAWS = 5000
+REVENUE_FORECAST_INTERVAL = 0.9
+# 전환율 불확실성 (베타 분포 집중도, 클수록 슬라이더 값 근처에 모임)
+CONVERSION_RATE_CONCENTRATION = 200
+
+def frequency_spend_stats(pet_customers):
+    """빈도 그룹별 총 지출 고객 수/평균/표준편차"""
+    return pet_customers.groupby('frequency_category', observed=True)['total_spend'].agg(['size', 'mean', 'std'])
+
+def combine_spend_stats(parts):
+    """가구 샤드별 frequency_spend_stats 결과를 전체 그룹 통계로 합침 (샤드 간 평균 차이를 분산에 반영)"""
+    stats = pd.concat(parts)
+    stats.index = stats.index.astype(object)
+    size = stats['size'].groupby(level=0).sum()
+    mean = (stats['size'] * stats['mean']).groupby(level=0).sum() / size
+    squares = ((stats['size'] - 1) * stats['std'].fillna(0) ** 2
+               + stats['size'] * (stats['mean'] - mean.reindex(stats.index).to_numpy()) ** 2)
+    std = np.sqrt(squares.groupby(level=0).sum() / (size - 1)).where(size > 1)
+    return pd.DataFrame({'size': size, 'mean': mean, 'std': std})
+
+class RevenueForecaster:
+    """주기상향 시나리오별 수익 증가 예측
+
+    빈도 그룹별 고객 수/평균/표준편차를 한 번 집계해 두고, 시뮬레이션마다 전환율(베타 분포),
+    전환 고객 수(이항 분포), 전환 고객의 월 평균 지출(정규 근사, 월마다 독립)을
+    (추출, 시나리오, 월) 배열로 한 번에 뽑는다.
+    """
+
+    def __init__(self, pet_customers, scenarios=REVENUE_SCENARIOS):
+        self._set_groups(frequency_spend_stats(pet_customers), scenarios)
+
+    @classmethod
+    def from_spend_stats(cls, groups, scenarios=REVENUE_SCENARIOS):
+        """사전 집계된 빈도 그룹 통계(빌드 산출물)로 예측기 생성"""
+        forecaster = cls.__new__(cls)
+        forecaster._set_groups(groups, scenarios)
+        return forecaster
+
+    def _set_groups(self, groups, scenarios):
+        groups = groups.reindex([scenario['freq'] for scenario in scenarios])
+        present = (groups['size'].fillna(0) > 0).to_numpy()
+        self.scenarios = [scenario for scenario, ok in zip(scenarios, present) if ok]
+        groups = groups[present]
+        self.sizes = groups['size'].to_numpy(dtype=np.int64)
+        self.mean_spend = groups['mean'].to_numpy(dtype=np.float64)
+        self.std_spend = groups['std'].fillna(0).to_numpy(dtype=np.float64)
+        self.uplift = np.array([scenario['multiplier'] - 1 for scenario in self.scenarios])
+
+    def simulate(self, conversion_rate, target_months, draws=REVENUE_FORECAST_DRAWS, seed=0):
+        """(추출, 시나리오, 월) 누적 수익 증가 배열"""
+        rng = np.random.default_rng(seed)
+        rate = conversion_rate / 100
+        rates = rng.beta(rate * CONVERSION_RATE_CONCENTRATION, (1 - rate) * CONVERSION_RATE_CONCENTRATION,
+                         size=(draws, len(self.scenarios)))
+        converted = rng.binomial(self.sizes, rates)
+        spend_scale = self.std_spend / np.sqrt(np.maximum(converted, 1))
+        monthly_spend = self.mean_spend[:, None] + spend_scale[..., None] * rng.standard_normal(
+            (draws, len(self.scenarios), target_months)
+        )
+        monthly_increase = converted[..., None] * np.maximum(monthly_spend, 0) * self.uplift[:, None]
+        return np.cumsum(monthly_increase, axis=2)
+
+    def forecast(self, conversion_rate, target_months, draws=REVENUE_FORECAST_DRAWS, seed=0):
+        """(시나리오별 점 추정/신뢰구간 표, 월별 누적 총 수익 증가 신뢰구간 표)"""
+        converted = self.sizes * (conversion_rate / 100)
+        monthly_increase = converted * self.mean_spend * self.uplift
+        cumulative = self.simulate(conversion_rate, target_months, draws, seed)
+        tail = (1 - REVENUE_FORECAST_INTERVAL) / 2
+        low, high = np.quantile(cumulative[:, :, -1], [tail, 1 - tail], axis=0)
+        scenario_table = pd.DataFrame({
+            '시나리오': [scenario['name'] for scenario in self.scenarios],
+            '대상 고객': self.sizes,
+            '전환 예상': converted.astype(int),
+            '평균 총 지출(£)': self.mean_spend,
+            '월 예상 수익 증가(£)': monthly_increase,
+            '총 예상 수익 증가(£)': monthly_increase * target_months,
+            '하한(£)': low,
+            '상한(£)': high,
+        })
+        total = cumulative.sum(axis=1)
+        monthly_table = pd.DataFrame(
+            np.quantile(total, [tail, 0.5, 1 - tail], axis=0).T,
+            index=pd.RangeIndex(1, target_months + 1, name='월'),
+            columns=['하한', '중앙값', '상한'],
+        )
+        return scenario_table, monthly_table
+
+# === 재고 재주문 계획 (펫 카테고리 구매 빈도 기반 수요, 제품 전체를 배열 연산으로 계산) ===
+# 샘플 재고 (demand_share: 카테고리 구매 중 해당 제품 비중, lead_time_days: 발주 후 입고까지 일수)
+INVENTORY_SAMPLE_CATALOG = [
+    {"category": "DOG-사료/간식", "product_name": "프리미엄 건식사료 (소형견용)", "current_stock": 85, "min_stock": 50, "max_stock": 200, "unit_price": 45.99, "supplier": "펫푸드코리아", "demand_share": 0.15, "lead_time_days": 7},
+    {"category": "DOG-사료/간식", "product_name": "프리미엄 건식사료 (대형견용)", "current_stock": 45, "min_stock": 60, "max_stock": 250, "unit_price": 89.99, "supplier": "펫푸드코리아", "demand_share": 0.1, "lead_time_days": 7},
+    {"category": "DOG-건강관리/영양제", "product_name": "관절 건강 보조제", "current_stock": 30, "min_stock": 40, "max_stock": 120, "unit_price": 55.99, "supplier": "펫헬스", "demand_share": 0.2, "lead_time_days": 10},
+    {"category": "CAT-사료/간식", "product_name": "동결건조 간식", "current_stock": 25, "min_stock": 50, "max_stock": 150, "unit_price": 22.99, "supplier": "캣케어", "demand_share": 0.15, "lead_time_days": 5},
+    {"category": "CAT-모래/위생용품", "product_name": "응고형 벤토나이트 모래", "current_stock": 200, "min_stock": 150, "max_stock": 400, "unit_price": 15.99, "supplier": "클린캣", "demand_share": 0.3, "lead_time_days": 3},
+    {"category": "CAT-모래/위생용품", "product_name": "무향 두부모래", "current_stock": 140, "min_stock": 100, "max_stock": 300, "unit_price": 18.99, "supplier": "에코캣", "demand_share": 0.2, "lead_time_days": 3},
+]
+INVENTORY_EXTRACT = 'inventory'
+INVENTORY_COLUMNS = ['category', 'product_name', 'current_stock', 'min_stock', 'max_stock',
+                     'unit_price', 'supplier', 'demand_share', 'lead_time_days']
+DEFAULT_LEAD_TIME_DAYS = 7
+INVENTORY_SERVICE_Z = 1.65  # 안전재고 서비스 수준 95%
+
+def generate_inventory_catalog(sku_count, categories, seed=42):
+    """부하 테스트용 재고 목록 생성 (카테고리 내 demand_share 합이 1이 되도록 배분)"""
+    rng = np.random.default_rng(seed)
+    category_codes = rng.integers(0, len(categories), sku_count)
+    weights = rng.gamma(1.0, 1.0, sku_count)
+    demand_share = weights / np.bincount(category_codes, weights=weights, minlength=len(categories))[category_codes]
+    max_stock = rng.integers(100, 500, sku_count)
+    return pd.DataFrame({
+        'category': pd.Categorical.from_codes(category_codes, categories),
+        'product_name': 'SKU-' + pd.Series(np.arange(1, sku_count + 1)).astype(str).str.zfill(6),
+        'current_stock': rng.integers(0, max_stock),
+        'min_stock': (max_stock * 0.25).astype(np.int64),
+        'max_stock': max_stock,
+        'unit_price': rng.uniform(3, 120, sku_count).round(2),
+        'supplier': pd.Categorical.from_codes(rng.integers(0, 5, sku_count), ["펫푸드코리아", "펫헬스", "캣케어", "클린캣", "에코캣"]),
+        'demand_share': demand_share,
+        'lead_time_days': rng.choice([3, 5, 7, 10, 14], sku_count),
+    })
+
+def load_inventory_catalog(data_dir=None, sku_count=None, categories=()):
+    """재고 목록 (data_dir 의 inventory 추출 파일 > 부하 테스트용 생성 > 샘플 순)"""
+    inventory_path = find_extract(data_dir, INVENTORY_EXTRACT) if data_dir else None
+    if inventory_path is not None:
+        catalog = read_extract(inventory_path, INVENTORY_COLUMNS)
+    elif sku_count:
+        return generate_inventory_catalog(sku_count, list(categories))
+    else:
+        catalog = pd.DataFrame(INVENTORY_SAMPLE_CATALOG)
+    # 비중/리드타임이 없는 재고 파일은 카테고리 내 균등 배분, 기본 리드타임 사용
+    if 'demand_share' not in catalog.columns:
+        catalog['demand_share'] = 1 / catalog.groupby('category')['category'].transform('size')
+    if 'lead_time_days' not in catalog.columns:
+        catalog['lead_time_days'] = DEFAULT_LEAD_TIME_DAYS
+    return catalog
+
+def category_daily_demand(category_index, pet_transactions):
+    """펫 카테고리별 일평균 구매 건수 (가구 월 펫 구매 횟수를 구매한 카테고리 수로 나눠 배분)"""
+    category_masks = {label: category_index.match_all([label]) for label in category_index.labels}
+    category_counts = np.zeros(category_index.size, dtype=np.int64)
+    for mask in category_masks.values():
+        category_counts += mask
+    weights = np.asarray(pet_transactions, dtype=np.float64) / np.maximum(category_counts, 1)
+    return pd.Series({label: weights[mask].sum() / 30 for label, mask in category_masks.items()})
+
+def plan_inventory(catalog, category_demand, service_z=INVENTORY_SERVICE_Z):
+    """제품별 일 수요, 안전재고, 재주문점, 재고 일수, 발주 수량, 재고 상태 계산"""
+    plan = catalog.copy()
+    stock = plan['current_stock'].to_numpy(dtype=np.float64)
+    max_stock = plan['max_stock'].to_numpy(dtype=np.float64)
+    lead_time = plan['lead_time_days'].to_numpy(dtype=np.float64)
+    daily_demand = (plan['category'].astype(object).map(category_demand).fillna(0.0).to_numpy(dtype=np.float64)
+                    * plan['demand_share'].to_numpy(dtype=np.float64))
+    # 일 수요를 포아송으로 보고 리드타임 동안의 수요 변동만큼 안전재고 확보
+    safety_stock = service_z * np.sqrt(daily_demand * lead_time)
+    reorder_point = np.maximum(plan['min_stock'].to_numpy(dtype=np.float64),
+                               np.ceil(daily_demand * lead_time + safety_stock))
+    reorder_needed = stock < reorder_point
+
+    plan['daily_demand'] = daily_demand.round(2)
+    plan['safety_stock'] = np.ceil(safety_stock).astype(np.int64)
+    plan['reorder_point'] = reorder_point.astype(np.int64)
+    plan['days_of_cover'] = np.divide(stock, daily_demand, out=np.full_like(stock, np.inf), where=daily_demand > 0).round(1)
+    plan['reorder_needed'] = reorder_needed
+    plan['stockout_risk'] = (stock <= 0) | (plan['days_of_cover'].to_numpy() < lead_time)
+    plan['order_quantity'] = np.where(reorder_needed, np.maximum(max_stock - stock, 0), 0).astype(np.int64)
+    plan['stock_status'] = np.select(
+        [stock <= 0, reorder_needed, stock < max_stock * 0.7],
+        ['⚫ 품절', '🔴 부족', '🟡 보통'], default='🟢 충분'
+    )
+    plan['stock_value'] = stock * plan['unit_price'].to_numpy(dtype=np.float64)
+    return plan
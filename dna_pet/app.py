@@ -0,0 +1,182 @@
+"""대시보드 공통 (세션 간 공유되는 캐시 로더, 페이지 공용 위젯)
+
+데이터셋 캐시 키 dataset_key = (customer_count, data_dir, data_version) 로 호출하는 로더를 모아 두고,
+각 페이지 모듈이 필요한 로더만 호출한다.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from dna_pet.analytics import (
+    REVENUE_FORECAST_DRAWS, FrequencyGroupRanking, PetCategoryIndex, RecommendationTable, RevenueForecaster,
+    category_daily_demand, load_inventory_catalog, plan_inventory,
+)
+from dna_pet.artifacts import open_artifacts
+from dna_pet.data import build_customer_data
+from dna_pet.experiments import ExperimentStore
+from dna_pet.history import MESSAGE_HISTORY_FILE, MessageHistoryStore
+from dna_pet.metrics import METRICS_FILE_ENV, timed
+from dna_pet.pii import PhoneVault
+from dna_pet.query import CustomerQueryEngine, HouseholdIndex
+from dna_pet.sms import MockSmsGateway, SmsDispatcher
+
+@st.cache_resource
+def load_message_store(path=None):
+    """세션 간 공유되는 발송 기록 저장소 (MESSAGE_HISTORY_PATH 로 위치 지정)"""
+    return MessageHistoryStore(path or os.environ.get("MESSAGE_HISTORY_PATH", MESSAGE_HISTORY_FILE))
+
+# 게이트웨이 주소 (SMS_GATEWAY_URL 환경변수, 미지정 시 로컬 모의 게이트웨이 사용)
+# (완료된 작업은 세션과 관계없이 디스패처가 발송 기록 저장소에 바로 저장)
+@st.cache_resource
+def get_sms_dispatcher():
+    gateway_url = os.environ.get("SMS_GATEWAY_URL")
+    if not gateway_url:
+        gateway_url = MockSmsGateway().url
+    return SmsDispatcher(
+        gateway_url,
+        concurrency=int(os.environ.get("SMS_CONCURRENCY", 16)),
+        rate_per_second=float(os.environ.get("SMS_RATE_LIMIT", 200)),
+        on_complete=load_message_store().append,
+    )
+
+@st.cache_resource
+def load_experiment_store(path=None):
+    """발송 기록 저장소와 같은 파일을 쓰는 실험 저장소"""
+    return ExperimentStore(path or load_message_store().path)
+
+# 파생 컬럼까지 계산된 데이터를 데이터셋 버전별로 한 번만 만들어 모든 세션이 공유
+# (cache_resource 는 복사 없이 같은 객체를 반환하므로 페이지에서는 읽기 전용으로만 사용)
+# (data_version 은 캐시 키로만 사용되어 추출 파일이 바뀌면 다시 적재)
+# (사전 계산 산출물 버전이면 계산 없이 산출물만 메모리 맵으로 읽음, python -m dna_pet.build)
+# (원번호 보관소는 발송 경로만 load_phone_vault 로 받고, 페이지는 토큰/마스킹 번호만 있는 표를 씀)
+@st.cache_resource
+@timed()
+def load_customer_sources(customer_count=None, data_dir=None, data_version=None):
+    artifacts = open_artifacts(data_version)
+    if artifacts is not None:
+        return (artifacts.frame('pet_customers'), artifacts.frame('frequency_changes'), artifacts.frame('products'),
+                PhoneVault(artifacts.array('phone_vault')))
+    return build_customer_data(customer_count, data_dir)
+
+def load_customer_data(customer_count=None, data_dir=None, data_version=None):
+    """(pet_customers, frequency_changes, products)"""
+    return load_customer_sources(customer_count, data_dir, data_version)[:3]
+
+def load_phone_vault(customer_count=None, data_dir=None, data_version=None):
+    """발송 작업 등록 시 토큰 → 원번호 조회에 쓰는 PhoneVault (산출물이면 발송 때만 메모리 맵을 읽음)"""
+    return load_customer_sources(customer_count, data_dir, data_version)[3]
+
+@st.cache_resource
+@timed()
+def load_pet_category_index(customer_count=None, data_dir=None, data_version=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    artifacts = open_artifacts(data_version)
+    if artifacts is not None:
+        return PetCategoryIndex.from_masks(
+            artifacts.manifest['labels'], artifacts.array('category_masks'), pet_customers['household_key']
+        )
+    return PetCategoryIndex(pet_customers['pet_categories'], pet_customers['household_key'])
+
+@st.cache_resource
+@timed()
+def load_recommendations(customer_count=None, data_dir=None, data_version=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    artifacts = open_artifacts(data_version)
+    if artifacts is not None:
+        return RecommendationTable.from_codes(
+            pet_customers['household_key'], artifacts.manifest['pet_sets'],
+            artifacts.array('pet_codes'), artifacts.array('related_codes')
+        )
+    category_index = load_pet_category_index(customer_count, data_dir, data_version)
+    return RecommendationTable(category_index, pet_customers['total_spend'])
+
+@st.cache_resource
+@timed()
+def load_frequency_ranking(customer_count=None, data_dir=None, data_version=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    return FrequencyGroupRanking(pet_customers)
+
+# === 대용량 표 페이지 단위 렌더링 (보이는 페이지만 잘라서 포맷 후 전송) ===
+TABLE_PAGE_SIZE = 50
+
+def table_page_selector(total_rows, key, page_size=TABLE_PAGE_SIZE):
+    """페이지 번호 입력 위젯, (선택된 1-기반 페이지, 전체 페이지 수) 반환"""
+    page_count = max(1, -(-total_rows // page_size))
+    page = st.number_input("페이지", min_value=1, max_value=page_count, value=1, key=key)
+    return int(page), page_count
+
+@st.cache_resource
+@timed()
+def load_household_index(customer_count=None, data_dir=None, data_version=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    return HouseholdIndex(pet_customers['household_key'])
+
+def customer_picker(household_index, label, key):
+    """검색형 고객 선택 위젯 (후보는 최대 CUSTOMER_PICKER_LIMIT 명), 선택된 고객의 행 위치 반환"""
+    search_term = st.text_input(f"🔍 {label}", placeholder="고객 ID 앞자리를 입력하세요", key=f"{key}_search")
+    candidates = household_index.search(search_term)
+    if not candidates:
+        st.warning("검색 조건에 맞는 고객이 없습니다.")
+        return None
+    selected_customer_id = st.selectbox(
+        label, candidates, format_func=lambda x: f"고객 {x}", key=key, label_visibility="collapsed"
+    )
+    return household_index.position(selected_customer_id)
+
+@st.cache_resource
+@timed()
+def load_customer_query_engine(customer_count=None, data_dir=None, data_version=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    return CustomerQueryEngine(
+        pet_customers,
+        load_pet_category_index(customer_count, data_dir, data_version),
+        load_household_index(customer_count, data_dir, data_version),
+    )
+
+@st.cache_resource
+@timed()
+def load_revenue_forecaster(customer_count=None, data_dir=None, data_version=None):
+    artifacts = open_artifacts(data_version)
+    if artifacts is not None:
+        return RevenueForecaster.from_spend_stats(
+            artifacts.frame('frequency_spend_stats').set_index('frequency_category')
+        )
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    return RevenueForecaster(pet_customers)
+
+@st.cache_data(max_entries=1024)
+@timed()
+def forecast_revenue(dataset_key, conversion_rate, target_months, draws=REVENUE_FORECAST_DRAWS):
+    """슬라이더 설정별 수익 예측 결과 (설정마다 한 번만 시뮬레이션)"""
+    return load_revenue_forecaster(*dataset_key).forecast(conversion_rate, target_months, draws)
+
+@st.cache_resource
+@timed()
+def load_inventory_plan(customer_count=None, data_dir=None, data_version=None, sku_count=None):
+    pet_customers, _, _ = load_customer_data(customer_count, data_dir, data_version)
+    category_index = load_pet_category_index(customer_count, data_dir, data_version)
+    catalog = load_inventory_catalog(data_dir, sku_count, category_index.labels)
+    return plan_inventory(catalog, category_daily_demand(category_index, pet_customers['pet_transactions']))
+
+# === 계측 디버그 패널 (PET_METRICS=1 일 때 재실행마다 표시) ===
+METRICS_HISTORY_SIZE = 20
+
+def metrics_panel(profile):
+    """사이드바에 이번 재실행의 구간별 시간(자체 시간 = 하위 구간 제외, 주로 요소 출력)과 카운터 표시"""
+    history = st.session_state.setdefault('metrics_history', [])
+    history.append(round(profile.total_seconds * 1000))
+    del history[:-METRICS_HISTORY_SIZE]
+    with st.sidebar.expander(f"⏱️ 렌더링 프로파일 ({profile.total_seconds * 1000:,.0f}ms)"):
+        breakdown = pd.DataFrame(profile.breakdown(), columns=['구간', '시간(ms)', '자체(ms)', '호출'])
+        breakdown[['시간(ms)', '자체(ms)']] *= 1000
+        breakdown['비중(%)'] = breakdown['시간(ms)'] / max(profile.total_seconds * 1000, 1e-9) * 100
+        st.dataframe(
+            breakdown.style.format({'시간(ms)': "{:,.1f}", '자체(ms)': "{:,.1f}", '비중(%)': "{:.1f}"}),
+            hide_index=True
+        )
+        if profile.counters:
+            st.dataframe(pd.DataFrame(profile.counters.items(), columns=['카운터', '값']), hide_index=True)
+        st.caption("최근 재실행(ms): " + ", ".join(f"{ms:,}" for ms in reversed(history)))
+        if os.environ.get(METRICS_FILE_ENV):
+            st.caption(f"내보내기: {os.environ[METRICS_FILE_ENV]}")
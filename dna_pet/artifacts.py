@@ -0,0 +1,159 @@
+"""사전 계산 산출물 저장소 (버전별 디렉터리 + CURRENT 포인터)
+
+표는 Arrow IPC(비압축, 단일 청크) 파일, 배열은 .npy 로 저장해 대시보드가 메모리 맵으로 읽는다.
+빌드는 임시 디렉터리에 모두 쓴 뒤 이름을 바꾸고 CURRENT 를 교체하므로, 읽는 쪽은 완성된 버전만 본다.
+같은 파일을 여는 모든 프로세스는 운영체제 페이지 캐시를 공유하므로 숫자 컬럼은 프로세스마다 복사되지 않는다.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+ARTIFACT_FORMAT = 3  # 2: 고객 표 압축 배치 (고객명 미보관, 전화번호 uint32), 3: 전화번호 토큰화 (원번호는 phone_vault)
+ARTIFACT_CURRENT_FILE = 'CURRENT'
+ARTIFACT_MANIFEST_FILE = 'manifest.json'
+ARTIFACT_LOCK_FILE = '.build.lock'
+# 대시보드 데이터셋 캐시 키에서 산출물 버전을 표시하는 태그 (data_version = (태그, 버전 디렉터리))
+ARTIFACT_DATA_VERSION = 'artifact'
+
+def publish_artifacts(artifact_dir, version, frames, arrays, manifest):
+    """표/배열/매니페스트를 새 버전으로 저장하고 CURRENT 를 해당 버전으로 교체"""
+    os.makedirs(artifact_dir, exist_ok=True)
+    staging = os.path.join(artifact_dir, f'.{version}.{uuid.uuid4().hex[:8]}')
+    os.makedirs(staging)
+    try:
+        for name, frame in frames.items():
+            # 청크가 하나여야 읽을 때 컬럼을 이어 붙이지 않고 메모리 맵 버퍼를 그대로 사용
+            frame.reset_index(drop=True).to_feather(
+                os.path.join(staging, name + '.arrow'), compression='uncompressed', chunksize=max(len(frame), 1)
+            )
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, name + '.npy'), np.ascontiguousarray(array))
+        manifest = dict(manifest, format=ARTIFACT_FORMAT, version=version, frames=sorted(frames), arrays=sorted(arrays))
+        with open(os.path.join(staging, ARTIFACT_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        version_path = os.path.join(artifact_dir, version)
+        os.replace(staging, version_path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    current_tmp = os.path.join(artifact_dir, f'.{ARTIFACT_CURRENT_FILE}.{uuid.uuid4().hex[:8]}')
+    with open(current_tmp, 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+    os.replace(current_tmp, os.path.join(artifact_dir, ARTIFACT_CURRENT_FILE))
+    return version_path
+
+def current_artifact_version(artifact_dir):
+    """CURRENT 가 가리키는 산출물 버전 디렉터리 (빌드 전이면 None)"""
+    try:
+        with open(os.path.join(artifact_dir, ARTIFACT_CURRENT_FILE), encoding='utf-8') as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    version_path = os.path.join(artifact_dir, version)
+    return version_path if version and os.path.isdir(version_path) else None
+
+def prune_artifacts(artifact_dir, keep=3):
+    """최근 keep 개 버전(CURRENT 포함)만 남기고 삭제, 삭제한 버전 목록 반환"""
+    current = current_artifact_version(artifact_dir)
+    versions = sorted(
+        (name for name in os.listdir(artifact_dir)
+         if not name.startswith('.') and os.path.isfile(os.path.join(artifact_dir, name, ARTIFACT_MANIFEST_FILE))),
+        reverse=True
+    )
+    removed = [name for name in versions[keep:] if os.path.join(artifact_dir, name) != current]
+    for name in removed:
+        shutil.rmtree(os.path.join(artifact_dir, name), ignore_errors=True)
+    return removed
+
+def retire_artifacts(artifact_dir):
+    """CURRENT 포인터만 제거 (새로 붙는 프로세스는 이 버전을 쓰지 않고, 버전 디렉터리는 다음 prune_artifacts 에서 삭제)"""
+    try:
+        os.remove(os.path.join(artifact_dir, ARTIFACT_CURRENT_FILE))
+    except FileNotFoundError:
+        pass
+
+def _refresh_lock(lock_path, stop, interval):
+    # 빌드가 길어도 잠금이 중단된 빌드로 보이지 않도록 mtime 갱신
+    while not stop.wait(interval):
+        try:
+            os.utime(lock_path)
+        except FileNotFoundError:
+            return
+
+@contextmanager
+def artifact_lock(artifact_dir, stale_seconds=300, poll_seconds=0.2, wait=True):
+    """산출물 디렉터리 단위 빌드 잠금 (잠금 파일 배타 생성, 잡고 있는 동안 mtime 을 주기적으로 갱신)
+
+    stale_seconds 동안 갱신되지 않은 잠금은 중단된 빌드로 보고 제거한다.
+    wait=False 면 다른 프로세스가 잡고 있을 때 기다리지 않고 False 를 넘긴다 (잡으면 True).
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    lock_path = os.path.join(artifact_dir, ARTIFACT_LOCK_FILE)
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileNotFoundError:
+            os.makedirs(artifact_dir, exist_ok=True)  # 비어 있는 원천 디렉터리를 정리하는 중에 지워진 경우
+            continue
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_seconds:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if not wait:
+                yield False
+                return
+            time.sleep(poll_seconds)
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=_refresh_lock, args=(lock_path, stop, stale_seconds / 10),
+                                 name='artifact-lock-heartbeat', daemon=True)
+    try:
+        os.write(fd, str(os.getpid()).encode('ascii'))
+        os.close(fd)
+        heartbeat.start()
+        yield True
+    finally:
+        stop.set()
+        if heartbeat.is_alive():
+            heartbeat.join()
+        try:
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+class ArtifactSet:
+    """산출물 한 버전 (표는 Arrow IPC 메모리 맵, 배열은 읽기 전용 np.memmap 으로 읽음)"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, ARTIFACT_MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('format') != ARTIFACT_FORMAT:
+            raise ValueError(f"{path} 산출물 형식({self.manifest.get('format')})을 읽을 수 없습니다. "
+                             f"python -m dna_pet.build 로 다시 빌드하세요.")
+
+    def frame(self, name):
+        """저장된 표 (pyarrow 필요, 결측 없는 숫자 컬럼과 범주 코드는 메모리 맵을 복사 없이 참조하는 읽기 전용 배열)"""
+        from pyarrow import feather
+        table = feather.read_table(os.path.join(self.path, name + '.arrow'), memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def array(self, name):
+        """저장된 배열 (읽기 전용 메모리 맵)"""
+        return np.load(os.path.join(self.path, name + '.npy'), mmap_mode='r')
+
+def open_artifacts(data_version):
+    """데이터셋 버전이 산출물 버전이면 ArtifactSet, 아니면 None"""
+    if isinstance(data_version, tuple) and len(data_version) == 2 and data_version[0] == ARTIFACT_DATA_VERSION:
+        return ArtifactSet(data_version[1])
+    return None
@@ -0,0 +1,240 @@
+"""데이터 경로 벤치마크 (python -m dna_pet.bench, Streamlit 없이 실행)
+
+규모(가구 수)별로 샘플 적재 → 빈도 분류 → 고객 리스트 필터 → 그룹 내 순위 → 수익 예측
+→ 메시지 개인화 → 발송 → 발송 기록 집계 경로를 차례로 실행해 경과 시간과 최대 메모리를 기록한다.
+시간은 추적 없이 repeat 회 실행한 최소값, 메모리는 tracemalloc 을 켠 별도 1회 실행의 최대 할당량이다
+(tracemalloc 은 파이썬 객체가 많은 경로를 수 배 느리게 하므로 시간 측정과 분리).
+결과는 JSON 으로 저장하고 기준 결과(baseline)와 비교해 허용 폭을 넘는 회귀가 있으면 종료 코드 1 을 반환한다.
+
+    python -m dna_pet.bench --scales 10000,1000000 --output bench_results.json
+    python -m dna_pet.bench --update-baseline   # 현재 결과를 기준 결과로 저장
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.analytics import FrequencyGroupRanking, PetCategoryIndex, RevenueForecaster
+from dna_pet.data import customer_details, enrich_pet_customers, load_customer_tables
+from dna_pet.history import MessageHistoryStore
+from dna_pet.messaging import MESSAGE_SEND_CHUNK_SIZE, MESSAGE_TEMPLATES, build_message_records, render_messages
+from dna_pet.query import CUSTOMER_SPEND_FILTERS, CustomerQueryEngine, HouseholdIndex
+
+try:
+    import resource  # 프로세스 최대 RSS (유닉스 계열만)
+except ImportError:
+    resource = None
+
+BENCH_SCALES = (10_000, 1_000_000, 10_000_000)
+BENCH_BASELINE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   'benchmarks', 'baseline.json')
+# 회귀 판정: 기준 대비 BENCH_TOLERANCE 이상 늘고 절대 증가량도 최소값을 넘을 때 (짧은 경로의 측정 잡음 제외)
+BENCH_TOLERANCE = 0.25
+BENCH_MIN_SECONDS = 0.05
+BENCH_MIN_MB = 5.0
+# 메시지/발송/기록 경로는 재참여 대상 세그먼트(한달이상)로 실행하되 최대 행 수 제한
+BENCH_MESSAGE_SEGMENT = '한달이상'
+BENCH_MESSAGE_LIMIT = 500_000
+BENCH_RANK_LOOKUPS = 1_000
+
+def _bench_load(state):
+    # 샘플 생성 + 전화번호 토큰화 (load_customer_tables 는 data_dir 없으면 load_sample_data 사용)
+    state['pet_customers'], _, _, _ = load_customer_tables(state['scale'])
+    return len(state['pet_customers'])
+
+def _bench_classify(state):
+    state['pet_customers'] = enrich_pet_customers(state['pet_customers'])
+    return len(state['pet_customers'])
+
+def _bench_filter(state):
+    # 엔진 생성 + 고객 리스트 탭의 대표 필터 조합 (캐시 없이 각각 한 번씩) + 정렬
+    pet_customers = state['pet_customers']
+    category_index = PetCategoryIndex(pet_customers['pet_categories'], pet_customers['household_key'])
+    engine = CustomerQueryEngine(pet_customers, category_index, HouseholdIndex(pet_customers['household_key']))
+    engine.query()
+    engine.query(frequency='주간구매', club=True)
+    engine.query(pet_profile=engine.profile_labels[0], spend_range=CUSTOMER_SPEND_FILTERS["£50-100"])
+    engine.query(categories=category_index.labels[:2])
+    engine.query(search=str(pet_customers['household_key'].iloc[0])[:3])
+    engine.sort_positions(engine.query(club=False), 'pet_spend', ascending=False)
+    state['segment'] = engine.query(frequency=BENCH_MESSAGE_SEGMENT)[:BENCH_MESSAGE_LIMIT]
+    return len(pet_customers)
+
+def _bench_ranking(state):
+    pet_customers = state['pet_customers']
+    ranking = FrequencyGroupRanking(pet_customers)
+    sample = pet_customers.iloc[np.linspace(0, len(pet_customers) - 1, BENCH_RANK_LOOKUPS).astype(np.int64)]
+    for frequency, pet_spend in zip(sample['frequency_category'], sample['pet_spend']):
+        ranking.rank(frequency, 'pet_spend', pet_spend)
+        ranking.percentile(frequency, 'pet_spend', pet_spend)
+    return len(pet_customers)
+
+def _bench_forecast(state):
+    RevenueForecaster(state['pet_customers']).forecast(5, 12)
+    return len(state['pet_customers'])
+
+def _bench_personalize(state):
+    segment = customer_details(state['pet_customers'].iloc[state['segment']])
+    state['messages'] = render_messages(next(iter(MESSAGE_TEMPLATES.values())), segment)
+    return len(segment)
+
+def _simulated_send(customers, messages, message_type, rng):
+    """발송 기록 생성 후 게이트웨이 결과를 모의 (95% 성공률, 실제 발송은 SmsDispatcher 경로)"""
+    records = build_message_records(customers, messages, message_type)
+    records['status'] = np.where(rng.random(len(records)) < 0.95, "발송 성공", "발송 실패")
+    return records
+
+def _bench_send(state):
+    # 메시지 페이지와 같은 청크 단위 (행 선택 → 고객명/전화번호 → 발송 기록)
+    positions, messages = state['segment'], state['messages'].to_numpy()
+    rng = np.random.default_rng(0)
+    chunks = []
+    for start in range(0, len(positions), MESSAGE_SEND_CHUNK_SIZE):
+        batch = customer_details(state['pet_customers'].iloc[positions[start:start + MESSAGE_SEND_CHUNK_SIZE]])
+        chunks.append(_simulated_send(batch, messages[start:start + MESSAGE_SEND_CHUNK_SIZE],
+                                      next(iter(MESSAGE_TEMPLATES)), rng))
+    state['records'] = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    return len(positions)
+
+def _bench_history(state):
+    # 실행마다 빈 저장소에 추가
+    store = MessageHistoryStore(os.path.join(tempfile.mkdtemp(dir=state['workdir']), 'message_history.sqlite'))
+    store.append(state['records'], job_id='bench')
+    store.summary()
+    store.count()
+    store.page(after=store.page_key(store.page(1)))  # 다음 페이지 (키셋)
+    store.page(max(len(state['records']) // 50, 1))
+    return len(state['records'])
+
+BENCH_PATHS = [
+    ('load_sample_data', _bench_load),
+    ('classify_frequency', _bench_classify),
+    ('customer_filter', _bench_filter),
+    ('frequency_ranking', _bench_ranking),
+    ('revenue_forecast', _bench_forecast),
+    ('personalize_messages', _bench_personalize),
+    ('send_messages', _bench_send),
+    ('message_history', _bench_history),
+]
+
+def measure(func, state, trace=False):
+    """(경과 초, 처리 행 수) 또는 trace=True 이면 (tracemalloc 최대 할당 MB, 처리 행 수) — numpy/pandas 버퍼 포함"""
+    gc.collect()
+    if not trace:
+        started = time.perf_counter()
+        rows = func(state)
+        return round(time.perf_counter() - started, 4), rows
+    tracemalloc.start()
+    try:
+        rows = func(state)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2 ** 20, 2), rows
+
+def run_scale(scale, repeat=1, memory=True, log=print):
+    """한 규모의 경로별 결과 {경로: {seconds, peak_mb, rows}} (peak_mb 는 memory=False 이면 None)"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='pet-bench-') as workdir:
+        state = {'scale': scale, 'workdir': workdir}
+        for name, func in BENCH_PATHS:
+            # 다음 경로가 쓰는 상태는 마지막 실행 결과로 갱신 (앞선 실행은 상태 사본에서)
+            runs = [measure(func, dict(state) if memory or attempt < repeat - 1 else state)
+                    for attempt in range(repeat)]
+            seconds, rows = min(runs)
+            peak_mb = measure(func, state, trace=True)[0] if memory else None
+            results[name] = {'seconds': seconds, 'peak_mb': peak_mb, 'rows': rows}
+            log(f"{scale:>12,} {name:<22} {seconds:9.3f}s "
+                f"{'-' if peak_mb is None else f'{peak_mb:.1f}MB':>11} {rows:>12,}")
+    return results
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+def run_benchmarks(scales=BENCH_SCALES, repeat=1, memory=True, log=print):
+    """규모별 벤치마크 결과 문서 (JSON 직렬화 가능한 dict)"""
+    results = {str(scale): run_scale(scale, repeat, memory, log) for scale in scales}
+    return {
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'machine': machine_info(),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        'results': results,
+    }
+
+def compare_results(current, baseline, tolerance=BENCH_TOLERANCE):
+    """기준 결과 대비 회귀 목록 [(규모, 경로, 지표, 기준값, 현재값)] (양쪽에 있는 규모/경로만 비교)"""
+    regressions = []
+    for scale, paths in current['results'].items():
+        for name, result in paths.items():
+            base = baseline.get('results', {}).get(scale, {}).get(name)
+            if base is None:
+                continue
+            for metric, floor in (('seconds', BENCH_MIN_SECONDS), ('peak_mb', BENCH_MIN_MB)):
+                if result[metric] is None or base[metric] is None:
+                    continue
+                if result[metric] > base[metric] * (1 + tolerance) and result[metric] - base[metric] > floor:
+                    regressions.append((scale, name, metric, base[metric], result[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m dna_pet.bench', description="펫고객관리시스템 데이터 경로 벤치마크")
+    parser.add_argument('--scales', default=','.join(str(scale) for scale in BENCH_SCALES),
+                        help="쉼표로 구분한 가구 수 (기본: 10000,1000000,10000000)")
+    parser.add_argument('--repeat', type=int, default=1, help="경로별 반복 횟수 (최소 시간 기록)")
+    parser.add_argument('--no-memory', action='store_true', help="메모리 측정 실행 생략 (시간만 기록)")
+    parser.add_argument('--output', default='bench_results.json', help="결과 JSON 경로")
+    parser.add_argument('--baseline', default=BENCH_BASELINE_FILE, help="비교할 기준 결과 JSON (없으면 비교 생략)")
+    parser.add_argument('--tolerance', type=float, default=BENCH_TOLERANCE, help="회귀 허용 비율 (기본 0.25)")
+    parser.add_argument('--update-baseline', action='store_true', help="현재 결과를 기준 결과로 저장")
+    args = parser.parse_args(argv)
+    try:
+        scales = [int(scale.replace('_', '')) for scale in args.scales.split(',') if scale.strip()]
+    except ValueError:
+        parser.error("--scales 는 쉼표로 구분한 정수여야 합니다.")
+    if not scales or min(scales) < 1 or args.repeat < 1:
+        parser.error("--scales 와 --repeat 는 1 이상이어야 합니다.")
+
+    print(f"{'규모':>10} {'경로':<20} {'시간':>10} {'최대 메모리':>10} {'행 수':>10}")
+    current = run_benchmarks(scales, args.repeat, not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {args.output}" + (f" (프로세스 최대 RSS {current['max_rss_mb']:,.0f}MB)" if current['max_rss_mb'] else ""))
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"기준 결과 저장: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"기준 결과 없음: {args.baseline} (--update-baseline 으로 저장)")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != current['machine']:
+        print("주의: 기준 결과와 실행 환경이 다릅니다 "
+              f"({baseline.get('machine', {}).get('platform')} / {current['machine']['platform']})")
+    regressions = compare_results(current, baseline, args.tolerance)
+    for scale, name, metric, before, after in regressions:
+        print(f"회귀: {int(scale):,} {name} {metric} {before} → {after} ({after / before - 1:+.0%})")
+    print("회귀 없음" if not regressions else f"회귀 {len(regressions)}건 (허용 {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""사전 계산 배치 (python -m dna_pet.build)
+
+적재 → 가구 샤드별 파생 컬럼/세그먼트/연관 추천 코드/빈도 그룹 지출 통계(프로세스 병렬)
+→ 함께 구매 추천 → 수익 예측 통계 → 버전별 산출물 저장 순으로 실행한다.
+대시보드는 PET_ARTIFACT_DIR 를 지정하면 CURRENT 버전을 메모리 맵으로 읽기만 한다.
+PET_SHARED_DIR(예: /dev/shm/pet)를 지정하면 원천 데이터별로 첫 프로세스만 빌드하고
+나머지 세션/작업 프로세스는 같은 산출물을 메모리 맵으로 붙어 쓴다 (shared_build).
+
+    python -m dna_pet.build --output artifacts --customer-count 2000000 --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.analytics import (
+    combine_spend_stats, encode_pet_categories, frequency_spend_stats, pet_category_labels,
+    pet_recommendation_sets, related_product_codes,
+)
+from dna_pet.artifacts import (
+    ARTIFACT_CURRENT_FILE, artifact_lock, current_artifact_version, prune_artifacts, publish_artifacts, retire_artifacts,
+)
+from dna_pet.data import enrich_pet_customers, load_customer_tables, source_fingerprint
+
+# 샤드 작업에 넘기는 컬럼 (pet_categories 는 Categorical 로 넘겨 직렬화 비용을 줄임)
+SHARD_COLUMNS = ['pet_spend', 'total_spend', 'pet_transactions', 'pet_categories']
+DERIVED_COLUMNS = ['pet_ratio', 'frequency_category', 'spend_range']
+
+# 작업 프로세스 시작 시 한 번 받아 두는 (샤드 입력 표, 카테고리 목록) — 샤드마다는 행 위치만 전달
+_shard_input = None
+
+def _init_shard_worker(shard_input, labels):
+    global _shard_input
+    _shard_input = (shard_input, labels)
+
+def _build_shard_at(positions):
+    shard_input, labels = _shard_input
+    return build_shard(shard_input.iloc[positions], labels)
+
+def household_shards(household_keys, shard_count):
+    """household_key 해시 기준 샤드별 행 위치 (빈 샤드 제외)"""
+    shard_ids = pd.util.hash_pandas_object(pd.Series(household_keys), index=False).to_numpy() % shard_count
+    positions = [np.flatnonzero(shard_ids == shard) for shard in range(shard_count)]
+    return [shard_positions for shard_positions in positions if len(shard_positions)]
+
+def build_shard(shard, labels):
+    """가구 샤드 하나의 (파생 컬럼, 카테고리 비트마스크, 연관 추천 코드, 빈도 그룹 지출 통계)"""
+    enriched = enrich_pet_customers(shard)
+    masks = encode_pet_categories(shard['pet_categories'], labels)
+    return (
+        enriched[DERIVED_COLUMNS],
+        masks,
+        related_product_codes(masks, labels, shard['total_spend']),
+        frequency_spend_stats(enriched),
+    )
+
+def run_build(artifact_dir, customer_count=None, data_dir=None, shard_count=8, workers=None, keep=3, log=print):
+    """전체 단계를 실행하고 새 산출물 버전 디렉터리 반환"""
+    timings = {}
+    started = time.perf_counter()
+
+    def stage(name):
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = round(now - started, 3)
+        log(f"[{name}] {timings[name]:.2f}s")
+        started = now
+
+    source, fingerprint = source_fingerprint(customer_count, data_dir)
+    pet_customers, frequency_changes, products, phone_vault = load_customer_tables(customer_count, data_dir)
+    stage('load')
+
+    labels = pet_category_labels(pet_customers['pet_categories'])
+    shard_input = pet_customers[SHARD_COLUMNS].astype({'pet_categories': 'category'})
+    shards = household_shards(pet_customers['household_key'], shard_count)
+    if workers == 1 or len(shards) <= 1:
+        results = [build_shard(shard_input.iloc[positions], labels) for positions in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker,
+                                 initargs=(shard_input, labels)) as pool:
+            results = list(pool.map(_build_shard_at, shards))
+    stage('enrich/segment')
+
+    # 샤드 결과를 원래 행 순서로 되돌림 (파생 컬럼은 인덱스 정렬, 배열은 행 위치에 기록)
+    derived = pd.concat([result[0] for result in results]).reindex(pet_customers.index)
+    pet_customers = pet_customers.copy()
+    for column in DERIVED_COLUMNS:
+        pet_customers[column] = derived[column]
+    masks = np.empty(len(pet_customers), dtype=results[0][1].dtype if results else np.uint8)
+    related_codes = np.empty(len(pet_customers), dtype=np.int8)
+    for positions, result in zip(shards, results):
+        masks[positions] = result[1]
+        related_codes[positions] = result[2]
+
+    unique_masks, pet_codes = np.unique(masks, return_inverse=True)
+    pet_sets = pet_recommendation_sets(unique_masks, labels)
+    stage('recommendations')
+
+    spend_stats = combine_spend_stats([result[3] for result in results])
+    stage('forecast')
+
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{fingerprint}"
+    version_path = publish_artifacts(
+        artifact_dir, version,
+        frames={
+            'pet_customers': pet_customers,
+            'frequency_changes': frequency_changes,
+            'products': products,
+            'frequency_spend_stats': spend_stats.rename_axis('frequency_category').reset_index(),
+        },
+        arrays={
+            'category_masks': masks,
+            'pet_codes': pet_codes.astype(np.int32),
+            'related_codes': related_codes,
+            'phone_vault': phone_vault.numbers,
+        },
+        manifest={
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'source': source,
+            'rows': len(pet_customers),
+            'shards': len(shards),
+            'labels': labels,
+            'pet_sets': [list(product_set) for product_set in pet_sets],
+            'timings': timings,
+        },
+    )
+    stage('write')
+    if keep:
+        for removed in prune_artifacts(artifact_dir, keep):
+            log(f"오래된 산출물 삭제: {removed}")
+    return version_path
+
+def shared_build(shared_dir, customer_count=None, data_dir=None, keep=2, log=print):
+    """원천 데이터별 공유 산출물 버전 디렉터리 (없으면 잠금을 잡은 한 프로세스만 빌드, 나머지는 기다렸다가 사용)
+
+    shared_dir/<원천 해시>/ 에 버전을 하나만 두고, 원천이 바뀌어 쓰지 않게 된 이전 원천은 최근 keep 개만 남긴다.
+    정리는 원천별 잠금을 바로 잡을 수 있을 때만(빌드 중이 아닐 때) 하고 CURRENT 가 가리키는 버전은 지우지 않는다.
+    keep 밖의 원천은 CURRENT 만 먼저 떼고, 버전 디렉터리는 다음 정리 때 삭제한다
+    (그 사이 CURRENT 를 읽고 아직 열지 않은 프로세스도 열 수 있고, 이미 메모리 맵으로 연 프로세스는 삭제 후에도 계속 읽음).
+    """
+    _, fingerprint = source_fingerprint(customer_count, data_dir)
+    artifact_dir = os.path.join(shared_dir, fingerprint)
+    version_path = current_artifact_version(artifact_dir)
+    if version_path:
+        return version_path
+
+    with artifact_lock(artifact_dir):
+        version_path = current_artifact_version(artifact_dir)
+        if version_path is None:
+            version_path = run_build(artifact_dir, customer_count, data_dir, workers=1, keep=1, log=log)
+    _prune_shared_sources(shared_dir, artifact_dir, keep, log)
+    return version_path
+
+def _published_at(source_dir):
+    try:
+        return os.path.getmtime(os.path.join(source_dir, ARTIFACT_CURRENT_FILE))
+    except FileNotFoundError:
+        return 0.0
+
+def _prune_shared_sources(shared_dir, artifact_dir, keep, log):
+    """다른 원천 디렉터리 정리 (최근 CURRENT 교체 순, 잠금을 잡은 원천만)"""
+    sources = sorted(
+        (entry.path for entry in os.scandir(shared_dir) if entry.is_dir() and entry.path != artifact_dir),
+        key=_published_at, reverse=True
+    )
+    for rank, source_dir in enumerate(sources):
+        with artifact_lock(source_dir, wait=False) as acquired:
+            if not acquired:
+                continue
+            for removed in prune_artifacts(source_dir, keep=0):
+                log(f"이전 공유 산출물 삭제: {os.path.join(source_dir, removed)}")
+            if rank >= keep - 1 and current_artifact_version(source_dir):
+                retire_artifacts(source_dir)
+                log(f"이전 공유 산출물 사용 중지: {source_dir}")
+        try:
+            os.rmdir(source_dir)  # 버전이 모두 지워진 원천 (그 사이 새 빌드가 시작됐으면 비어 있지 않음)
+        except OSError:
+            pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m dna_pet.build', description="펫고객관리시스템 사전 계산 배치")
+    parser.add_argument('--output', default=os.environ.get('PET_ARTIFACT_DIR', 'artifacts'),
+                        help="산출물 디렉터리 (기본: PET_ARTIFACT_DIR 또는 ./artifacts)")
+    parser.add_argument('--data-dir', default=os.environ.get('PET_DATA_DIR'),
+                        help="Dunnhumby 형식 추출 파일 디렉터리 (기본: PET_DATA_DIR, 없으면 샘플 생성)")
+    parser.add_argument('--customer-count', type=int,
+                        default=int(os.environ['PET_CUSTOMER_COUNT']) if os.environ.get('PET_CUSTOMER_COUNT') else None,
+                        help="샘플 생성 고객 수 (기본: PET_CUSTOMER_COUNT)")
+    parser.add_argument('--shards', type=int, default=8, help="household_key 샤드 수")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: CPU 수, 1 이면 단일 프로세스)")
+    parser.add_argument('--keep', type=int, default=3, help="유지할 산출물 버전 수 (0 이면 삭제 안 함)")
+    args = parser.parse_args(argv)
+    if args.shards < 1:
+        parser.error("--shards 는 1 이상이어야 합니다.")
+
+    version_path = run_build(args.output, args.customer_count, args.data_dir, args.shards, args.workers, args.keep)
+    print(f"산출물 저장: {version_path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1026 @@
+"""펫 고객 데이터 적재/분류 (샘플 생성, Dunnhumby 추출 파일 집계, 증분 상태, 파생 컬럼)
+
+Streamlit 없이 import 되므로 대시보드와 사전 계산 배치(dna_pet.build)가 함께 사용한다.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.metrics import timer
+from dna_pet.pii import mask_phone_numbers, pack_phone_numbers, tokenize_phone_numbers
+
+# 펫 크기 및 연령대 추정 함수
+def estimate_pet_profile(pet_categories, pet_spend):
+    """펫 카테고리와 지출액으로 반려동물 크기/연령 추정 (하나만 반환)"""
+    # 강아지 우선 체크
+    if 'DOG-' in pet_categories:
+        # 강아지 크기 추정 (지출액 기준)
+        if pet_spend < 30:
+            return "소형견"
+        elif pet_spend < 80:
+            return "중형견" 
+        else:
+            return "대형견"
+    
+    # 고양이 체크
+    elif 'CAT-' in pet_categories:
+        # 고양이 연령대 추정 (카테고리 기준)
+        if '간식' in pet_categories or '장난감' in pet_categories:
+            return np.random.choice(["새끼고양이", "성묘"], p=[0.3, 0.7])
+        else:
+            return "성묘"
+    
+    # 기타 반려동물
+    elif 'OTHER-' in pet_categories:
+        if '가금류' in pet_categories:
+            return "소형조류"
+        elif '물고기' in pet_categories:
+            return "관상어"
+        elif '햄스터' in pet_categories:
+            return "소동물"
+        elif '파충류' in pet_categories:
+            return "파충류"
+        else:
+            return "기타동물"
+    
+    return "미확인"
+
+def estimate_household_size(total_spend):
+    """총 지출액으로 가구수 추정"""
+    if total_spend < 2000:
+        return "1인 가구"
+    elif total_spend < 4000:
+        return "2인 가구"
+    elif total_spend < 6000:
+        return "3인 가구"
+    else:
+        return "4인 이상 가구"
+
+# === 컬럼 단위 분류 함수 (결과는 Categorical, 스칼라 함수와 동일한 규칙) ===
+PET_PROFILE_LABELS = ["소형견", "중형견", "대형견", "새끼고양이", "성묘",
+                      "소형조류", "관상어", "소동물", "파충류", "기타동물", "미확인"]
+HOUSEHOLD_SIZE_LABELS = ["1인 가구", "2인 가구", "3인 가구", "4인 이상 가구"]
+
+def _categorical_result(codes, labels, like, ordered=False):
+    """정수 코드를 Categorical로 변환 (입력이 Series면 인덱스 유지)"""
+    result = pd.Categorical.from_codes(codes, labels, ordered=ordered)
+    if isinstance(like, pd.Series):
+        return pd.Series(result, index=like.index)
+    return result
+
+def estimate_pet_profile_array(pet_categories, pet_spend, rng=None):
+    """estimate_pet_profile 의 배열 버전 (카테고리 조합별로 한 번만 판정 후 전개)"""
+    rng = rng if rng is not None else np.random.default_rng()
+    categories = pd.Categorical(pet_categories)
+
+    # 조합별 판정 코드 (-1: 강아지 지출 기준, -2: 고양이 랜덤), 마지막 항목은 결측(-1 코드)용
+    combo_profile = np.array([
+        -1 if 'DOG-' in s else
+        -2 if 'CAT-' in s and ('간식' in s or '장난감' in s) else
+        PET_PROFILE_LABELS.index(estimate_pet_profile(s, 0))
+        for s in categories.categories
+    ] + [PET_PROFILE_LABELS.index("미확인")], dtype=np.int64)
+    row_profile = combo_profile[categories.codes]
+
+    dog_profile = np.searchsorted([30, 80], np.asarray(pet_spend, dtype=np.float64), side='right')
+    cat_profile = np.where(rng.random(len(row_profile)) < 0.3, 3, 4)
+    codes = np.where(row_profile == -1, dog_profile,
+                     np.where(row_profile == -2, cat_profile, row_profile))
+    return _categorical_result(codes, PET_PROFILE_LABELS, pet_categories)
+
+def estimate_household_size_array(total_spend):
+    """estimate_household_size 의 배열 버전"""
+    codes = np.searchsorted([2000, 4000, 6000], np.asarray(total_spend, dtype=np.float64), side='right')
+    return _categorical_result(codes, HOUSEHOLD_SIZE_LABELS, total_spend)
+
+# 카테고리별 함께 구매 펫 추천 제품 (앞쪽일수록 우선)
+PET_RECOMMENDATION_TABLE = {
+    'DOG-사료/간식': [
+        "프리미엄 건식사료 (대용량)",
+        "기능성 간식 (관절/치아 건강)",
+        "습식사료 (토핑용)",
+        "수제 간식"
+    ],
+    'CAT-사료/간식': [
+        "연령별 맞춤 사료",
+        "헤어볼 케어 간식",
+        "동결건조 간식",
+        "습식 파우치 (멀티팩)"
+    ],
+    'CAT-모래/위생용품': [
+        "응고형 벤토나이트 모래",
+        "무향 두부모래",
+        "자동급식기/급수기",
+        "고양이 화장실 매트"
+    ],
+    'DOG-건강관리/영양제': [
+        "종합 영양제",
+        "관절 건강 보조제",
+        "피부/모질 개선제",
+        "유산균 보조제"
+    ]
+}
+PET_PRODUCT_ORDER = {
+    product: i for i, product in enumerate(p for products in PET_RECOMMENDATION_TABLE.values() for p in products)
+}
+
+# 연관 일반 제품 (기본 → 고지출 고객 → 강아지 보유 고객 순으로 이어 붙인 뒤 상위 8개)
+RELATED_PRODUCTS_BASE = [
+    "키친타올 (대용량)",
+    "물티슈 (무알코올)",
+    "공기청정기 필터",
+    "진공청소기 먼지봉투",
+    "세탁세제 (저자극)",
+    "바닥 청소용품"
+]
+RELATED_PRODUCTS_PREMIUM = [
+    "프리미엄 공기청정기",
+    "로봇청소기",
+    "고급 세탁세제",
+    "친환경 청소용품"
+]
+RELATED_PRODUCTS_DOG = [
+    "운동화 (산책용)",
+    "아웃도어 재킷",
+    "휴대용 물병",
+    "차량용 시트커버"
+]
+PREMIUM_SPEND_THRESHOLD = 5000
+
+def rank_pet_recommendations(categories, top_k=6):
+    """카테고리 목록으로 추천 제품 순위 계산 (카테고리 내 우선순위 점수 합, 동점은 제품표 순서)"""
+    scores = {}
+    for category in dict.fromkeys(categories):  # 중복 카테고리는 한 번만 반영
+        products = PET_RECOMMENDATION_TABLE.get(category, [])
+        for rank, product in enumerate(products):
+            scores[product] = scores.get(product, 0) + len(products) - rank
+    return sorted(scores, key=lambda product: (-scores[product], PET_PRODUCT_ORDER[product]))[:top_k]
+
+def related_product_list(is_premium, has_dog):
+    """고지출 여부와 강아지 보유 여부에 따른 연관 제품 목록"""
+    products = list(RELATED_PRODUCTS_BASE)
+    if is_premium:
+        products.extend(RELATED_PRODUCTS_PREMIUM)
+    if has_dog:
+        products.extend(RELATED_PRODUCTS_DOG)
+    return products[:8]
+
+def get_pet_recommendations(pet_categories):
+    """카테고리 기반 펫 제품 추천"""
+    return rank_pet_recommendations(pet_categories.split(', '))
+
+def get_related_products(pet_categories, total_spend):
+    """연관 일반 제품 추천"""
+    return related_product_list(total_spend > PREMIUM_SPEND_THRESHOLD, 'DOG-' in pet_categories)
+
+# 실제 데이터 분포에 맞게 고객 생성 (초고빈도 포함)
+FREQUENCY_DISTRIBUTION = {
+    '초고빈도': 297,      # 7+ transactions per month
+    '주간구매': 266,    # 5-6 transactions per month
+    '월간구매': 237,    # 1-2 transactions per month  
+    '고빈도': 139,      # 4 transactions per month
+    '저빈도': 98,       # 3 transactions per month
+    '한달이상': 87,     # <1 transaction per month
+}
+
+# 빈도별 월간 거래 횟수 후보 (후보 중 균등 추출)
+FREQUENCY_TRANSACTION_CHOICES = {
+    '초고빈도': [7, 8, 9, 10],
+    '주간구매': [5, 6],
+    '월간구매': [1, 2],
+    '고빈도': [4],
+    '저빈도': [3],
+    '한달이상': [0.5, 0.7, 0.9],
+}
+
+# 펫 카테고리를 소분류까지 세분화
+PET_CATEGORIES_DETAILED = [
+    'DOG-사료/간식, CAT-모래/위생용품', 
+    'DOG-장난감/액세서리, CAT-사료/간식',
+    'DOG-사료/간식', 
+    'CAT-사료/간식, OTHER-가금류용 사료 및 용품',
+    'DOG-건강관리/영양제, CAT-장난감/액세서리',
+    'CAT-모래/위생용품',
+    'DOG-사료/간식, OTHER-물고기/어항용품',
+    'DOG-장난감/액세서리',
+    'CAT-사료/간식',
+    'DOG-건강관리/영양제, CAT-건강관리/영양제, OTHER-햄스터/소동물용품',
+    'DOG-사료/간식, CAT-사료/간식, OTHER-가금류용 사료 및 용품',
+    'DOG-목줄/하네스/이동장',
+    'CAT-모래/위생용품, OTHER-물고기/어항용품',
+    'DOG-장난감/액세서리, CAT-모래/위생용품',
+    'DOG-사료/간식, CAT-장난감/액세서리',
+    'OTHER-파충류 용품',
+    'DOG-건강관리/영양제',
+    'CAT-건강관리/영양제',
+    'DOG-목줄/하네스/이동장, CAT-사료/간식',
+    'DOG-사료/간식, OTHER-가금류용 사료 및 용품'
+]
+
+def _scale_distribution(distribution, customer_count):
+    """빈도 분포 비율을 유지하며 고객 수를 customer_count에 맞춤 (최대 잔여 방식)"""
+    weights = np.array(list(distribution.values()), dtype=np.float64)
+    exact = weights / weights.sum() * customer_count
+    counts = np.floor(exact).astype(np.int64)
+    remainder = customer_count - counts.sum()
+    if remainder > 0:
+        counts[np.argsort(-(exact - counts), kind='stable')[:remainder]] += 1
+    return counts
+
+def _sample_category_combinations(rng, customer_count):
+    """고객별 1-3개의 카테고리를 중복 없이 선택하여 (조합 코드, 조합 문자열 목록) 반환"""
+    n_choices = len(PET_CATEGORIES_DETAILED)
+    num_categories = rng.choice([1, 2, 3], size=customer_count, p=[0.4, 0.4, 0.2])
+    
+    # 비복원 추출: 앞서 뽑힌 인덱스를 건너뛰도록 보정
+    first = rng.integers(0, n_choices, customer_count)
+    second = rng.integers(0, n_choices - 1, customer_count)
+    second += second >= first
+    third = rng.integers(0, n_choices - 2, customer_count)
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    third += third >= low
+    third += third >= high
+    
+    # 선택하지 않은 자리는 -1 로 표시 후 조합을 정수 코드로 압축
+    second = np.where(num_categories >= 2, second, -1)
+    third = np.where(num_categories >= 3, third, -1)
+    base = n_choices + 1
+    combo_keys = (first + 1) * base * base + (second + 1) * base + (third + 1)
+    present = np.bincount(combo_keys, minlength=base ** 3) > 0
+    unique_keys = np.flatnonzero(present)
+    combo_codes = (np.cumsum(present) - 1)[combo_keys]
+
+    combo_strings = []
+    for key in unique_keys:
+        parts = [key // (base * base), (key // base) % base, key % base]
+        combo_strings.append(', '.join(PET_CATEGORIES_DETAILED[p - 1] for p in parts if p > 0))
+
+    # 서로 다른 조합이 같은 문자열이 될 수 있으므로 (항목 자체에 ', ' 포함) 문자열 기준으로 재코딩
+    string_codes, combo_strings = pd.factorize(pd.Series(combo_strings, dtype=object))
+    return string_codes[combo_codes], list(combo_strings)
+
+# === 고객 표 메모리 배치 (지출/비율 float32, 좁은 정수, 저카디널리티 컬럼은 Categorical) ===
+# 고객명은 가구 ID 에서 필요한 행만 만들고, 전화번호는 앞자리 0 을 뺀 10자리 숫자(uint32)로 보관 (없으면 0)
+# (적재가 끝나면 load_customer_tables 에서 phone_token/phone_mask 로 토큰화, dna_pet.pii)
+PET_CUSTOMER_DTYPES = {
+    'pet_transactions': np.float32,
+    'pet_spend': np.float32,
+    'total_spend': np.float32,
+    'club_plus_member': bool,
+    'last_purchase_days': np.int16,
+    'phone_number': np.uint32,
+}
+
+def customer_names(household_keys):
+    """가구 ID → 고객명 ('고객 {household_key}', 익명화)"""
+    return '고객 ' + pd.Series(household_keys).astype(str)
+
+def customer_details(customers):
+    """표시/발송할 행에 고객명과 마스킹된 전화번호 문자열을 붙인 복사본 (전체 표가 아니라 잘라낸 행에만 사용)"""
+    return customers.assign(
+        customer_name=customer_names(customers['household_key']),
+        phone_number=mask_phone_numbers(customers['phone_mask']),
+    )
+
+def compact_pet_customers(pet_customers):
+    """고객 표를 PET_CUSTOMER_DTYPES 로 변환 (가구 ID 는 int32 범위면 int32)"""
+    household_keys = pet_customers['household_key']
+    int32 = np.iinfo(np.int32)
+    in_range = household_keys.empty or (household_keys.min() >= int32.min and household_keys.max() <= int32.max)
+    return pet_customers.astype({'household_key': np.int32 if in_range else np.int64, **PET_CUSTOMER_DTYPES})
+
+def generate_pet_customers(customer_count=None, seed=42):
+    """빈도 분포에 맞춘 펫 고객 데이터를 배치 단위로 생성 (수백만 가구 규모 지원)"""
+    rng = np.random.default_rng(seed)
+    
+    if customer_count is None:
+        counts = np.array(list(FREQUENCY_DISTRIBUTION.values()), dtype=np.int64)
+    else:
+        counts = _scale_distribution(FREQUENCY_DISTRIBUTION, customer_count)
+    customer_count = int(counts.sum())  # 기본 1124명
+    
+    # 빈도별 거래 횟수 할당 (후보 테이블에서 일괄 추출)
+    freq_codes = np.repeat(np.arange(len(counts)), counts)
+    choices = [FREQUENCY_TRANSACTION_CHOICES[f] for f in FREQUENCY_DISTRIBUTION]
+    choice_table = np.zeros((len(choices), max(len(c) for c in choices)))
+    for i, c in enumerate(choices):
+        choice_table[i, :len(c)] = c
+    choice_counts = np.array([len(c) for c in choices])
+    choice_idx = (rng.random(customer_count) * choice_counts[freq_codes]).astype(np.int64)
+    pet_transactions = choice_table[freq_codes, choice_idx]
+    
+    # 데이터를 섞어서 랜덤화 (고객 ID는 빈도 그룹 순으로 부여된 뒤 섞임)
+    order = rng.permutation(customer_count)
+    household_keys = 1000 + order
+    pet_transactions = pet_transactions[order]
+    
+    pet_spend = rng.uniform(10, 200, customer_count).round(2)
+    total_spend = rng.uniform(500, 8000, customer_count).round(2)
+    club_plus_member = rng.random(customer_count) < 0.3
+    
+    combo_codes, combo_strings = _sample_category_combinations(rng, customer_count)
+    pet_categories = pd.Categorical.from_codes(combo_codes, combo_strings)
+
+    # 가구수 및 펫 프로필 추정
+    household_sizes = estimate_household_size_array(total_spend)
+    pet_profiles = estimate_pet_profile_array(pet_categories, pet_spend, rng)
+
+    phone_numbers = pack_phone_numbers(10, rng.integers(1000, 9999, customer_count),
+                                       rng.integers(1000, 9999, customer_count))
+    
+    pet_customers = pd.DataFrame({
+        'household_key': household_keys,
+        'pet_transactions': pet_transactions,
+        'pet_spend': pet_spend,
+        'total_spend': total_spend,
+        'pet_categories': pet_categories,
+        'household_size': household_sizes,
+        'pet_profile': pet_profiles,
+        'club_plus_member': club_plus_member,
+        'last_purchase_days': rng.integers(1, 90, customer_count),
+        'phone_number': phone_numbers
+    })
+    return compact_pet_customers(pet_customers)
+
+# 샘플 데이터 생성 (실데이터는 load_transaction_extracts, 캐싱은 load_customer_data 에서 처리)
+def load_sample_data(customer_count=None):
+    # 펫 고객 데이터 샘플 (실제 분포에 맞춤, customer_count 지정 시 동일 비율로 확장)
+    pet_customers = generate_pet_customers(customer_count)
+
+    # 주기상향 변화 데이터 샘플
+    frequency_changes = pd.DataFrame({
+        'category': ['BEEF', 'SOFT DRINKS', 'FRZN MEAT/MEAT DINNERS', 'FROZEN PIZZA', 'CHEESE', 'FLUID MILK PRODUCTS', 'BAG SNACKS', 'BAKED BREAD/BUNS/ROLLS', 'PORK', 'CIGARETTES'],
+        'current_sales': [184.72, 274.54, 196.84, 150.69, 199.55, 220.49, 153.78, 179.73, 86.68, 153.59],
+        'target_sales': [1940.09, 1969.7, 1530.81, 1300.7, 1174.74, 1050.29, 936.82, 913.67, 806.5, 775.44],
+        'sales_change': [1755.37, 1695.16, 1333.97, 1150.01, 975.19, 829.8, 783.04, 733.94, 719.82, 621.85],
+        'percentage_change': [950.29, 617.45, 677.69, 763.16, 488.69, 376.34, 509.19, 408.36, 830.43, 404.88],
+        'level': 'middle'
+    })
+    
+    # 제품 데이터 샘플
+    products = pd.DataFrame({
+        'product_id': [25671, 26081, 26093, 26190, 26355, 26426, 26540, 26601, 26636, 26700],
+        'major_category': ['GROCERY', 'MISC. TRANS.', 'PASTRY', 'GROCERY', 'GROCERY', 'GROCERY', 'GROCERY', 'DRUG GM', 'PASTRY', 'MEAT'],
+        'middle_category': ['FRZN ICE', 'NO COMMODITY DESCRIPTION', 'BREAD', 'FRUIT - SHELF STABLE', 'COOKIES/CONES', 'SPICES & EXTRACTS', 'COOKIES/CONES', 'VITAMINS', 'BREAKFAST SWEETS', 'BEEF'],
+        'small_category': ['ICE - CRUSHED/CUBED', 'NO SUBCOMMODITY DESCRIPTION', 'BREAD:ITALIAN/FRENCH', 'APPLE SAUCE', 'SPECIALTY COOKIES', 'SPICES & SEASONINGS', 'TRAY PACK/CHOC CHIP COOKIES', 'VITAMIN - MINERALS', 'SW GDS: SW ROLLS/DAN', 'SELECT BEEF'],
+        'total_quantity': [6, 1, 1, 1, 2, 1, 3, 1, 1, 5],
+        'total_revenue': [20.94, 0.99, 1.59, 1.54, 1.98, 2.29, 2.79, 7.59, 2.5, 45.67]
+    })
+    
+    return pet_customers, frequency_changes, products
+
+# === 실데이터 적재 (Dunnhumby 형식 household / transaction / product 추출 파일) ===
+# 추출 파일명 (확장자 .parquet 우선, 없으면 .csv)
+TRANSACTION_EXTRACT = 'transaction_data'
+PRODUCT_EXTRACT = 'product'
+HOUSEHOLD_EXTRACT = 'hh_demographic'
+
+TRANSACTION_COLUMNS = ['household_key', 'basket_id', 'day', 'product_id', 'quantity', 'sales_value', 'coupon_disc']
+PRODUCT_COLUMNS = ['product_id', 'department', 'commodity_desc', 'sub_commodity_desc']
+HOUSEHOLD_COLUMNS = ['household_key', 'household_size_desc']
+
+# 상품 분류(commodity + sub-commodity) 키워드 → 펫 카테고리 (위에서부터 먼저 일치하는 규칙 적용)
+PET_CATEGORY_RULES = [
+    (['CAT', 'LITTER'], 'CAT-모래/위생용품'),
+    (['CAT', 'TOY'], 'CAT-장난감/액세서리'),
+    (['CAT', 'FLEA'], 'CAT-건강관리/영양제'),
+    (['CAT', 'VITAMIN'], 'CAT-건강관리/영양제'),
+    (['CAT', 'FOOD'], 'CAT-사료/간식'),
+    (['CAT', 'TREAT'], 'CAT-사료/간식'),
+    (['DOG', 'LEASH'], 'DOG-목줄/하네스/이동장'),
+    (['DOG', 'COLLAR'], 'DOG-목줄/하네스/이동장'),
+    (['DOG', 'TOY'], 'DOG-장난감/액세서리'),
+    (['DOG', 'FLEA'], 'DOG-건강관리/영양제'),
+    (['DOG', 'VITAMIN'], 'DOG-건강관리/영양제'),
+    (['DOG', 'FOOD'], 'DOG-사료/간식'),
+    (['DOG', 'TREAT'], 'DOG-사료/간식'),
+    (['BIRD'], 'OTHER-가금류용 사료 및 용품'),
+    (['AQUARIUM'], 'OTHER-물고기/어항용품'),
+    (['FISH', 'FOOD'], 'OTHER-물고기/어항용품'),
+    (['SMALL ANIMAL'], 'OTHER-햄스터/소동물용품'),
+    (['REPTILE'], 'OTHER-파충류 용품'),
+]
+
+# 상향 대상(하위) / 목표(상위) 빈도 등급
+LOWER_FREQUENCY_TIERS = ['한달이상', '월간구매', '저빈도']
+UPPER_FREQUENCY_TIERS = ['고빈도', '주간구매', '초고빈도']
+
+def find_extract(data_dir, name):
+    """data_dir 에서 추출 파일 경로 찾기 (.parquet 우선)"""
+    for ext in ('.parquet', '.csv'):
+        path = os.path.join(data_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def iter_extract_chunks(path, columns, chunksize=1_000_000):
+    """Parquet/CSV 추출 파일에서 필요한 컬럼만 청크 단위로 읽기 (컬럼명은 소문자로 통일)"""
+    wanted = set(columns)
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq  # Parquet 사용 시에만 필요
+
+        # 메모리 매핑 + 컬럼 프로젝션으로 필요한 컬럼의 row group 만 읽음
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        selected = [name for name in parquet_file.schema_arrow.names if name.lower() in wanted]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=selected):
+            chunk = batch.to_pandas()
+            chunk.columns = [c.lower() for c in chunk.columns]
+            yield chunk
+    else:
+        for chunk in pd.read_csv(path, usecols=lambda c: c.lower() in wanted, chunksize=chunksize):
+            chunk.columns = [c.lower() for c in chunk.columns]
+            yield chunk
+
+def read_extract(path, columns):
+    """크기가 작은 추출 파일(product, household)을 한 번에 읽기"""
+    chunks = list(iter_extract_chunks(path, columns))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+def classify_pet_products(product_df):
+    """상품별 펫 카테고리 코드 (PET_CATEGORY_RULES 인덱스 기준 라벨 코드, 펫 상품 아님: -1)"""
+    text = (product_df['commodity_desc'].fillna('').astype(str) + ' ' +
+            product_df['sub_commodity_desc'].fillna('').astype(str)).str.upper()
+    text = text.str.replace('HOT DOG', '', regex=False)  # 'HOT DOG' 은 펫 상품 아님
+
+    labels = list(dict.fromkeys(label for _, label in PET_CATEGORY_RULES))
+    conditions = [
+        np.logical_and.reduce([text.str.contains(rf'\b{k}', regex=True).to_numpy() for k in keywords])
+        for keywords, _ in PET_CATEGORY_RULES
+    ]
+    codes = np.select(conditions, [labels.index(label) for _, label in PET_CATEGORY_RULES], default=-1)
+    return codes, labels
+
+def build_product_lookup(product_df):
+    """트랜잭션 청크 집계용 상품 조회 테이블 (상품 인덱스, 펫 카테고리 코드/라벨, 카테고리(commodity) 코드/라벨)"""
+    pet_codes, pet_labels = classify_pet_products(product_df)
+    commodity_codes, commodity_labels = pd.factorize(product_df['commodity_desc'].fillna('NO COMMODITY DESCRIPTION'))
+    return pd.Index(product_df['product_id']), pet_codes, pet_labels, commodity_codes, np.asarray(commodity_labels, dtype=object)
+
+# 가구 누적 지표의 합산 방식 (청크 간 / 배치 간 공통)
+HOUSEHOLD_STATE_AGG = {
+    'total_spend': 'sum', 'pet_spend': 'sum', 'first_day': 'min', 'last_day': 'max', 'coupon_used': 'max'
+}
+
+def _aggregate_transaction_chunk(chunk, product_lookup):
+    """트랜잭션 청크 하나를 가구/제품 단위 부분 집계로 축약"""
+    product_index, product_pet_codes, _, product_commodity_codes, commodity_labels = product_lookup
+    product_pos = product_index.get_indexer(chunk['product_id'])
+    known = product_pos >= 0
+    pet_codes = np.where(known, product_pet_codes[product_pos], -1)
+    commodity_codes = np.where(known, product_commodity_codes[product_pos], -1)
+    sales = chunk['sales_value'].to_numpy(dtype=np.float64)
+    is_pet = pet_codes >= 0
+
+    coupon = chunk['coupon_disc'] if 'coupon_disc' in chunk.columns else pd.Series(0.0, index=chunk.index)
+    households = pd.DataFrame({
+        'household_key': chunk['household_key'].to_numpy(),
+        'total_spend': sales,
+        'pet_spend': np.where(is_pet, sales, 0.0),
+        'first_day': chunk['day'].to_numpy(),
+        'last_day': chunk['day'].to_numpy(),
+        'coupon_used': coupon.to_numpy() < 0,
+    }).groupby('household_key').agg(HOUSEHOLD_STATE_AGG)
+
+    pet_rows = chunk.loc[is_pet, ['household_key', 'basket_id']].assign(pet_code=pet_codes[is_pet])
+    pet_baskets = pet_rows[['household_key', 'basket_id']].drop_duplicates()
+    pet_pairs = pet_rows[['household_key', 'pet_code']].drop_duplicates()
+
+    commodity_spend = pd.Series(
+        sales[known],
+        index=pd.MultiIndex.from_arrays(
+            [chunk['household_key'].to_numpy()[known], commodity_labels[commodity_codes[known]]],
+            names=['household_key', 'commodity']
+        )
+    ).groupby(level=[0, 1]).sum()
+
+    product_totals = chunk.groupby('product_id').agg(
+        total_quantity=('quantity', 'sum'), total_revenue=('sales_value', 'sum')
+    )
+    return households, pet_baskets, pet_pairs, commodity_spend, product_totals
+
+# 가구/펫 카테고리/매출 부분 집계를 모아 두었다가 합치는 청크 수
+# (키 수로 크기가 정해지는 집계만 주기적으로 합치고, 데이터에 비례해 늘어나는 펫 장바구니는 마지막에 한 번만 중복 제거)
+PARTIAL_COMPACT_CHUNKS = 16
+
+def _combine_partials(partials):
+    """청크별 (가구, 펫 카테고리 쌍, 카테고리 매출, 제품 합계) 부분 집계 목록을 한 번에 합침"""
+    households, pet_pairs, commodity_spend, product_totals = (pd.concat(parts) for parts in zip(*partials))
+    return (
+        households.groupby(level=0).agg(HOUSEHOLD_STATE_AGG),
+        pet_pairs.drop_duplicates(),
+        commodity_spend.groupby(level=[0, 1]).sum(),
+        product_totals.groupby(level=0).sum(),
+    )
+
+def _pet_category_masks(pet_pairs):
+    """(가구, 펫 카테고리 코드) 쌍을 가구별 비트마스크로 변환 (쌍은 중복 제거된 상태여야 함)"""
+    masks = np.int64(1) << pet_pairs['pet_code'].to_numpy(dtype=np.int64)
+    return pd.Series(masks, index=pet_pairs['household_key'].to_numpy()).groupby(level=0).sum()
+
+def _pet_category_strings(pet_masks, labels):
+    """가구별 펫 카테고리 비트마스크를 마스크 단위로 한 번만 문자열로 변환"""
+    unique_masks, mask_codes = np.unique(pet_masks.to_numpy(), return_inverse=True)
+    mask_strings = [', '.join(label for bit, label in enumerate(labels) if mask >> bit & 1) for mask in unique_masks]
+    string_codes, mask_strings = pd.factorize(pd.Series(mask_strings, dtype=object))
+    return pd.Series(pd.Categorical.from_codes(string_codes[mask_codes], list(mask_strings)),
+                     index=pet_masks.index)
+
+def build_frequency_changes(commodity_spend, frequency_category, top_n=10):
+    """빈도 하위 등급 대비 상위 등급 가구의 카테고리별 평균 매출 차이 (상향 잠재력)"""
+    tier = pd.Series(
+        np.where(frequency_category.isin(UPPER_FREQUENCY_TIERS), 'target',
+                 np.where(frequency_category.isin(LOWER_FREQUENCY_TIERS), 'current', '')),
+        index=frequency_category.index
+    )
+    tier_sizes = tier.value_counts()
+    household_tier = tier.reindex(commodity_spend.index.get_level_values(0)).to_numpy()
+    grouped = commodity_spend.groupby([commodity_spend.index.get_level_values(1), household_tier]).sum().unstack(fill_value=0.0)
+    for column in ('current', 'target'):
+        if column not in grouped.columns:
+            grouped[column] = 0.0
+
+    changes = pd.DataFrame({
+        'category': grouped.index.to_numpy(),
+        'current_sales': (grouped['current'] / max(tier_sizes.get('current', 0), 1)).round(2).to_numpy(),
+        'target_sales': (grouped['target'] / max(tier_sizes.get('target', 0), 1)).round(2).to_numpy(),
+    })
+    changes['sales_change'] = (changes['target_sales'] - changes['current_sales']).round(2)
+    changes['percentage_change'] = (changes['sales_change'] / changes['current_sales'].where(changes['current_sales'] > 0) * 100).round(2)
+    changes['level'] = 'middle'
+    return changes.dropna().sort_values('sales_change', ascending=False).head(top_n).reset_index(drop=True)
+
+def _monthly_transactions(monthly_pet_baskets):
+    """월평균 펫 장바구니 수를 구매 빈도 분류용 값으로 반올림 (1 미만은 소수 첫째 자리)"""
+    return np.where(monthly_pet_baskets < 1, np.round(monthly_pet_baskets, 1), np.round(monthly_pet_baskets, 0))
+
+def _build_customer_tables(households, pet_basket_counts, pet_masks, commodity_spend, product_totals,
+                           product_df, pet_labels, data_dir):
+    """가구/제품 누적 집계로부터 (pet_customers, frequency_changes, products) 생성"""
+    # 펫 상품 구매 가구만 대상으로 가구 지표 계산
+    households = households[households['pet_spend'] > 0]
+    months = max((households['last_day'].max() - households['first_day'].min() + 1) / 30, 1)
+    monthly_pet_baskets = pet_basket_counts.reindex(households.index, fill_value=0) / months
+    pet_transactions = _monthly_transactions(monthly_pet_baskets.to_numpy())
+
+    pet_customers = pd.DataFrame({
+        'household_key': households.index.to_numpy(),
+        'pet_transactions': pet_transactions,
+        'pet_spend': households['pet_spend'].round(2).to_numpy(),
+        'total_spend': households['total_spend'].round(2).to_numpy(),
+        'pet_categories': _pet_category_strings(pet_masks, pet_labels).reindex(households.index).values,
+        'club_plus_member': households['coupon_used'].to_numpy(dtype=bool),  # 쿠폰 사용 가구를 Club+ 로 간주
+        # 마지막 구매일은 누적된 마지막 거래일 기준 (데이터 상 가장 최근 거래일 대비 경과일)
+        'last_purchase_days': (households['last_day'].max() - households['last_day']).to_numpy(),
+        'phone_number': 0,  # 추출 파일에는 연락처가 없음
+    })
+    pet_customers['household_size'] = estimate_household_size_array(pet_customers['total_spend'])
+    household_path = find_extract(data_dir, HOUSEHOLD_EXTRACT)
+    if household_path is not None:
+        demographic = read_extract(household_path, HOUSEHOLD_COLUMNS).set_index('household_key')['household_size_desc']
+        size_codes = pd.to_numeric(demographic.astype(str).str.rstrip('+'), errors='coerce').clip(1, 4) - 1
+        known_size = size_codes.reindex(pet_customers['household_key']).to_numpy()
+        codes = np.where(np.isnan(known_size), pet_customers['household_size'].cat.codes, np.nan_to_num(known_size))
+        pet_customers['household_size'] = pd.Categorical.from_codes(codes.astype(np.int64), HOUSEHOLD_SIZE_LABELS)
+    pet_customers['pet_profile'] = estimate_pet_profile_array(pet_customers['pet_categories'], pet_customers['pet_spend'])
+    pet_customers = compact_pet_customers(pet_customers)
+
+    frequency_category = pd.Series(
+        classify_frequency_array(pet_customers['pet_transactions']).to_numpy(), index=households.index
+    )
+    pet_commodity_spend = commodity_spend[commodity_spend.index.get_level_values(0).isin(households.index)]
+    frequency_changes = build_frequency_changes(pet_commodity_spend, frequency_category)
+
+    products = product_df.set_index('product_id').join(product_totals, how='inner').reset_index()
+    products = products.rename(columns={
+        'department': 'major_category', 'commodity_desc': 'middle_category', 'sub_commodity_desc': 'small_category'
+    })[['product_id', 'major_category', 'middle_category', 'small_category', 'total_quantity', 'total_revenue']]
+    products['total_revenue'] = products['total_revenue'].round(2)
+
+    return pet_customers, frequency_changes, products
+
+def load_product_extract(data_dir):
+    """product 추출 파일 읽기 (상품 ID 중복 제거)"""
+    product_path = find_extract(data_dir, PRODUCT_EXTRACT)
+    if product_path is None:
+        raise FileNotFoundError(f"{data_dir} 에 {PRODUCT_EXTRACT} 추출 파일이 없습니다.")
+    return read_extract(product_path, PRODUCT_COLUMNS).drop_duplicates('product_id')
+
+def load_transaction_extracts(data_dir, chunksize=1_000_000):
+    """Dunnhumby 형식 추출 파일을 스트리밍 집계하여 (pet_customers, frequency_changes, products) 반환"""
+    transaction_path = find_extract(data_dir, TRANSACTION_EXTRACT)
+    if transaction_path is None:
+        raise FileNotFoundError(f"{data_dir} 에 {TRANSACTION_EXTRACT} 추출 파일이 없습니다.")
+    product_df = load_product_extract(data_dir)
+    product_lookup = build_product_lookup(product_df)
+
+    partials, pet_baskets = [], []
+    for chunk in iter_extract_chunks(transaction_path, TRANSACTION_COLUMNS, chunksize):
+        households, baskets, pet_pairs, commodity_spend, product_totals = _aggregate_transaction_chunk(chunk, product_lookup)
+        pet_baskets.append(baskets)
+        partials.append((households, pet_pairs, commodity_spend, product_totals))
+        if len(partials) >= PARTIAL_COMPACT_CHUNKS:
+            partials = [_combine_partials(partials)]
+    if not partials:
+        raise ValueError(f"{transaction_path} 에 트랜잭션이 없습니다.")
+    households, pet_pairs, commodity_spend, product_totals = _combine_partials(partials)
+    # 청크 경계에 걸친 장바구니는 전체를 모은 뒤 한 번만 중복 제거
+    pet_basket_counts = pd.concat(pet_baskets).drop_duplicates().groupby('household_key').size()
+
+    return _build_customer_tables(
+        households, pet_basket_counts, _pet_category_masks(pet_pairs),
+        commodity_spend, product_totals, product_df, product_lookup[2], data_dir
+    )
+
+# === 증분 집계 (가구별 누적 상태를 SQLite 에 저장하고 새 배치만 반영) ===
+# data_dir/transaction_batches 아래 배치 파일(예: 일자별 .parquet/.csv)을 파일명 순으로 반영
+TRANSACTION_BATCH_DIR = 'transaction_batches'
+HOUSEHOLD_STATE_FILE = 'household_state.sqlite'
+# 다른 프로세스가 배치를 반영하는 동안 쓰기 잠금을 기다리는 최대 시간 (초)
+HOUSEHOLD_STATE_LOCK_TIMEOUT = 600
+
+HOUSEHOLD_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS household_state (
+    household_key INTEGER PRIMARY KEY,
+    total_spend REAL NOT NULL,
+    pet_spend REAL NOT NULL,
+    first_day INTEGER NOT NULL,
+    last_day INTEGER NOT NULL,
+    coupon_used INTEGER NOT NULL,
+    pet_mask INTEGER NOT NULL DEFAULT 0,
+    pet_baskets INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS pet_baskets (
+    household_key INTEGER NOT NULL,
+    basket_id INTEGER NOT NULL,
+    PRIMARY KEY (household_key, basket_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS commodity_spend (
+    household_key INTEGER NOT NULL,
+    commodity TEXT NOT NULL,
+    sales REAL NOT NULL,
+    PRIMARY KEY (household_key, commodity)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS product_totals (
+    product_id INTEGER PRIMARY KEY,
+    total_quantity REAL NOT NULL,
+    total_revenue REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS applied_batches (
+    batch_id TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+"""
+
+def sql_rows(frame):
+    """DataFrame 을 sqlite3 바인딩용 파이썬 기본형 튜플 목록으로 변환"""
+    return list(zip(*(frame[column].tolist() for column in frame.columns)))
+
+def _fold_partial(conn, partial):
+    """청크 부분 집계 하나를 누적 상태 테이블에 upsert"""
+    households, pet_baskets, pet_pairs, commodity_spend, product_totals = partial
+    households = households.join(_pet_category_masks(pet_pairs).rename('pet_mask')).fillna({'pet_mask': 0})
+    households['coupon_used'] = households['coupon_used'].astype(np.int64)
+    households['pet_mask'] = households['pet_mask'].astype(np.int64)
+    conn.executemany("""
+        INSERT INTO household_state (household_key, total_spend, pet_spend, first_day, last_day, coupon_used, pet_mask)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(household_key) DO UPDATE SET
+            total_spend = total_spend + excluded.total_spend,
+            pet_spend = pet_spend + excluded.pet_spend,
+            first_day = MIN(first_day, excluded.first_day),
+            last_day = MAX(last_day, excluded.last_day),
+            coupon_used = MAX(coupon_used, excluded.coupon_used),
+            pet_mask = pet_mask | excluded.pet_mask
+    """, sql_rows(households.reset_index()[[
+        'household_key', 'total_spend', 'pet_spend', 'first_day', 'last_day', 'coupon_used', 'pet_mask'
+    ]]))
+
+    # 이전 배치/청크에서 이미 센 장바구니는 제외하고 가구별 펫 구매 횟수 증가
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS batch_baskets (
+            household_key INTEGER, basket_id INTEGER, PRIMARY KEY (household_key, basket_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("DELETE FROM batch_baskets")
+    conn.executemany("INSERT INTO batch_baskets VALUES (?, ?)", sql_rows(pet_baskets))
+    conn.execute("""
+        UPDATE household_state SET pet_baskets = pet_baskets + (
+            SELECT COUNT(*) FROM batch_baskets b
+            WHERE b.household_key = household_state.household_key
+              AND NOT EXISTS (SELECT 1 FROM pet_baskets p
+                              WHERE p.household_key = b.household_key AND p.basket_id = b.basket_id)
+        )
+        WHERE household_key IN (SELECT household_key FROM batch_baskets)
+    """)
+    conn.execute("INSERT OR IGNORE INTO pet_baskets SELECT household_key, basket_id FROM batch_baskets")
+
+    conn.executemany("""
+        INSERT INTO commodity_spend (household_key, commodity, sales) VALUES (?, ?, ?)
+        ON CONFLICT(household_key, commodity) DO UPDATE SET sales = sales + excluded.sales
+    """, sql_rows(commodity_spend.reset_index()))
+    conn.executemany("""
+        INSERT INTO product_totals (product_id, total_quantity, total_revenue) VALUES (?, ?, ?)
+        ON CONFLICT(product_id) DO UPDATE SET
+            total_quantity = total_quantity + excluded.total_quantity,
+            total_revenue = total_revenue + excluded.total_revenue
+    """, sql_rows(product_totals.reset_index()))
+
+def fold_transaction_batch(state_path, batch_path, product_lookup, batch_id=None, chunksize=1_000_000):
+    """트랜잭션 배치 하나를 누적 상태에 반영 (배치 단위 트랜잭션, 이미 반영된 batch_id 는 건너뜀)
+
+    반영 여부 확인 전에 쓰기 잠금(BEGIN IMMEDIATE)을 잡으므로 여러 프로세스가 동시에 불러도
+    한 프로세스만 반영하고 나머지는 잠금이 풀린 뒤 반영된 배치로 보고 건너뛴다.
+    """
+    batch_id = batch_id or os.path.basename(batch_path)
+    with closing(sqlite3.connect(state_path, timeout=HOUSEHOLD_STATE_LOCK_TIMEOUT)) as conn:
+        conn.executescript(HOUSEHOLD_STATE_SCHEMA)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM applied_batches WHERE batch_id = ?", (batch_id,)).fetchone():
+                return False
+            row_count = 0
+            for chunk in iter_extract_chunks(batch_path, TRANSACTION_COLUMNS, chunksize):
+                _fold_partial(conn, _aggregate_transaction_chunk(chunk, product_lookup))
+                row_count += len(chunk)
+            conn.execute(
+                "INSERT INTO applied_batches VALUES (?, ?, ?)",
+                (batch_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), row_count)
+            )
+    return True
+
+def list_transaction_batches(data_dir):
+    """반영 대상 배치 파일 목록 (파일명 순)"""
+    batch_dir = os.path.join(data_dir, TRANSACTION_BATCH_DIR)
+    if not os.path.isdir(batch_dir):
+        return []
+    return [os.path.join(batch_dir, name) for name in sorted(os.listdir(batch_dir))
+            if name.endswith(('.parquet', '.csv'))]
+
+def refresh_household_state(data_dir, state_path=None, chunksize=1_000_000):
+    """아직 반영되지 않은 배치 파일만 누적 상태에 반영하고 반영된 배치 ID 목록 반환"""
+    state_path = state_path or os.path.join(data_dir, HOUSEHOLD_STATE_FILE)
+    product_lookup = build_product_lookup(load_product_extract(data_dir))
+    return [os.path.basename(path) for path in list_transaction_batches(data_dir)
+            if fold_transaction_batch(state_path, path, product_lookup, chunksize=chunksize)]
+
+def load_household_state(data_dir, state_path=None):
+    """누적 상태에서 (pet_customers, frequency_changes, products) 생성"""
+    state_path = state_path or os.path.join(data_dir, HOUSEHOLD_STATE_FILE)
+    product_df = load_product_extract(data_dir)
+    with closing(sqlite3.connect(state_path)) as conn:
+        state = pd.read_sql_query("SELECT * FROM household_state", conn, index_col='household_key')
+        commodity_spend = pd.read_sql_query(
+            "SELECT household_key, commodity, sales FROM commodity_spend", conn,
+            index_col=['household_key', 'commodity']
+        )['sales']
+        product_totals = pd.read_sql_query("SELECT * FROM product_totals", conn, index_col='product_id')
+    if state.empty:
+        raise ValueError(f"{state_path} 에 반영된 트랜잭션이 없습니다.")
+
+    _, pet_labels = classify_pet_products(product_df)
+    return _build_customer_tables(
+        state[list(HOUSEHOLD_STATE_AGG)].astype({'coupon_used': bool}), state['pet_baskets'], state['pet_mask'],
+        commodity_spend, product_totals, product_df, pet_labels, data_dir
+    )
+
+# === 주기상향 효과 배치 계산 (전반기 하위 등급 → 후반기 상위 등급으로 이동한 가구 코호트 비교) ===
+FREQUENCY_UPLIFT_EXTRACT = 'frequency_uplift'
+FREQUENCY_UPLIFT_COLUMNS = [
+    'level', 'category', 'current_sales', 'target_sales', 'sales_change',
+    'percentage_change', 'control_change', 'movers'
+]
+# 상품 분류 수준 → product 추출 파일 컬럼 (대/중/소분류)
+CATEGORY_LEVELS = {'major': 'department', 'middle': 'commodity_desc', 'small': 'sub_commodity_desc'}
+CATEGORY_LEVEL_LABELS = {'major': '대분류', 'middle': '중분류', 'small': '소분류'}
+
+def _product_hierarchy(product_df):
+    """상품 인덱스, 상품별 소분류 코드, 소분류 코드 → 대/중/소분류 라벨 표"""
+    hierarchy = product_df[list(CATEGORY_LEVELS.values())].fillna('NO DESCRIPTION').astype(str)
+    small_codes, small_keys = pd.factorize(pd.MultiIndex.from_frame(hierarchy))
+    return pd.Index(product_df['product_id']), small_codes, pd.DataFrame(small_keys.tolist(), columns=hierarchy.columns)
+
+def _aggregate_uplift_chunk(chunk, product_index, product_small_codes, pet_products, split_day):
+    """트랜잭션 청크를 (가구, 기간, 소분류) 매출과 (가구, 장바구니, 기간) 펫 장바구니로 축약"""
+    product_pos = product_index.get_indexer(chunk['product_id'])
+    known = product_pos >= 0
+    household_keys = chunk['household_key'].to_numpy()
+    period = (chunk['day'].to_numpy() >= split_day).astype(np.int8)
+    category_spend = pd.Series(
+        chunk['sales_value'].to_numpy(dtype=np.float64)[known],
+        index=pd.MultiIndex.from_arrays(
+            [household_keys[known], period[known], product_small_codes[product_pos[known]]],
+            names=['household_key', 'period', 'small_code']
+        )
+    ).groupby(level=[0, 1, 2]).sum()
+    is_pet = known & pet_products[np.where(known, product_pos, 0)]
+    pet_baskets = pd.DataFrame({
+        'household_key': household_keys[is_pet],
+        'basket_id': chunk['basket_id'].to_numpy()[is_pet],
+        'period': period[is_pet],
+    }).drop_duplicates()
+    return category_spend, pet_baskets
+
+def build_frequency_uplift(data_dir, chunksize=1_000_000, split_day=None):
+    """빈도 등급 상향 가구의 대/중/소분류별 월평균 매출 변화
+
+    기간을 split_day(기본: 거래일 범위 중간) 전후로 나누어 기간별 펫 구매 빈도 등급을 매기고,
+    전반기 하위 등급 → 후반기 상위 등급 가구(상향 가구)의 전/후 월평균 매출(current/target_sales)과
+    하위 등급 유지 가구의 변화(control_change)를 비교한다. sales_change 는 유지 가구 변화를 뺀 증분이다.
+    category 는 상위 분류부터 이은 경로('대분류 > 중분류 > 소분류')라 이름이 같은 하위 분류도 구분된다.
+    """
+    transaction_paths = list_transaction_batches(data_dir) or [find_extract(data_dir, TRANSACTION_EXTRACT)]
+    if transaction_paths[0] is None:
+        raise FileNotFoundError(f"{data_dir} 에 {TRANSACTION_EXTRACT} 추출 파일이 없습니다.")
+    product_df = load_product_extract(data_dir)
+    product_index, product_small_codes, small_categories = _product_hierarchy(product_df)
+    pet_products = classify_pet_products(product_df)[0] >= 0
+
+    # 거래일 범위 (day 컬럼만 읽는 가벼운 1차 패스)
+    day_ranges = [(chunk['day'].min(), chunk['day'].max())
+                  for path in transaction_paths for chunk in iter_extract_chunks(path, ['day'], chunksize)]
+    if not day_ranges:
+        raise ValueError(f"{data_dir} 에 트랜잭션이 없습니다.")
+    first_day, last_day = min(r[0] for r in day_ranges), max(r[1] for r in day_ranges)
+    split_day = split_day if split_day is not None else (first_day + last_day + 1) // 2
+    months = np.maximum(np.array([split_day - first_day, last_day - split_day + 1]) / 30, 1)
+
+    # 청크별 부분 집계를 모아 합침 (매출은 PARTIAL_COMPACT_CHUNKS 마다 합산, 펫 장바구니는 마지막에 한 번만 중복 제거)
+    spend_parts, basket_parts = [], []
+    for path in transaction_paths:
+        for chunk in iter_extract_chunks(path, TRANSACTION_COLUMNS, chunksize):
+            spend_part, basket_part = _aggregate_uplift_chunk(
+                chunk, product_index, product_small_codes, pet_products, split_day
+            )
+            spend_parts.append(spend_part)
+            basket_parts.append(basket_part)
+            if len(spend_parts) >= PARTIAL_COMPACT_CHUNKS:
+                spend_parts = [pd.concat(spend_parts).groupby(level=[0, 1, 2]).sum()]
+    category_spend = pd.concat(spend_parts).groupby(level=[0, 1, 2]).sum()
+    pet_baskets = pd.concat(basket_parts).drop_duplicates()
+
+    # 기간별 빈도 등급 → 상향 가구 / 하위 유지 가구
+    basket_counts = pet_baskets.groupby(['household_key', 'period']).size().unstack(fill_value=0)
+    basket_counts = basket_counts.reindex(columns=[0, 1], fill_value=0)
+    tiers = [classify_frequency_array(_monthly_transactions(basket_counts[period].to_numpy() / months[period]))
+             for period in (0, 1)]
+    lower_before = np.isin(tiers[0], LOWER_FREQUENCY_TIERS)
+    cohorts = pd.Series(
+        np.select([lower_before & np.isin(tiers[1], UPPER_FREQUENCY_TIERS),
+                   lower_before & np.isin(tiers[1], LOWER_FREQUENCY_TIERS)],
+                  ['movers', 'stayers'], default=''),
+        index=basket_counts.index
+    )
+    cohort_sizes = cohorts.value_counts()
+    if cohort_sizes.get('movers', 0) == 0:
+        return pd.DataFrame(columns=FREQUENCY_UPLIFT_COLUMNS)
+
+    # 코호트 × 소분류 기간별 월평균 매출 합계 (가구 수로 나누기 전)
+    monthly_spend = category_spend.unstack('period', fill_value=0.0).reindex(columns=[0, 1], fill_value=0.0) / months
+    household_cohort = cohorts.reindex(monthly_spend.index.get_level_values('household_key')).fillna('').to_numpy()
+    cohort_spend = monthly_spend[household_cohort != ''].groupby(
+        [household_cohort[household_cohort != ''], monthly_spend.index.get_level_values('small_code')[household_cohort != '']]
+    ).sum()
+
+    levels = []
+    hierarchy_columns = list(CATEGORY_LEVELS.values())
+    for depth, level in enumerate(CATEGORY_LEVELS, start=1):
+        # 분류 경로로 묶음 ('MISC' 처럼 여러 상위 분류에 같은 이름으로 있는 하위 분류를 합치지 않도록)
+        category_paths = small_categories[hierarchy_columns[:depth]].agg(' > '.join, axis=1).to_numpy()
+        by_category = cohort_spend.groupby(
+            [cohort_spend.index.get_level_values(0), category_paths[cohort_spend.index.get_level_values(1)]]
+        ).sum()
+        per_household = by_category.div(
+            cohort_sizes.reindex(by_category.index.get_level_values(0)).to_numpy(), axis=0
+        )
+        movers = per_household.loc['movers']
+        stayers = per_household.loc['stayers'] if 'stayers' in cohort_sizes else movers * 0
+        stayers = stayers.reindex(movers.index, fill_value=0.0)
+        control_change = stayers[1] - stayers[0]
+        changes = pd.DataFrame({
+            'level': level,
+            'category': movers.index.to_numpy(),
+            'current_sales': movers[0].round(2).to_numpy(),
+            'target_sales': movers[1].round(2).to_numpy(),
+            'sales_change': (movers[1] - movers[0] - control_change).round(2).to_numpy(),
+            'control_change': control_change.round(2).to_numpy(),
+            'movers': int(cohort_sizes['movers']),
+        })
+        changes['percentage_change'] = (
+            changes['sales_change'] / changes['current_sales'].where(changes['current_sales'] > 0) * 100
+        ).round(2)
+        levels.append(changes.dropna().sort_values('sales_change', ascending=False))
+    return pd.concat(levels, ignore_index=True)[FREQUENCY_UPLIFT_COLUMNS]
+
+def save_frequency_uplift(frequency_uplift, data_dir):
+    """주기상향 효과 계산 결과 저장 (pyarrow 가 있으면 Parquet, 없으면 CSV)"""
+    path = os.path.join(data_dir, FREQUENCY_UPLIFT_EXTRACT)
+    try:
+        frequency_uplift.to_parquet(path + '.parquet', index=False)
+        return path + '.parquet'
+    except ImportError:
+        frequency_uplift.to_csv(path + '.csv', index=False)
+        return path + '.csv'
+
+def load_frequency_uplift(data_dir):
+    """저장된 주기상향 효과 계산 결과 (없거나 비어 있으면 None)"""
+    path = find_extract(data_dir, FREQUENCY_UPLIFT_EXTRACT)
+    if path is None:
+        return None
+    frequency_uplift = read_extract(path, FREQUENCY_UPLIFT_COLUMNS)
+    return frequency_uplift if not frequency_uplift.empty else None
+
+def dataset_version(data_dir):
+    """추출/배치 파일의 수정 시각/크기로 데이터셋 버전 식별 (캐시 키)"""
+    paths = [find_extract(data_dir, name)
+             for name in (TRANSACTION_EXTRACT, PRODUCT_EXTRACT, HOUSEHOLD_EXTRACT, FREQUENCY_UPLIFT_EXTRACT)]
+    paths += list_transaction_batches(data_dir)
+    return tuple((p, os.path.getmtime(p), os.path.getsize(p)) for p in paths if p is not None)
+
+def source_fingerprint(customer_count=None, data_dir=None):
+    """원천 데이터 식별 정보와 그 해시 (같은 원천이면 같은 해시)"""
+    source = {
+        'customer_count': customer_count,
+        'data_dir': os.path.abspath(data_dir) if data_dir else None,
+        'data_version': dataset_version(data_dir) if data_dir else None,
+    }
+    return source, hashlib.sha1(json.dumps(source, default=str).encode('utf-8')).hexdigest()[:8]
+
+# 고객 구매 빈도 분류 함수
+def classify_frequency(monthly_transactions):
+    if monthly_transactions < 1:
+        return "한달이상"
+    elif monthly_transactions <= 2:
+        return "월간구매"
+    elif monthly_transactions == 3:
+        return "저빈도"
+    elif monthly_transactions == 4:
+        return "고빈도"
+    elif monthly_transactions <= 6:
+        return "주간구매"
+    else:
+        return "초고빈도"
+
+# 구매 빈도 등급 (낮은 빈도 → 높은 빈도 순)
+FREQUENCY_LABELS = ["한달이상", "월간구매", "저빈도", "고빈도", "주간구매", "초고빈도"]
+
+def classify_frequency_array(monthly_transactions):
+    """classify_frequency 의 배열 버전 (빈도 순서가 있는 Categorical 반환)"""
+    values = np.asarray(monthly_transactions, dtype=np.float64)
+    codes = np.select(
+        [values < 1, values <= 2, values == 3, values == 4, values <= 6],
+        [0, 1, 2, 3, 4],
+        default=5
+    )
+    return _categorical_result(codes, FREQUENCY_LABELS, monthly_transactions, ordered=True)
+
+# 펫 지출 구간 (대시보드 분포 차트 기준)
+PET_SPEND_BINS = [0, 25, 50, 100, np.inf]
+PET_SPEND_LABELS = ['£0-25', '£25-50', '£50-100', '£100+']
+
+def enrich_pet_customers(pet_customers):
+    """페이지 공통 파생 컬럼 계산 (구매 빈도, 펫 지출 구간, 펫 지출 비율)"""
+    pet_customers = pet_customers.copy()
+    pet_customers['pet_ratio'] = (pet_customers['pet_spend'] / pet_customers['total_spend'] * 100).round(2)
+    pet_customers['frequency_category'] = classify_frequency_array(pet_customers['pet_transactions'])
+    pet_customers['spend_range'] = pd.cut(
+        pet_customers['pet_spend'], bins=PET_SPEND_BINS, labels=PET_SPEND_LABELS, include_lowest=True
+    )
+    return pet_customers
+
+
+def load_customer_tables(customer_count=None, data_dir=None):
+    """데이터 원천별 (pet_customers, frequency_changes, products, phone_vault) 적재 (파생 컬럼 계산 전)
+
+    data_dir 에 증분 배치가 있으면 누적 상태, 추출 파일만 있으면 전체 집계, 없으면 샘플 생성.
+    전화번호는 여기서 토큰화해 고객 표에는 phone_token/phone_mask 만 남기고 원번호는 phone_vault 로 분리한다.
+    토큰 배정 순서는 원천 데이터 해시로 정하므로 같은 원천이면 프로세스나 캐시 재적재와 관계없이 같은 토큰이
+    같은 번호를 가리킨다 (원천이 바뀌면 토큰도 바뀜).
+    """
+    _, fingerprint = source_fingerprint(customer_count, data_dir)
+    if data_dir and list_transaction_batches(data_dir):
+        refresh_household_state(data_dir)
+        pet_customers, frequency_changes, products = load_household_state(data_dir)
+    elif data_dir:
+        pet_customers, frequency_changes, products = load_transaction_extracts(data_dir)
+    else:
+        pet_customers, frequency_changes, products = load_sample_data(customer_count)
+    # 배치로 계산해 둔 주기상향 효과가 있으면 등급 간 단면 비교 대신 사용
+    frequency_uplift = load_frequency_uplift(data_dir) if data_dir else None
+    if frequency_uplift is not None:
+        frequency_changes = frequency_uplift
+    pet_customers, phone_vault = tokenize_phone_numbers(pet_customers, seed=int(fingerprint, 16))
+    return pet_customers, frequency_changes, products, phone_vault
+
+def build_customer_data(customer_count=None, data_dir=None):
+    """적재 후 페이지 공통 파생 컬럼까지 계산한 (pet_customers, frequency_changes, products, phone_vault)"""
+    with timer('load_customer_tables'):
+        pet_customers, frequency_changes, products, phone_vault = load_customer_tables(customer_count, data_dir)
+    with timer('enrich_pet_customers'):
+        return enrich_pet_customers(pet_customers), frequency_changes, products, phone_vault
@@ -0,0 +1,271 @@
+"""A/B 테스트 (해시 기반 실험군 배정, 실험군별 충분통계량, 검정, 실험 저장소)"""
+import collections
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# === A/B 테스트 (해시 기반 배정, 가구별 기준 지출 스냅샷, 실험군별 충분통계량) ===
+EXPERIMENT_BUCKETS = 10_000
+EXPERIMENT_ARMS = ['대조군', '실험군']
+EXPERIMENT_KPIS = ["펫 구매 전환율", "펫 지출 증가"]
+# 실험 시작 이후 펫 지출 증가분 히스토그램 구간 (부트스트랩은 구간별 건수/합계로 재표본)
+EXPERIMENT_SPEND_BINS = np.concatenate([[-np.inf, 0.0], np.geomspace(1, 10_000, 40), [np.inf]])
+EXPERIMENT_BOOTSTRAP_DRAWS = 2000
+EXPERIMENT_ALPHA = 0.05
+# 메모리에 둘 실험 대상 배열(가구 ID, 시작 시점 지출, 실험군 여부) 수 — 대상은 실험 시작 후 바뀌지 않음
+EXPERIMENT_BASELINE_CACHE_SIZE = 8
+
+EXPERIMENT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    experiment_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    hypothesis TEXT,
+    kpi TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    treatment_share REAL NOT NULL,
+    message_type TEXT,
+    job_id TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS experiment_baselines (
+    experiment_id TEXT NOT NULL,
+    household_key INTEGER NOT NULL,
+    baseline_pet_spend REAL NOT NULL,
+    PRIMARY KEY (experiment_id, household_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS experiment_stats (
+    experiment_id TEXT NOT NULL,
+    arm INTEGER NOT NULL,
+    data_version TEXT NOT NULL,
+    households INTEGER NOT NULL,
+    delivered INTEGER NOT NULL,
+    conversions INTEGER NOT NULL,
+    spend_sum REAL NOT NULL,
+    spend_sq_sum REAL NOT NULL,
+    bin_counts TEXT NOT NULL,
+    bin_sums TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (experiment_id, arm)
+);
+"""
+
+def _experiment_salt(experiment_id):
+    digest = hashlib.blake2b(experiment_id.encode('utf-8'), digest_size=8).digest()
+    return np.uint64(int.from_bytes(digest, 'little'))
+
+def assign_experiment_arms(household_keys, experiment_id, treatment_share):
+    """household_key 해시로 실험군 여부 배정 (실험 ID 가 같으면 항상 같은 결과, 조회 테이블 없음)"""
+    # splitmix64 마무리 함수로 (가구 ID ^ 실험 솔트) 를 섞은 뒤 버킷으로 분할
+    x = np.asarray(household_keys).astype(np.uint64) ^ _experiment_salt(experiment_id)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return (x % np.uint64(EXPERIMENT_BUCKETS)) < np.uint64(round(treatment_share * EXPERIMENT_BUCKETS))
+
+def experiment_arm_statistics(is_treatment, spend_delta, delivered):
+    """대조군/실험군별 충분통계량 (가구 수, 발송 성공, 전환 수, 지출 합/제곱합, 지출 히스토그램)"""
+    arms = np.asarray(is_treatment).astype(np.int64)
+    spend_delta = np.asarray(spend_delta, dtype=np.float64)
+    bin_count = len(EXPERIMENT_SPEND_BINS) - 1
+    bins = np.searchsorted(EXPERIMENT_SPEND_BINS, spend_delta, side='right') - 1
+    cells = arms * bin_count + bins
+    return pd.DataFrame({
+        'households': np.bincount(arms, minlength=2),
+        'delivered': np.bincount(arms, weights=delivered, minlength=2).astype(np.int64),
+        'conversions': np.bincount(arms, weights=spend_delta > 0, minlength=2).astype(np.int64),
+        'spend_sum': np.bincount(arms, weights=spend_delta, minlength=2),
+        'spend_sq_sum': np.bincount(arms, weights=spend_delta ** 2, minlength=2),
+        'bin_counts': list(np.bincount(cells, minlength=2 * bin_count).reshape(2, bin_count)),
+        'bin_sums': list(np.bincount(cells, weights=spend_delta, minlength=2 * bin_count).reshape(2, bin_count)),
+    }, index=pd.Index([0, 1], name='arm'))
+
+def two_proportion_ztest(success_a, n_a, success_b, n_b):
+    """두 비율 차이 z-검정 (배열 입력 가능), (z, 양측 p-value)"""
+    success_a, n_a, success_b, n_b = (np.asarray(v, dtype=np.float64) for v in (success_a, n_a, success_b, n_b))
+    pooled = np.divide(success_a + success_b, n_a + n_b, out=np.zeros_like(n_a), where=(n_a + n_b) > 0)
+    se = np.sqrt(pooled * (1 - pooled) * (np.divide(1, n_a, out=np.zeros_like(n_a), where=n_a > 0) +
+                                          np.divide(1, n_b, out=np.zeros_like(n_b), where=n_b > 0)))
+    diff = (np.divide(success_b, n_b, out=np.zeros_like(n_b), where=n_b > 0) -
+            np.divide(success_a, n_a, out=np.zeros_like(n_a), where=n_a > 0))
+    z = np.divide(diff, se, out=np.zeros_like(se), where=se > 0)
+    return z, np.asarray(np.frompyfunc(math.erfc, 1, 1)(np.abs(z) / math.sqrt(2)), dtype=np.float64)
+
+def bootstrap_mean_difference(counts_a, sums_a, counts_b, sums_b, draws=EXPERIMENT_BOOTSTRAP_DRAWS, seed=0):
+    """히스토그램 충분통계량으로 평균 차이(B - A) 부트스트랩 (구간별 건수를 다항분포로 재표본)"""
+    rng = np.random.default_rng(seed)
+
+    def resample(counts, sums):
+        counts, sums = np.asarray(counts, dtype=np.float64), np.asarray(sums, dtype=np.float64)
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(draws)
+        bin_means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+        return rng.multinomial(total, counts / total, size=draws) @ bin_means / total
+
+    return resample(counts_b, sums_b) - resample(counts_a, sums_a)
+
+def analyze_experiment(stats, draws=EXPERIMENT_BOOTSTRAP_DRAWS):
+    """충분통계량으로 전환율 z-검정과 지출 증가 부트스트랩 결과 계산"""
+    control, treatment = stats.loc[0], stats.loc[1]
+    z, p_value = two_proportion_ztest(control['conversions'], control['households'],
+                                      treatment['conversions'], treatment['households'])
+    differences = bootstrap_mean_difference(control['bin_counts'], control['bin_sums'],
+                                            treatment['bin_counts'], treatment['bin_sums'], draws)
+    tail = EXPERIMENT_ALPHA / 2
+    return {
+        'z': float(z), 'p_value': float(p_value),
+        'spend_difference': float(differences.mean()),
+        'spend_interval': tuple(float(v) for v in np.quantile(differences, [tail, 1 - tail])),
+        'spend_p_value': float(min(1.0, 2 * min((differences <= 0).mean(), (differences >= 0).mean()))),
+    }
+
+class ExperimentStore:
+    """실험 정의/기준 스냅샷/실험군별 통계 저장소 (발송 기록과 같은 SQLite 파일을 사용해 발송 기록과 조인)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._baseline_cache = collections.OrderedDict()
+        self._baseline_lock = threading.Lock()
+        with closing(sqlite3.connect(self.path, timeout=30)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(EXPERIMENT_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def create(self, experiment, household_keys, baseline_pet_spend):
+        """실험 정의와 대상 가구의 시작 시점 펫 지출 저장"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO experiments VALUES (:experiment_id, :name, :hypothesis, :kpi, :segment, "
+                ":treatment_share, :message_type, :job_id, :created_at)",
+                {'job_id': None, 'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **experiment}
+            )
+            conn.executemany(
+                "INSERT INTO experiment_baselines VALUES (?, ?, ?)",
+                zip([experiment['experiment_id']] * len(household_keys),
+                    np.asarray(household_keys).tolist(), np.asarray(baseline_pet_spend, dtype=np.float64).tolist())
+            )
+
+    def set_job(self, experiment_id, job_id):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE experiments SET job_id = ? WHERE experiment_id = ?", (job_id, experiment_id))
+
+    def experiments(self):
+        """실험 목록 (최근 생성 순)"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query("SELECT * FROM experiments ORDER BY created_at DESC", conn, index_col='experiment_id')
+
+    def baselines(self, experiment_id):
+        """실험 대상 가구와 시작 시점 펫 지출"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT household_key, baseline_pet_spend FROM experiment_baselines WHERE experiment_id = ?",
+                conn, params=(experiment_id,)
+            )
+
+    def _baseline_arrays(self, experiment_id, treatment_share):
+        # (가구 ID, 시작 시점 펫 지출, 실험군 여부) — 실험별로 한 번만 읽고 해시 배정
+        key = (experiment_id, treatment_share)
+        with self._baseline_lock:
+            if key in self._baseline_cache:
+                self._baseline_cache.move_to_end(key)
+                return self._baseline_cache[key]
+        baselines = self.baselines(experiment_id)
+        household_keys = baselines['household_key'].to_numpy()
+        arrays = (household_keys, baselines['baseline_pet_spend'].to_numpy(),
+                  assign_experiment_arms(household_keys, experiment_id, treatment_share))
+        with self._baseline_lock:
+            self._baseline_cache[key] = arrays
+            while len(self._baseline_cache) > EXPERIMENT_BASELINE_CACHE_SIZE:
+                self._baseline_cache.popitem(last=False)
+        return arrays
+
+    def assignment(self, experiment_id, treatment_share):
+        """그룹별 고객 명단 (household_key, group)"""
+        household_keys, _, is_treatment = self._baseline_arrays(experiment_id, treatment_share)
+        return pd.DataFrame({
+            'household_key': household_keys,
+            'group': np.where(is_treatment, EXPERIMENT_ARMS[1], EXPERIMENT_ARMS[0]),
+        })
+
+    def delivered_households(self, experiment_id):
+        """실험 발송 작업에서 발송 성공한 가구 ID (발송 기록과 조인)"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("""
+                SELECT DISTINCT h.customer_id FROM message_history h
+                JOIN experiments e ON h.job_id = e.job_id
+                WHERE e.experiment_id = ? AND h.status = '발송 성공'
+            """, (experiment_id,)).fetchall()
+        return np.array([row[0] for row in rows], dtype=np.int64)
+
+    def delivered_by_arm(self, experiment_id, treatment_share):
+        """대조군/실험군별 발송 성공 가구 수 (발송 기록 조인 후 실험군별 건수만 집계)"""
+        household_keys, _, is_treatment = self._baseline_arrays(experiment_id, treatment_share)
+        delivered = np.isin(household_keys, self.delivered_households(experiment_id))
+        return np.bincount(is_treatment.astype(np.int64), weights=delivered, minlength=2).astype(np.int64)
+
+    def _delivery_version(self, experiment_id):
+        # 실험 발송 작업이 발송 기록에 반영된 시각 (반영 전에는 빈 문자열)
+        with closing(self._connect()) as conn:
+            row = conn.execute("""
+                SELECT j.recorded_at FROM message_jobs j JOIN experiments e ON j.job_id = e.job_id
+                WHERE e.experiment_id = ?
+            """, (experiment_id,)).fetchone()
+        return row[0] if row else ''
+
+    def stats(self, experiment_id):
+        """저장된 실험군별 충분통계량과 계산 당시 데이터 버전 (없으면 (None, None))"""
+        with closing(self._connect()) as conn:
+            stats = pd.read_sql_query("SELECT * FROM experiment_stats WHERE experiment_id = ?", conn,
+                                      params=(experiment_id,), index_col='arm')
+        if len(stats) < 2:
+            return None, None
+        for column in ('bin_counts', 'bin_sums'):
+            stats[column] = stats[column].map(lambda values: np.array(json.loads(values)))
+        return stats, stats['data_version'].iloc[0]
+
+    def save_stats(self, experiment_id, data_version, stats):
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO experiment_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(experiment_id, int(arm), data_version, int(row['households']), int(row['delivered']),
+                  int(row['conversions']), float(row['spend_sum']), float(row['spend_sq_sum']),
+                  json.dumps(row['bin_counts'].tolist()), json.dumps(row['bin_sums'].tolist()),
+                  datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                 for arm, row in stats.iterrows()]
+            )
+
+    def refresh_stats(self, experiment_id, treatment_share, pet_customers, household_index, data_version):
+        """데이터 버전 또는 발송 결과 반영 여부가 바뀐 경우에만 통계 갱신
+
+        발송 결과만 바뀌었으면 저장된 통계의 발송 성공 건수만 바꾸고, 데이터 버전이 바뀌었으면
+        대상 가구의 현재 펫 지출을 시작 시점과 비교해 다시 집계한다.
+        """
+        delivery_version = self._delivery_version(experiment_id)
+        stats, stats_version = self.stats(experiment_id)
+        if stats is not None and stats_version == f"{data_version}|{delivery_version}":
+            return stats
+        if stats is not None and stats_version.rpartition('|')[0] == data_version:
+            stats['delivered'] = pd.Series(self.delivered_by_arm(experiment_id, treatment_share), index=[0, 1])
+        else:
+            household_keys, baseline_pet_spend, is_treatment = self._baseline_arrays(experiment_id, treatment_share)
+            positions = household_index.positions(household_keys)
+            current_pet_spend = np.where(
+                positions >= 0, pet_customers['pet_spend'].to_numpy()[np.maximum(positions, 0)], baseline_pet_spend
+            )
+            stats = experiment_arm_statistics(
+                is_treatment,
+                # 지출은 float32 로 보관되므로 펜스 단위로 반올림해 비교 (변화 없는 가구가 증감으로 잡히지 않도록)
+                np.round(current_pet_spend - baseline_pet_spend, 2),
+                np.isin(household_keys, self.delivered_households(experiment_id)),
+            )
+        self.save_stats(experiment_id, f"{data_version}|{delivery_version}", stats)
+        return self.stats(experiment_id)[0]
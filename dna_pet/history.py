@@ -0,0 +1,161 @@
+"""메시지 발송 기록 저장소 (SQLite WAL, 추가 전용)"""
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.data import sql_rows
+
+# === 메시지 발송 기록 저장소 (SQLite WAL, 추가 전용) ===
+# phone_number 에는 마스킹된 번호만 기록 (원번호는 발송 작업 안에서만 조회, dna_pet.pii)
+MESSAGE_HISTORY_FILE = 'message_history.sqlite'
+MESSAGE_HISTORY_COLUMNS = [
+    'customer_id', 'customer_name', 'phone_number', 'message_type',
+    'message_content', 'send_time', 'status'
+]
+
+MESSAGE_HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS message_history (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    customer_name TEXT,
+    phone_number TEXT,
+    message_type TEXT NOT NULL,
+    message_content TEXT,
+    send_time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    job_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_message_history_send_time ON message_history (send_time);
+CREATE INDEX IF NOT EXISTS idx_message_history_type ON message_history (message_type, send_time);
+CREATE INDEX IF NOT EXISTS idx_message_history_customer ON message_history (customer_id, send_time);
+CREATE INDEX IF NOT EXISTS idx_message_history_job ON message_history (job_id);
+CREATE TABLE IF NOT EXISTS message_stats (
+    message_type TEXT PRIMARY KEY,
+    sent INTEGER NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS message_jobs (
+    job_id TEXT PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+"""
+
+class MessageHistoryStore:
+    """발송 기록 저장소 (유형별 성공 건수는 추가 시점에 집계, 기록 조회는 인덱스 기반 페이지 단위)"""
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(MESSAGE_HISTORY_SCHEMA)
+
+    def _connect(self):
+        # 호출마다 연결 (WAL 모드라 읽기는 쓰기와 동시에 진행 가능)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-65536")  # 인덱스 갱신용 페이지 캐시 64MB
+        return conn
+
+    def append(self, records, job_id=None):
+        """발송 기록 추가 (한 트랜잭션, 이미 기록된 job_id 는 건너뜀)"""
+        if records.empty:
+            return False
+        records = records[MESSAGE_HISTORY_COLUMNS].assign(
+            customer_id=records['customer_id'].astype(np.int64), job_id=job_id
+        )
+        stats = records.groupby('message_type', observed=True)['status'].agg(
+            sent='size', success=lambda status: int((status == "발송 성공").sum())
+        ).reset_index()
+        with closing(self._connect()) as conn, conn:
+            if job_id is not None:
+                if conn.execute("SELECT 1 FROM message_jobs WHERE job_id = ?", (job_id,)).fetchone():
+                    return False
+                conn.execute(
+                    "INSERT INTO message_jobs VALUES (?, ?, ?)",
+                    (job_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(records))
+                )
+            conn.executemany(f"""
+                INSERT INTO message_history ({', '.join(records.columns)})
+                VALUES ({', '.join('?' * len(records.columns))})
+            """, sql_rows(records))
+            conn.executemany("""
+                INSERT INTO message_stats (message_type, sent, success) VALUES (?, ?, ?)
+                ON CONFLICT(message_type) DO UPDATE SET
+                    sent = sent + excluded.sent,
+                    success = success + excluded.success
+            """, sql_rows(stats))
+        return True
+
+    def summary(self):
+        """메시지 유형별 발송/성공 건수 (사전 집계 테이블 조회)"""
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(
+                "SELECT message_type, sent, success FROM message_stats ORDER BY sent DESC", conn,
+                index_col='message_type'
+            )
+
+    @staticmethod
+    def _where(message_type=None, customer_id=None):
+        clauses, params = [], []
+        if message_type is not None:
+            clauses.append("message_type = ?"); params.append(message_type)
+        if customer_id is not None:
+            clauses.append("customer_id = ?"); params.append(int(customer_id))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, message_type=None, customer_id=None):
+        """조건에 맞는 발송 기록 건수"""
+        if customer_id is None:
+            summary = self.summary()
+            if message_type is None:
+                return int(summary['sent'].sum())
+            return int(summary['sent'].get(message_type, 0))
+        where, params = self._where(message_type, customer_id)
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM message_history{where}", params).fetchone()[0]
+
+    def page(self, page=1, page_size=50, message_type=None, customer_id=None, newest_first=True, after=None):
+        """발송 시각 순 기록 한 페이지 조회 ((send_time, id) 키셋 페이지, 인덱스는 기록 id)
+
+        after 에 이전 페이지 마지막 행의 (send_time, id) 를 넘기면 그 다음 행부터 읽고 page 는 무시한다.
+        없으면 page 시작 직전 키를 인덱스만 훑어 찾는다 (행 본문은 보이는 페이지만 읽음).
+        """
+        where, params = self._where(message_type, customer_id)
+        direction, compare = ("DESC", "<") if newest_first else ("ASC", ">")
+        order = f"ORDER BY send_time {direction}, id {direction}"
+        join = " AND " if where else " WHERE "
+        with closing(self._connect()) as conn:
+            def read(condition, condition_params, limit):
+                return pd.read_sql_query(f"""
+                    SELECT id, {', '.join(MESSAGE_HISTORY_COLUMNS)} FROM message_history{where}{condition}
+                    {order} LIMIT ?
+                """, conn, params=params + condition_params + [limit], index_col='id')
+
+            if after is None and page > 1:
+                after = conn.execute(
+                    f"SELECT send_time, id FROM message_history{where} {order} LIMIT 1 OFFSET ?",
+                    params + [(page - 1) * page_size - 1]
+                ).fetchone()
+                if after is None:
+                    return read("", [], 0)
+            if after is None:
+                return read("", [], page_size)
+            # 같은 send_time 의 남은 행, 모자라면 다음 send_time 부터 ((send_time, id) 행 값 비교는
+            # send_time 범위로만 인덱스를 찾아 한 작업처럼 같은 시각의 행이 많으면 앞부분을 다시 훑음)
+            send_time, last_id = after[0], int(after[1])
+            records = read(f"{join}send_time = ? AND id {compare} ?", [send_time, last_id], page_size)
+            if len(records) < page_size:
+                rest = read(f"{join}send_time {compare} ?", [send_time], page_size - len(records))
+                records = pd.concat([records, rest]) if len(records) else rest
+            return records
+
+    @staticmethod
+    def page_key(records):
+        """페이지 마지막 행의 (send_time, id) (다음 페이지의 after, 빈 페이지면 None)"""
+        if records.empty:
+            return None
+        return records['send_time'].iat[-1], int(records.index[-1])
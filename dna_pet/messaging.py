@@ -0,0 +1,137 @@
+"""고객 메시지 (템플릿, 개인화, 전화번호 마스킹, 세그먼트 단위 대량 메시지 생성)"""
+import re
+import string
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.data import classify_frequency, classify_frequency_array
+from dna_pet.metrics import count, timed
+
+# 메시지 템플릿
+MESSAGE_TEMPLATES = {
+    "신제품 안내": """안녕하세요, {customer_name}님! 🐾
+
+{pet_profile} 전용 신제품이 출시되었습니다!
+✨ 특별 할인가로 만나보세요.
+
+자세한 정보: bit.ly/petstore
+문의: 1588-0000""",
+    
+    "재방문 유도": """안녕하세요, {customer_name}님! 🐾
+
+마지막 방문이 {last_purchase_days}일 전이네요.
+반려동물이 그리워하고 있을 거예요! 😊
+
+🎁 특별 할인쿠폰: COMEBACK20
+유효기간: 7일
+
+지금 바로 쇼핑하기: bit.ly/petstore""",
+    
+    "생일 축하": """🎉 {customer_name}님의 반려동물 생일을 축하합니다! 🎂
+
+{pet_profile}를 위한 특별한 하루를 만들어주세요.
+생일 기념 20% 할인 혜택을 준비했습니다!
+
+쿠폰코드: BIRTHDAY20
+문의: 1588-0000""",
+    
+    "정기배송 추천": """안녕하세요, {customer_name}님! 🐾
+
+{frequency_category} 고객님께 정기배송을 추천드립니다.
+💰 최대 15% 할인 + 무료배송
+
+- 원하는 주기로 자동 배송
+- 언제든 변경/취소 가능
+- 첫 주문 특별 할인
+
+신청하기: bit.ly/petstore
+문의: 1588-0000""",
+    
+    "VIP 혜택 안내": """✨ {customer_name}님은 소중한 VIP 고객입니다! 👑
+
+Club+ 회원 전용 혜택:
+🎁 신상품 우선 체험
+💎 특별 할인 쿠폰
+🚚 무료 배송
+📞 전용 상담 라인
+
+VIP 라운지: bit.ly/petstore-vip
+전용 상담: 1588-1000"""
+}
+
+# 메시지 개인화 함수
+def personalize_message(template, customer_data):
+    """템플릿에 고객 정보를 반영하여 개인화된 메시지 생성"""
+    if 'frequency_category' in customer_data:
+        frequency_category = customer_data['frequency_category']
+    else:
+        frequency_category = classify_frequency(customer_data['pet_transactions'])
+    
+    return template.format(
+        customer_name=customer_data['customer_name'],
+        pet_profile=customer_data['pet_profile'],
+        last_purchase_days=customer_data['last_purchase_days'],
+        frequency_category=frequency_category,
+        household_size=customer_data['household_size']
+    )
+
+# === 대량 메시지 생성 (템플릿을 한 번만 파싱하고 세그먼트 단위로 컬럼 연산) ===
+MESSAGE_FIELDS = ['customer_name', 'pet_profile', 'last_purchase_days', 'frequency_category', 'household_size']
+MESSAGE_SEND_CHUNK_SIZE = 10_000
+
+def compile_message_template(template):
+    """템플릿을 (리터럴, 필드) 목록으로 파싱 (필드는 (컬럼명, 서식 표현식 또는 None))"""
+    parts = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        field = None
+        if field_name is not None:
+            root = re.match(r'\w*', field_name).group()
+            if root not in MESSAGE_FIELDS:
+                raise KeyError(root)
+            expression = ('{0' + field_name[len(root):] + (f'!{conversion}' if conversion else '')
+                          + (f':{format_spec}' if format_spec else '') + '}')
+            field = (root, None if expression == '{0}' else expression)
+        parts.append((literal, field))
+    return parts
+
+def _format_message_field(values, expression):
+    """필드 값을 고유값 단위로 한 번씩만 서식화한 뒤 행에 전개"""
+    codes, uniques = pd.factorize(values)
+    formatted = [str(v) if expression is None else expression.format(v) for v in uniques]
+    return np.array(formatted + [str(np.nan)], dtype=object)[codes]
+
+@timed()
+def render_messages(template, customers):
+    """고객 세그먼트 전체의 개인화 메시지를 컬럼 단위로 생성 (personalize_message 와 동일 결과)"""
+    count('messages_rendered', len(customers))
+    parts = compile_message_template(template) if isinstance(template, str) else template
+    rendered = np.full(len(customers), '', dtype=object)
+    for literal, field in parts:
+        if literal:
+            rendered = rendered + literal
+        if field is not None:
+            root, expression = field
+            if root == 'frequency_category' and root not in customers.columns:
+                values = classify_frequency_array(customers['pet_transactions'])
+            else:
+                values = customers[root]
+            rendered = rendered + _format_message_field(values, expression)
+    return pd.Series(rendered, index=customers.index)
+
+def build_message_records(customers, messages, message_type):
+    """고객 세그먼트와 개인화 메시지로 발송 대기 상태의 발송 기록 DataFrame 생성
+
+    phone_number 는 마스킹된 번호(customer_details), 원번호는 발송 시 phone_token 으로 조회한다.
+    """
+    return pd.DataFrame({
+        'customer_id': customers['household_key'].to_numpy(),
+        'customer_name': customers['customer_name'].to_numpy(),
+        'phone_number': customers['phone_number'].to_numpy(),
+        'phone_token': customers['phone_token'].to_numpy(),
+        'message_type': message_type,
+        'message_content': np.asarray(messages, dtype=object),
+        'send_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'status': "발송 대기",
+    })
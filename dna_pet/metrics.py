@@ -0,0 +1,219 @@
+"""렌더링 프로파일/계측 (선택 기능, PET_METRICS=1 로 활성화)
+
+재실행(rerun)마다 RerunProfile 을 현재 컨텍스트에 두고 timer()/section()/count() 로
+로더·페이지·블록 시간과 카운터를 기록한다. 프로파일이 없으면(비활성) 세 함수 모두 아무 일도 하지 않는다.
+PET_METRICS_FILE 을 지정하면 재실행마다 결과를 내보낸다.
+확장자가 .prom 이면 프로세스 누적값을 Prometheus 텍스트 형식으로 덮어쓰고 (node_exporter textfile 수집용),
+그 밖에는 재실행 한 건을 JSON 한 줄로 추가한다.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+METRICS_ENV = 'PET_METRICS'
+METRICS_FILE_ENV = 'PET_METRICS_FILE'
+METRICS_PREFIX = 'pet_dashboard'
+
+_current_profile = contextvars.ContextVar('pet_metrics_profile', default=None)
+_NULL_TIMER = nullcontext()
+
+def metrics_enabled():
+    """PET_METRICS 가 켜져 있는지 (1/true/yes/on)"""
+    return os.environ.get(METRICS_ENV, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+class RerunProfile:
+    """재실행 한 번의 타이머(중첩 경로별 누적 초/호출 수)와 카운터
+
+    타이머 경로는 바깥 타이머 이름을 '/' 로 이은 것이고, section() 은 같은 단계의 다음 section()
+    또는 바깥 타이머가 끝날 때까지를 하나의 타이머로 기록한다 (들여쓰기 없이 순차 코드 구간 측정).
+    """
+
+    def __init__(self, page, session=None):
+        self.page = page
+        self.session = session
+        self.started_at = datetime.now()
+        self.total_seconds = None
+        self.timers = {}
+        self.counters = {}
+        self._stack = []
+        self._sections = {}
+        self._started = time.perf_counter()
+
+    def _record(self, path, seconds):
+        entry = self.timers.setdefault(path, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def _close_section(self, depth):
+        # depth: 구간 이름이 스택에 놓인 깊이 (스택 맨 위일 때만 열려 있음)
+        section = self._sections.pop(depth, None)
+        if section is not None:
+            self._stack.pop()
+            self._record(section[0], time.perf_counter() - section[1])
+
+    @contextmanager
+    def timer(self, name):
+        self._stack.append(name)
+        depth = len(self._stack)
+        path = '/'.join(self._stack)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._close_section(depth + 1)
+            self._stack.pop()
+            self._record(path, time.perf_counter() - started)
+
+    def section(self, name):
+        self._close_section(len(self._stack))
+        self._stack.append(name)
+        self._sections[len(self._stack)] = ('/'.join(self._stack), time.perf_counter())
+
+    def count(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish(self):
+        for depth in sorted(self._sections, reverse=True):
+            self._close_section(depth)
+        self.total_seconds = time.perf_counter() - self._started
+        return self
+
+    def breakdown(self):
+        """경로 순 [(경로, 초, 자체 초, 호출 수)] — 자체 초는 하위 타이머를 뺀 시간 (Streamlit 요소 출력 등)"""
+        rows = []
+        for path in sorted(self.timers):
+            seconds, calls = self.timers[path]
+            children = sum(
+                child_seconds for child, (child_seconds, _) in self.timers.items()
+                if child.startswith(path + '/') and '/' not in child[len(path) + 1:]
+            )
+            rows.append((path, seconds, max(seconds - children, 0.0), calls))
+        return rows
+
+    def to_record(self):
+        return {
+            'time': self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+            'session': self.session,
+            'page': self.page,
+            'total_seconds': round(self.total_seconds or 0.0, 6),
+            'timers': {path: {'seconds': round(seconds, 6), 'calls': calls}
+                       for path, (seconds, calls) in self.timers.items()},
+            'counters': dict(self.counters),
+        }
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class MetricsRegistry:
+    """프로세스 누적 지표 (페이지별 재실행 수/시간, 타이머별 누적 초/호출 수, 카운터)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reruns = {}
+        self.timers = {}
+        self.counters = {}
+
+    def record(self, profile):
+        with self._lock:
+            entry = self.reruns.setdefault(profile.page, [0.0, 0])
+            entry[0] += profile.total_seconds
+            entry[1] += 1
+            for path, (seconds, calls) in profile.timers.items():
+                entry = self.timers.setdefault((profile.page, path), [0.0, 0])
+                entry[0] += seconds
+                entry[1] += calls
+            for name, value in profile.counters.items():
+                key = (profile.page, name)
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def prometheus_text(self):
+        """Prometheus 텍스트 노출 형식"""
+        with self._lock:
+            reruns = sorted(self.reruns.items())
+            timers = sorted(self.timers.items())
+            counters = sorted(self.counters.items())
+        lines = []
+        for metric, help_text, samples in (
+            ('reruns_total', "페이지별 재실행 수", [({'page': page}, calls) for page, (_, calls) in reruns]),
+            ('rerun_seconds_total', "페이지별 재실행 누적 시간", [({'page': page}, seconds) for page, (seconds, _) in reruns]),
+            ('timer_seconds_total', "타이머별 누적 시간",
+             [({'page': page, 'timer': path}, seconds) for (page, path), (seconds, _) in timers]),
+            ('timer_calls_total', "타이머별 호출 수",
+             [({'page': page, 'timer': path}, calls) for (page, path), (_, calls) in timers]),
+            ('counter_total', "카운터 누적값",
+             [({'page': page, 'name': name}, value) for (page, name), value in counters]),
+        ):
+            name = f"{METRICS_PREFIX}_{metric}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_label_value(label)}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value:.6g}")
+        return '\n'.join(lines) + '\n'
+
+METRICS = MetricsRegistry()
+_export_lock = threading.Lock()
+
+def export_metrics(profile, path, registry=METRICS):
+    """.prom 이면 누적값을 원자적으로 덮어쓰고, 그 밖에는 재실행 기록을 JSON 한 줄로 추가"""
+    with _export_lock:
+        if path.endswith('.prom'):
+            tmp = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(registry.prometheus_text())
+            os.replace(tmp, path)
+        else:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(profile.to_record(), ensure_ascii=False) + '\n')
+
+def start_rerun(page, session=None):
+    """현재 컨텍스트(스크립트 실행 스레드)에 새 재실행 프로파일 설정"""
+    profile = RerunProfile(page, session)
+    _current_profile.set(profile)
+    return profile
+
+def finish_rerun():
+    """현재 재실행 프로파일을 끝내고 누적/내보내기 후 반환 (시작하지 않았으면 None)"""
+    profile = _current_profile.get()
+    if profile is None:
+        return None
+    _current_profile.set(None)
+    profile.finish()
+    METRICS.record(profile)
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path:
+        export_metrics(profile, path)
+    return profile
+
+def timer(name):
+    """with 블록 시간 측정 (비활성이면 빈 컨텍스트)"""
+    profile = _current_profile.get()
+    return _NULL_TIMER if profile is None else profile.timer(name)
+
+def section(name):
+    """다음 section() 또는 바깥 타이머 끝까지를 name 구간으로 측정"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.section(name)
+
+def count(name, value=1):
+    """카운터 증가"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.count(name, value)
+
+def timed(name=None):
+    """함수 호출 시간을 timer 로 측정하는 데코레이터 (캐시 함수 안쪽에 두면 캐시 미스만 기록)"""
+    def decorator(func):
+        label = name or func.__name__
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,22 @@
+"""대시보드 페이지 (메뉴별 모듈, 선택된 메뉴의 페이지 모듈만 import 해서 실행)"""
+import importlib
+
+from dna_pet.metrics import timer
+
+# 메뉴 → 페이지 모듈 (메뉴 순서)
+PAGES = {
+    "📊 대시보드": 'overview',
+    "🎯 개인 고객 분석": 'customer',
+    "📈 주기상향 추천": 'upgrade',
+    "💰 수익 예측": 'revenue',
+    "📦 재고관리": 'inventory',
+    "📧 고객 메시지": 'messages',
+    "🧪 A/B 테스트": 'experiments',
+}
+
+def render_page(menu, dataset_key):
+    """선택된 메뉴의 페이지 그리기 (페이지 모듈은 처음 선택될 때 한 번만 import)"""
+    with timer('import'):
+        page = importlib.import_module(f"{__name__}.{PAGES[menu]}")
+    with timer('render'):
+        page.render(dataset_key)
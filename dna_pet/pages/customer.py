@@ -0,0 +1,140 @@
+"""개인 고객 분석 (고객 프로필, 동일 빈도 그룹 내 순위, 추천)"""
+import streamlit as st
+
+from dna_pet.analytics import FREQUENCY_COMPARISON_METRICS
+from dna_pet.app import (
+    customer_picker, load_customer_data, load_frequency_ranking, load_household_index, load_recommendations,
+)
+from dna_pet.data import customer_details
+from dna_pet.metrics import section
+
+def render(dataset_key):
+    """개인 고객 분석 페이지"""
+    pet_customers, _, _ = load_customer_data(*dataset_key)
+    st.title("🎯 개인 고객 분석")
+    
+    # 고객 선택 (익명화, ID 검색 후 후보 목록에서 선택)
+    section("고객 선택")
+    customer_position = customer_picker(load_household_index(*dataset_key), "분석할 고객을 선택하세요:", key="analysis_customer")
+    if customer_position is None:
+        st.stop()
+    
+    # 선택된 고객 정보 (색인으로 행 위치 조회)
+    customer_data = customer_details(pet_customers.iloc[[customer_position]]).iloc[0]
+    
+    st.subheader(f"{customer_data['customer_name']} 상세 분석")
+    
+    # 기본 지표 (5개 컬럼으로 확장)
+    section("고객 정보")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric("펫 거래 횟수", f"{customer_data['pet_transactions']}회")
+    
+    with col2:
+        st.metric("펫 지출 금액", f"£{customer_data['pet_spend']:.2f}")
+    
+    with col3:
+        st.metric("총 지출 금액", f"£{customer_data['total_spend']:.2f}")
+    
+    with col4:
+        st.metric("펫 지출 비율", f"{customer_data['pet_ratio']:.1f}%")
+    
+    with col5:
+        club_status = "🌟 Club+" if customer_data['club_plus_member'] else "📱 일반"
+        st.metric("회원 등급", club_status)
+    
+    # 추가 고객 정보 (3개 섹션으로 정리)
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.info(f"🏠 **예상 가구수**: {customer_data['household_size']}")
+        st.info(f"📱 **연락처**: {customer_data['phone_number'] or '-'}")
+    
+    with col2:
+        st.info(f"🐾 **반려동물 유형**: {customer_data['pet_profile']}")
+        st.info(f"🛒 **마지막 구매**: {customer_data['last_purchase_days']}일 전")
+    
+    with col3:
+        current_frequency = customer_data['frequency_category']
+        st.info(f"⏰ **현재 구매 빈도**: {current_frequency}")
+    
+    # 구매 카테고리 (개선된 시각화)
+    section("구매 카테고리")
+    st.subheader("🛍️ 구매 펫 카테고리")
+    categories = customer_data['pet_categories'].split(', ')
+    
+    category_cols = st.columns(min(len(categories), 3))
+    for idx, category in enumerate(categories):
+        col_idx = idx % 3
+        with category_cols[col_idx]:
+            if '-' in category:
+                main_cat, sub_cat = category.split('-', 1)
+                st.write(f"**{main_cat}**")
+                st.write(f"└ {sub_cat}")
+            else:
+                st.write(f"**{category}**")
+    
+    # 동일 빈도 그룹 내 비교 (총매출 추가)
+    section("그룹 내 비교")
+    st.subheader("📊 동일 빈도 그룹 내 비교")
+    
+    # 그룹별 정렬 배열/통계는 캐시된 순위 서비스에서 조회
+    frequency_ranking = load_frequency_ranking(*dataset_key)
+    group_size = frequency_ranking.group_size(current_frequency)
+    
+    for column, (metric, title, value_format) in zip(st.columns(3), FREQUENCY_COMPARISON_METRICS):
+        with column:
+            st.write(title)
+            for stat, value in frequency_ranking.stats(current_frequency, metric).items():
+                if stat in ['mean', 'std', 'min', 'max']:
+                    st.write(f"• {stat}: {value_format.format(value)}")
+            
+            current_rank = frequency_ranking.rank(current_frequency, metric, customer_data[metric])
+            st.write(f"**현재 고객 순위**: {current_rank}/{group_size}위")
+            st.caption(f"하위 {frequency_ranking.percentile(current_frequency, metric, customer_data[metric]):.1f}% 지점")
+    
+    # 추천 섹션
+    section("추천")
+    st.markdown("---")
+    st.subheader("💡 맞춤형 추천")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 🐾 함께 구매 펫 추천")
+        recommendations = load_recommendations(*dataset_key)
+        pet_recommendations = recommendations.pet_recommendations(customer_position)
+        
+        for i, recommendation in enumerate(pet_recommendations, 1):
+            st.write(f"{i}. **{recommendation}**")
+            if i <= 3:  # 상위 3개는 별표 추가
+                st.write("   ⭐ 고객님께 특히 추천!")
+        
+        # 추천 이유
+        with st.expander("💡 추천 이유"):
+            if 'DOG-사료/간식' in customer_data['pet_categories']:
+                st.write("• 기존 강아지 사료 구매 이력 기반 추천")
+                st.write("• 프리미엄 라인업으로 업그레이드 제안")
+            if 'CAT-' in customer_data['pet_categories']:
+                st.write("• 고양이 전용 제품군 확대 추천")
+                st.write("• 건강 관리 특화 제품 우선 추천")
+    
+    with col2:
+        st.markdown("### 🛒 함께 구매 연관 제품")
+        related_products = recommendations.related_products(customer_position)
+        
+        for i, product in enumerate(related_products, 1):
+            st.write(f"{i}. **{product}**")
+            if customer_data['total_spend'] > 5000 and i <= 2:
+                st.write("   💎 프리미엄 고객 맞춤 추천")
+        
+        # 연관성 설명
+        with st.expander("🔗 연관성 분석"):
+            st.write("• **청소용품**: 반려동물로 인한 청소 필요성 증가")
+            st.write("• **위생용품**: 펫 케어와 연관된 생활용품")
+            if customer_data['household_size'] != "1인 가구":
+                st.write(f"• **가족용품**: {customer_data['household_size']} 맞춤 제품")
+            if 'DOG-' in customer_data['pet_categories']:
+                st.write("• **아웃도어 용품**: 강아지 산책 관련 제품")
@@ -0,0 +1,147 @@
+"""A/B 테스트 (실험 설계/배정/발송, 실험 결과 분석)"""
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dna_pet.app import (
+    get_sms_dispatcher, load_customer_data, load_experiment_store, load_household_index, load_phone_vault,
+)
+from dna_pet.data import FREQUENCY_LABELS, LOWER_FREQUENCY_TIERS, PET_PROFILE_LABELS, customer_details
+from dna_pet.experiments import (
+    EXPERIMENT_ALPHA, EXPERIMENT_ARMS, EXPERIMENT_KPIS, analyze_experiment, assign_experiment_arms,
+)
+from dna_pet.messaging import (
+    MESSAGE_TEMPLATES, build_message_records, compile_message_template, render_messages,
+)
+from dna_pet.metrics import timer
+
+def render(dataset_key):
+    """A/B 테스트 페이지"""
+    pet_customers, _, _ = load_customer_data(*dataset_key)
+    st.title("🧪 주기상향 추천 A/B 테스트")
+    experiment_store = load_experiment_store()
+    tab1, tab2 = st.tabs(["🧪 실험 설계", "📈 실험 결과"])
+
+    # TAB 1: 실험 설계 (가설 → 대상 고객 → 그룹 설정 → 실행)
+    with tab1, timer("실험 설계"):
+        st.subheader("1️⃣ 검증 가능한 가설 설정")
+        experiment_name = st.text_input("실험 이름", placeholder="예: 저빈도 고객 건강 팁 푸시", key="ab_name")
+        hypothesis = st.text_area(
+            "가설 (대상 고객 + 실행 액션 + 예상 결과 + 구체적 수치)",
+            placeholder="저빈도 구매 고객에게 개인화된 펫 건강 팁 + 관련 상품 추천을 발송하면 재구매율이 20% 이상 증가할 것이다",
+            key="ab_hypothesis"
+        )
+        kpi = st.selectbox("핵심 성공 지표 (KPI)", EXPERIMENT_KPIS, key="ab_kpi")
+
+        st.subheader("2️⃣ 대상 고객 선택")
+        col1, col2 = st.columns(2)
+        with col1:
+            segment_frequencies = st.multiselect(
+                "구매 빈도", FREQUENCY_LABELS, default=LOWER_FREQUENCY_TIERS, key="ab_frequency"
+            )
+        with col2:
+            segment_profiles = st.multiselect("반려동물 유형 (미선택 시 전체)", sorted(PET_PROFILE_LABELS), key="ab_profile")
+        segment_mask = pet_customers['frequency_category'].isin(segment_frequencies).to_numpy()
+        if segment_profiles:
+            segment_mask &= pet_customers['pet_profile'].isin(segment_profiles).to_numpy()
+        segment_positions = np.flatnonzero(segment_mask)
+        st.info(f"**대상 고객 수**: {len(segment_positions):,}명")
+
+        st.subheader("3️⃣ 그룹 설정 (A/B)")
+        col1, col2 = st.columns(2)
+        with col1:
+            treatment_percent = st.slider("실험군 비율 (%)", min_value=10, max_value=90, value=50, step=5, key="ab_share")
+        with col2:
+            template_choice = st.selectbox("실험군 발송 메시지", list(MESSAGE_TEMPLATES.keys()), key="ab_template")
+        expected_treatment = int(len(segment_positions) * treatment_percent / 100)
+        st.write(f"대조군(메시지 미발송) 약 {len(segment_positions) - expected_treatment:,}명 / "
+                 f"실험군 약 {expected_treatment:,}명")
+
+        st.subheader("4️⃣ 실행 및 추출")
+        if st.button("🚀 실험 시작", type="primary", key="ab_start"):
+            if not experiment_name or len(segment_positions) == 0:
+                st.warning("실험 이름을 입력하고 대상 고객을 선택해주세요.")
+            else:
+                experiment_id = uuid.uuid4().hex[:8]
+                segment_customers = pet_customers.iloc[segment_positions]
+                is_treatment = assign_experiment_arms(segment_customers['household_key'], experiment_id, treatment_percent / 100)
+                message_type = f"A/B {experiment_name}"
+                experiment_store.create({
+                    'experiment_id': experiment_id, 'name': experiment_name, 'hypothesis': hypothesis, 'kpi': kpi,
+                    'segment': json.dumps({'frequency': segment_frequencies, 'pet_profile': segment_profiles}, ensure_ascii=False),
+                    'treatment_share': treatment_percent / 100, 'message_type': message_type,
+                }, segment_customers['household_key'].to_numpy(), segment_customers['pet_spend'].to_numpy())
+
+                # 실험군에만 메시지 발송 (발송 결과는 작업 ID 로 발송 기록과 조인)
+                treatment_customers = customer_details(segment_customers[is_treatment])
+                if not treatment_customers.empty:
+                    template_parts = compile_message_template(MESSAGE_TEMPLATES[template_choice])
+                    records = build_message_records(
+                        treatment_customers, render_messages(template_parts, treatment_customers), message_type
+                    )
+                    job_id = get_sms_dispatcher().submit_job(
+                        records, load_phone_vault(*dataset_key), campaign_id=f"ab-{experiment_id}"
+                    )
+                    experiment_store.set_job(experiment_id, job_id)
+                st.success(f"✅ 실험 시작: {experiment_name} (실험 ID: {experiment_id}, 실험군 {is_treatment.sum():,}명)")
+
+    # TAB 2: 실험 결과 (저장된 충분통계량으로 검정)
+    with tab2, timer("실험 결과"):
+        experiments = experiment_store.experiments()
+        if experiments.empty:
+            st.info("아직 시작된 실험이 없습니다.")
+        else:
+            experiment_id = st.selectbox(
+                "실험 선택", experiments.index.tolist(),
+                format_func=lambda x: f"{experiments.loc[x, 'name']} ({experiments.loc[x, 'created_at']})",
+                key="ab_experiment"
+            )
+            experiment = experiments.loc[experiment_id]
+            st.write(f"**가설**: {experiment['hypothesis'] or '-'}")
+            st.write(f"**KPI**: {experiment['kpi']} · **실험군 비율**: {experiment['treatment_share']:.0%}")
+
+            # 데이터셋 버전이 바뀐 경우에만 대상 가구 집계와 조인해 통계 갱신
+            stats = experiment_store.refresh_stats(
+                experiment_id, experiment['treatment_share'], pet_customers,
+                load_household_index(*dataset_key), json.dumps(dataset_key, default=str)
+            )
+            result = analyze_experiment(stats)
+
+            arm_table = pd.DataFrame({
+                '그룹': EXPERIMENT_ARMS,
+                '배정 고객': stats['households'].to_numpy(),
+                '발송 성공': stats['delivered'].to_numpy(),
+                '전환 고객': stats['conversions'].to_numpy(),
+                '전환율(%)': np.divide(stats['conversions'], stats['households'].clip(lower=1)).to_numpy() * 100,
+                '평균 펫 지출 증가(£)': np.divide(stats['spend_sum'], stats['households'].clip(lower=1)).to_numpy(),
+            })
+            st.dataframe(arm_table.style.format({'전환율(%)': "{:.2f}", '평균 펫 지출 증가(£)': "£{:.2f}"}),
+                         use_container_width=True)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### 🎯 전환율 (두 비율 z-검정)")
+                st.metric("z 통계량", f"{result['z']:.2f}")
+                st.metric("p-value", f"{result['p_value']:.4f}")
+                if result['p_value'] < EXPERIMENT_ALPHA:
+                    st.success("통계적으로 유의한 차이가 있습니다.")
+                else:
+                    st.info("아직 유의한 차이가 없습니다.")
+            with col2:
+                st.markdown("#### 💰 펫 지출 증가 (부트스트랩)")
+                low, high = result['spend_interval']
+                st.metric("실험군 - 대조군", f"£{result['spend_difference']:.2f}")
+                st.write(f"{1 - EXPERIMENT_ALPHA:.0%} 신뢰구간: £{low:.2f} ~ £{high:.2f}")
+                st.write(f"p-value: {result['spend_p_value']:.4f}")
+            st.caption(f"통계 갱신: {stats['updated_at'].iloc[0]} (새 거래 데이터가 반영되면 자동 갱신)")
+
+            # 그룹별 고객 명단 (다운로드를 누를 때만 해시 배정으로 만듦)
+            treatment_share = experiment['treatment_share']
+            st.download_button(
+                "📥 그룹별 고객 명단 CSV",
+                lambda: experiment_store.assignment(experiment_id, treatment_share).to_csv(index=False).encode('utf-8-sig'),
+                file_name=f"ab_test_{experiment_id}.csv", mime="text/csv", key="ab_download"
+            )
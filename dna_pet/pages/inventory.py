@@ -0,0 +1,54 @@
+"""재고관리 (펫 카테고리 수요 기반 재주문 계획)"""
+import os
+
+import numpy as np
+import streamlit as st
+
+from dna_pet.app import TABLE_PAGE_SIZE, load_inventory_plan, table_page_selector
+from dna_pet.metrics import section
+
+def render(dataset_key):
+    """재고관리 페이지"""
+    st.title("📦 재고관리 시스템")
+    
+    # 재고 계획 (부하 테스트용 제품 수: PET_SKU_COUNT 환경변수)
+    section("재고 계획")
+    sku_count = os.environ.get("PET_SKU_COUNT")
+    inventory_df = load_inventory_plan(*dataset_key, sku_count=int(sku_count) if sku_count else None)
+    
+    # 재고 현황 요약
+    section("재고 현황")
+    col1, col2, col3, col4 = st.columns(4)
+    low_stock_count = int(inventory_df['reorder_needed'].sum())
+    stockout_risk_count = int(inventory_df['stockout_risk'].sum())
+    col1.metric("총 제품 수", f"{len(inventory_df):,}개")
+    col2.metric("재주문 필요", f"{low_stock_count:,}개", delta=f"-{low_stock_count}" if low_stock_count > 0 else "0")
+    col3.metric("품절 위험 (입고 전 소진)", f"{stockout_risk_count:,}개")
+    col4.metric("총 재고 가치", f"£{inventory_df['stock_value'].sum():,.2f}")
+    
+    st.subheader("📋 재고 현황")
+    if low_stock_count > 0:
+        st.error(f"🚨 **재주문 필요**: {low_stock_count:,}개 제품의 재고가 재주문점 아래입니다!")
+        reorder_list = inventory_df.loc[inventory_df['reorder_needed'], [
+            'category', 'product_name', 'supplier', 'current_stock', 'reorder_point', 'order_quantity', 'days_of_cover'
+        ]].sort_values('days_of_cover')
+        # CSV 는 다운로드를 누를 때만 만듦 (재실행마다 직렬화하지 않음)
+        st.download_button(
+            "📥 발주 목록 CSV", lambda: reorder_list.to_csv(index=False).encode('utf-8-sig'),
+            file_name="reorder_list.csv", mime="text/csv", key="inventory_reorder_download"
+        )
+    
+    # 상태 필터 후 재고 일수가 짧은 순으로 보이는 페이지만 표시
+    section("재고 목록")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        status_filter = st.multiselect("재고 상태", ['⚫ 품절', '🔴 부족', '🟡 보통', '🟢 충분'], key="inventory_status")
+    visible_inventory = inventory_df[inventory_df['stock_status'].isin(status_filter)] if status_filter else inventory_df
+    with col2:
+        inventory_page, inventory_pages = table_page_selector(len(visible_inventory), key="inventory_page")
+    page_order = np.argsort(visible_inventory['days_of_cover'].to_numpy(), kind='stable')
+    st.dataframe(
+        visible_inventory.iloc[page_order[(inventory_page - 1) * TABLE_PAGE_SIZE:inventory_page * TABLE_PAGE_SIZE]],
+        use_container_width=True
+    )
+    st.caption(f"{inventory_page} / {inventory_pages} 페이지")
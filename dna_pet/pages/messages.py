@@ -0,0 +1,234 @@
+"""고객 메시지 (고객 리스트 필터, 메시지 작성/발송, 발송 기록)"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dna_pet.app import (
+    TABLE_PAGE_SIZE, customer_picker, get_sms_dispatcher, load_customer_data, load_customer_query_engine,
+    load_household_index, load_message_store, load_phone_vault, table_page_selector,
+)
+from dna_pet.data import customer_details
+from dna_pet.messaging import (
+    MESSAGE_SEND_CHUNK_SIZE, MESSAGE_TEMPLATES, build_message_records, compile_message_template,
+    personalize_message, render_messages,
+)
+from dna_pet.metrics import timer
+from dna_pet.pii import mask_phone_strings
+from dna_pet.query import CLUB_FILTERS, CUSTOMER_SORT_COLUMNS, CUSTOMER_SPEND_FILTERS
+
+def render(dataset_key):
+    """고객 메시지 페이지"""
+    pet_customers, _, _ = load_customer_data(*dataset_key)
+    st.title("📧 고객 메시지 관리")
+    
+    # 메뉴 탭 설정
+    tab1, tab2, tab3 = st.tabs(["📋 고객 리스트", "📝 메시지 작성", "📊 발송 기록"])
+    
+    # 세션 상태 초기화 (발송 기록은 세션이 끝나도 유지되도록 저장소에 보관)
+    message_store = load_message_store()
+    if 'filtered_positions_for_messaging' not in st.session_state:
+        st.session_state.filtered_positions_for_messaging = np.arange(0)
+    if 'sms_jobs' not in st.session_state:
+        st.session_state.sms_jobs = []
+
+    # TAB 1: 고객 리스트
+    with tab1, timer("고객 리스트"):
+        st.subheader("📋 고객 리스트 관리")
+        
+        # 필터 옵션
+        query_engine = load_customer_query_engine(*dataset_key)
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            frequency_filter = st.selectbox("구매 빈도 필터", ["전체"] + query_engine.frequency_labels, key="tab1_freq")
+        with col2:
+            pet_profile_filter = st.selectbox("반려동물 유형", ["전체"] + query_engine.profile_labels, key="tab1_profile")
+        with col3:
+            club_filter = st.selectbox("Club+ 회원", ["전체"] + list(CLUB_FILTERS), key="tab1_club")
+        with col4:
+            spend_filter = st.selectbox("펫 지출 구간", ["전체"] + list(CUSTOMER_SPEND_FILTERS), key="tab1_spend")
+        
+        category_filter = st.multiselect("펫 카테고리 (모두 구매한 고객)", query_engine.category_index.labels, key="tab1_category")
+        search_term = st.text_input("🔍 고객 ID 검색", placeholder="고객 ID를 입력하세요 (앞자리 일치)", key="tab1_search")
+        
+        # 고객 데이터 필터링 (필터 조합별 결과 위치는 엔진에 캐시)
+        filtered_positions = query_engine.query(
+            frequency=None if frequency_filter == "전체" else frequency_filter,
+            pet_profile=None if pet_profile_filter == "전체" else pet_profile_filter,
+            club=CLUB_FILTERS.get(club_filter),
+            spend_range=CUSTOMER_SPEND_FILTERS.get(spend_filter),
+            categories=category_filter,
+            search=search_term,
+        )
+        
+        st.metric("필터링된 고객 수", f"{len(filtered_positions):,}명")
+        
+        st.markdown("---")
+        if len(filtered_positions) > 0:
+            # 정렬/페이지 선택 후 보이는 페이지의 행만 꺼내 포맷
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sort_label = st.selectbox("정렬 기준", list(CUSTOMER_SORT_COLUMNS), key="tab1_sort")
+            with col2:
+                sort_ascending = st.radio("정렬 순서", ["오름차순", "내림차순"], horizontal=True, key="tab1_sort_order") == "오름차순"
+            with col3:
+                list_page, list_page_count = table_page_selector(len(filtered_positions), key="tab1_page")
+            ordered_positions = query_engine.sort_positions(filtered_positions, CUSTOMER_SORT_COLUMNS[sort_label], sort_ascending)
+            page_positions = ordered_positions[(list_page - 1) * TABLE_PAGE_SIZE:list_page * TABLE_PAGE_SIZE]
+            display_df = customer_details(pet_customers.iloc[page_positions])[[
+                'customer_name', 'pet_profile', 'frequency_category',
+                'pet_spend', 'club_plus_member', 'last_purchase_days'
+            ]]
+            display_df.columns = ['고객명', '반려동물', '구매빈도', '펫지출(£)', 'Club+', '미방문일']
+            display_df['Club+'] = np.where(display_df['Club+'], "🌟", "📱")
+            st.dataframe(display_df, use_container_width=True, height=400)
+            st.caption(f"{list_page} / {list_page_count} 페이지")
+        else:
+            st.warning("필터 조건에 맞는 고객이 없습니다.")
+            
+        # 세션에는 필터링된 고객의 행 위치만 저장 (메시지 탭에서 필요한 만큼만 꺼내 씀)
+        st.session_state.filtered_positions_for_messaging = filtered_positions
+
+    # TAB 2: 메시지 작성
+    with tab2, timer("메시지 작성"):
+        st.subheader("📝 메시지 작성 및 발송")
+        col1, col2 = st.columns([1, 2])
+        
+        with col1:
+            st.markdown("#### 📋 고객 선택")
+            selection_method = st.radio("고객 선택 방식", ["개별 선택", "필터된 고객 전체"], key="msg_selection")
+            
+            # 발송 대상은 pet_customers 의 행 위치로 관리 (필요한 청크만 DataFrame 으로 꺼냄)
+            target_positions = np.arange(0)
+            if selection_method == "개별 선택":
+                selected_position = customer_picker(load_household_index(*dataset_key), "메시지를 보낼 고객을 선택하세요:", key="msg_customer_select")
+                if selected_position is not None:
+                    target_positions = np.array([selected_position])
+            else:
+                st.write("**'고객 리스트' 탭에서 필터링된 고객 대상**")
+                target_positions = st.session_state.filtered_positions_for_messaging
+                st.info(f"**선택된 고객 수**: {len(target_positions)}명")
+
+            if len(target_positions) > 0:
+                st.markdown("#### 📊 선택된 고객 정보")
+                if len(target_positions) == 1:
+                    customer = customer_details(pet_customers.iloc[target_positions[:1]]).iloc[0]
+                    st.write(f"**고객명**: {customer['customer_name']}")
+                    st.write(f"**반려동물**: {customer['pet_profile']}")
+                else:
+                    st.write(f"**평균 펫 지출**: £{pet_customers['pet_spend'].to_numpy()[target_positions].mean():.2f}")
+                    st.write(f"**평균 미방문일**: {pet_customers['last_purchase_days'].to_numpy()[target_positions].mean():.0f}일")
+        
+        with col2:
+            st.markdown("#### 📝 메시지 작성")
+            template_choice = st.selectbox("메시지 템플릿 선택", ["직접 작성"] + list(MESSAGE_TEMPLATES.keys()), key="msg_template")
+            
+            message_content = ""
+            if template_choice == "직접 작성":
+                message_content = st.text_area("메시지 내용", height=200, placeholder="개인화 변수: {customer_name}, {pet_profile} 등", key="msg_direct_input")
+            else:
+                template = MESSAGE_TEMPLATES[template_choice]
+                if len(target_positions) == 1:
+                    preview_message = personalize_message(template, customer_details(pet_customers.iloc[target_positions[:1]]).iloc[0])
+                    st.write("**메시지 미리보기:**"); st.info(preview_message)
+                message_content = st.text_area("메시지 내용 (편집 가능)", value=template, height=200, key="msg_template_edit")
+            
+            if st.button("📤 메시지 발송", type="primary"):
+                try:
+                    template_parts = compile_message_template(message_content) if message_content else None
+                except (KeyError, ValueError) as e:
+                    template_parts = None
+                    st.error(f"알 수 없는 개인화 변수입니다: {e}")
+                if template_parts is not None and len(target_positions) > 0:
+                    progress_bar = st.progress(0)
+                    status_text = st.empty()
+                    message_type = template_choice if template_choice != "직접 작성" else "맞춤 메시지"
+                    
+                    # 청크 단위로 메시지 생성 후 발송 작업으로 등록 (실제 발송은 백그라운드 디스패처가 처리)
+                    total_customers = len(target_positions)
+                    record_chunks = []
+                    for start in range(0, total_customers, MESSAGE_SEND_CHUNK_SIZE):
+                        batch = customer_details(pet_customers.iloc[target_positions[start:start + MESSAGE_SEND_CHUNK_SIZE]])
+                        record_chunks.append(build_message_records(batch, render_messages(template_parts, batch), message_type))
+                        done = start + len(batch)
+                        progress_bar.progress(done / total_customers)
+                        status_text.text(f"메시지 생성 중... ({done}/{total_customers})")
+                    job_id = get_sms_dispatcher().submit_job(
+                        pd.concat(record_chunks, ignore_index=True), load_phone_vault(*dataset_key)
+                    )
+                    
+                    status_text.empty(); progress_bar.empty()
+                    # 같은 내용의 발송은 디스패처가 기존 작업 ID 를 돌려줌 (중복 발송 없음)
+                    if job_id in st.session_state.sms_jobs:
+                        st.info(f"이미 등록된 발송입니다. (작업 ID: {job_id})")
+                    else:
+                        st.session_state.sms_jobs.append(job_id)
+                        st.success(f"✅ 발송 작업 등록: {total_customers}명 (작업 ID: {job_id})")
+                elif template_parts is not None or not message_content:
+                    st.warning("메시지 내용을 입력하고 고객을 선택해주세요.")
+            
+            # 발송 작업 현황 (완료된 작업의 결과는 디스패처가 발송 기록에 저장)
+            if st.session_state.sms_jobs:
+                st.markdown("#### 📡 발송 작업 현황")
+                st.button("🔄 상태 새로고침", key="sms_job_refresh")
+                dispatcher = get_sms_dispatcher()
+                for job_id in reversed(st.session_state.sms_jobs):
+                    job_status = dispatcher.job_status(job_id)
+                    if job_status is None:
+                        continue
+                    processed = job_status['sent'] + job_status['failed']
+                    st.progress(
+                        processed / job_status['total'] if job_status['total'] else 1.0,
+                        text=f"{job_id} · {job_status['state']} · 성공 {job_status['sent']}건 / "
+                             f"실패 {job_status['failed']}건 / 대기 {job_status['pending']}건"
+                    )
+
+    # TAB 3: 발송 기록
+    with tab3, timer("발송 기록"):
+        st.subheader("📊 메시지 발송 기록")
+        
+        history_summary = message_store.summary()
+        if not history_summary.empty:
+            col1, col2, col3 = st.columns(3)
+            success_count = int(history_summary['success'].sum())
+            total_sent = int(history_summary['sent'].sum())
+            col1.metric("총 발송 건수", f"{total_sent}건")
+            col2.metric("발송 성공", f"{success_count}건")
+            col3.metric("발송 성공률", f"{(success_count / total_sent * 100):.1f}%" if total_sent > 0 else "0.0%")
+            
+            st.markdown("---")
+            st.subheader("📈 메시지 유형별 발송 현황")
+            st.bar_chart(history_summary['sent'])
+            
+            st.markdown("---")
+            st.subheader("📋 최근 발송 기록")
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                history_type = st.selectbox("메시지 유형", ["전체"] + history_summary.index.tolist(), key="history_type")
+            with col2:
+                history_customer = st.text_input("고객 ID", key="history_customer").strip()
+            with col3:
+                history_newest_first = st.radio("정렬 순서", ["최신순", "오래된순"], horizontal=True, key="history_order") == "최신순"
+            history_filter = {
+                'message_type': None if history_type == "전체" else history_type,
+                'customer_id': int(history_customer) if history_customer.isdigit() else None,
+            }
+            with col4:
+                history_total = message_store.count(**history_filter)
+                history_page, history_pages = table_page_selector(history_total, key="history_page")
+            # 페이지별 마지막 키를 기억해 이웃 페이지는 키셋으로 바로 읽음 (필터/정렬/건수가 바뀌면 초기화)
+            history_view = (*history_filter.values(), history_newest_first, history_total)
+            if st.session_state.get('history_page_keys', (None,))[0] != history_view:
+                st.session_state.history_page_keys = (history_view, {})
+            page_keys = st.session_state.history_page_keys[1]
+            display_history = message_store.page(
+                history_page, TABLE_PAGE_SIZE, newest_first=history_newest_first,
+                after=page_keys.get(history_page - 1), **history_filter
+            )
+            page_keys[history_page] = message_store.page_key(display_history)
+            # 저장소에는 마스킹된 번호만 기록되지만 이전에 원번호로 기록된 행도 일괄 마스킹해 표시
+            display_history['phone_number'] = mask_phone_strings(display_history['phone_number'])
+            st.dataframe(display_history, use_container_width=True)
+            st.caption(f"{history_page} / {history_pages} 페이지")
+        else:
+            st.info("아직 발송된 메시지가 없습니다.")
@@ -0,0 +1,109 @@
+"""대시보드 (핵심 지표, 빈도/지출 분포, 주기상향 카테고리)"""
+import pandas as pd
+import streamlit as st
+
+from dna_pet.app import load_customer_data
+from dna_pet.data import customer_details
+from dna_pet.metrics import section
+
+def render(dataset_key):
+    """대시보드 페이지"""
+    pet_customers, frequency_changes, _ = load_customer_data(*dataset_key)
+    st.title("🐾Dashboard")
+    
+    # 주요 지표
+    section("주요 지표")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("총 펫 고객 수", f"{len(pet_customers):,}명")
+    
+    with col2:
+        total_pet_spend = pet_customers['pet_spend'].sum()
+        st.metric("펫 제품 총 매출", f"£{total_pet_spend:,.2f}")
+    
+    with col3:
+        avg_pet_spend = pet_customers['pet_spend'].mean()
+        st.metric("평균 펫 지출", f"£{avg_pet_spend:.2f}")
+    
+    with col4:
+        upgrade_candidates = pet_customers[pet_customers['frequency_category'].isin(['저빈도', '월간구매', '한달이상'])]
+        potential_total_revenue = upgrade_candidates['total_spend'].sum() * 0.15
+        st.metric("상향이동 잠재 수익", f"£{potential_total_revenue:,.2f}")
+    
+    st.markdown("---")
+    
+    # 차트 섹션
+    section("분포 차트")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📈 고객 구매 빈도 분포")
+        
+        frequency_counts = pet_customers['frequency_category'].value_counts()
+        frequency_order = ['초고빈도', '주간구매', '고빈도', '월간구매', '저빈도', '한달이상']
+        
+        chart_data = pd.DataFrame({
+            '고객수': [frequency_counts.get(cat, 0) for cat in frequency_order]
+        }, index=frequency_order)
+        
+        st.bar_chart(chart_data)
+        
+        frequency_descriptions = {
+            '초고빈도': '0-4일 간격 (월 7회 이상)',
+            '주간구매': '5-7일 간격 (월 5-6회)',
+            '고빈도': '8-10일 간격 (월 4회)',
+            '저빈도': '11-13일 간격 (월 3회)',
+            '월간구매': '14-30일 간격 (월 1-2회)',
+            '한달이상': '30일+ 간격 (월 1회 미만)'
+        }
+        
+        for category in frequency_order:
+            if category in frequency_counts:
+                count = frequency_counts[category]
+                percentage = count / len(pet_customers) * 100
+                description = frequency_descriptions.get(category, "")
+                st.write(f"• **{category}** ({description}): {count}명 ({percentage:.1f}%)")
+    
+    with col2:
+        st.subheader("💰 펫고객별 총매출 순위")
+        
+        top_customers = customer_details(pet_customers.nlargest(10, 'total_spend'))
+        spend_analysis_sorted = top_customers[['customer_name', 'pet_spend', 'total_spend', 'frequency_category']]
+        st.dataframe(spend_analysis_sorted)
+        
+        top_customer = top_customers.iloc[0]
+        avg_total_spend = pet_customers['total_spend'].mean()
+        st.write(f"👑 **최고 매출 고객**: {top_customer['customer_name']} (£{top_customer['total_spend']:,.2f})")
+        st.write(f"📊 **평균 총 매출**: £{avg_total_spend:,.2f}")        
+        
+    # 주기상향 기회 분석
+    section("주기상향 기회")
+    st.subheader("🎯 주기상향 기회 분석")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("카테고리별 상향 잠재력")
+        
+        top_categories = frequency_changes[frequency_changes['level'] == 'middle'].head(8)
+        chart_data = top_categories[['category', 'percentage_change']].set_index('category')
+        st.bar_chart(chart_data)
+        
+        for _, row in top_categories.iterrows():
+            st.write(f"• **{row['category']}**: {row['percentage_change']:.1f}% 증가 (£{row['sales_change']:.2f})")
+    
+    with col2:
+        st.subheader("상향 대상 고객 식별")
+        
+        upgrade_candidates = pet_customers[pet_customers['frequency_category'].isin(['저빈도', '월간구매', '한달이상'])]
+        
+        st.write(f"**상향 대상 고객**: {len(upgrade_candidates)}명")
+        st.write(f"**평균 펫 지출**: £{upgrade_candidates['pet_spend'].mean():.2f}")
+        st.write(f"**평균 총 지출**: £{upgrade_candidates['total_spend'].mean():.2f}")
+        st.write(f"**Club+ 회원**: {upgrade_candidates['club_plus_member'].sum()}명")
+        
+        spend_dist = upgrade_candidates['spend_range'].value_counts()
+        
+        for range_label, count in spend_dist.items():
+            st.write(f"• **{range_label}**: {count}명")
@@ -0,0 +1,57 @@
+"""수익 예측 (주기상향 시나리오별 몬테카를로 예측)"""
+import streamlit as st
+
+from dna_pet.analytics import REVENUE_FORECAST_DRAWS, REVENUE_FORECAST_INTERVAL
+from dna_pet.app import forecast_revenue
+from dna_pet.metrics import section
+
+def render(dataset_key):
+    """수익 예측 페이지"""
+    st.title("💰 수익 예측 분석")
+    st.subheader("📈 주기상향 시나리오별 수익 예측")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        conversion_rate = st.slider(
+            "전환율 (%)", min_value=1, max_value=50, value=15,
+            help="선택된 고객 중 실제 상향되는 비율"
+        )
+    
+    with col2:
+        target_months = st.slider(
+            "목표 기간 (월)", min_value=1, max_value=12, value=6,
+            help="상향 효과를 측정할 기간"
+        )
+    
+    # 전체 시나리오 예측 (슬라이더 설정별 캐시)
+    section("예측")
+    results_df, monthly_forecast = forecast_revenue(dataset_key, conversion_rate, target_months)
+    total_projected_revenue = results_df['총 예상 수익 증가(£)'].sum()
+
+    section("결과 표시")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("총 예상 수익 증가", f"£{total_projected_revenue:,.2f}")
+        st.caption(f"{REVENUE_FORECAST_INTERVAL:.0%} 신뢰구간: "
+                   f"£{monthly_forecast['하한'].iloc[-1]:,.0f} ~ £{monthly_forecast['상한'].iloc[-1]:,.0f}")
+    with col2:
+        total_converted = int(results_df['전환 예상'].sum())
+        st.metric("총 전환 예상 고객", f"{total_converted}명")
+    with col3:
+        monthly_avg = total_projected_revenue / target_months if target_months > 0 else 0
+        st.metric("월평균 수익 증가", f"£{monthly_avg:,.2f}")
+    
+    st.subheader("📈 월별 누적 수익 증가 예측")
+    st.line_chart(monthly_forecast)
+    st.caption(f"몬테카를로 {REVENUE_FORECAST_DRAWS:,}회 시뮬레이션 ({REVENUE_FORECAST_INTERVAL:.0%} 구간)")
+    
+    st.subheader("📋 시나리오별 상세 예측")
+    if not results_df.empty:
+        st.dataframe(results_df.style.format({
+            '평균 총 지출(£)': "£{:.2f}",
+            '월 예상 수익 증가(£)': "£{:.2f}",
+            '총 예상 수익 증가(£)': "£{:.2f}",
+            '하한(£)': "£{:.2f}",
+            '상한(£)': "£{:.2f}"
+        }))
@@ -0,0 +1,76 @@
+"""주기상향 추천 (빈도 등급 상향 시 카테고리별 매출 변화)"""
+import streamlit as st
+
+from dna_pet.app import load_customer_data
+from dna_pet.data import CATEGORY_LEVELS, CATEGORY_LEVEL_LABELS
+from dna_pet.metrics import section
+
+def render(dataset_key):
+    """주기상향 추천 페이지"""
+    pet_customers, frequency_changes, _ = load_customer_data(*dataset_key)
+    st.title("📈 주기상향 추천")
+    
+    upgrade_path = st.selectbox(
+        "상향 경로를 선택하세요:",
+        [
+            "주간구매 → 초고빈도",
+            "월간구매 → 저빈도",
+            "고빈도 → 주간구매",
+            "저빈도 → 고빈도",
+            "한달이상 → 월간구매",
+            "초고빈도 유지 - VIP 관리"
+        ]
+    )
+    
+    st.subheader(f"🎯 {upgrade_path} 추천 전략")
+    
+    path_map = {
+        "주간구매 → 초고빈도": "주간구매",
+        "월간구매 → 저빈도": "월간구매",
+        "고빈도 → 주간구매": "고빈도",
+        "저빈도 → 고빈도": "저빈도",
+        "한달이상 → 월간구매": "한달이상",
+        "초고빈도 유지 - VIP 관리": "초고빈도"
+    }
+    
+    section("대상 고객")
+    target_frequency = path_map[upgrade_path]
+    target_customers = pet_customers[pet_customers['frequency_category'] == target_frequency]
+    
+    col1, col2 = st.columns([1, 2])
+    
+    with col1:
+        st.subheader("📊 대상 고객 정보")
+        st.metric("대상 고객 수", f"{len(target_customers)}명")
+        if len(target_customers) > 0:
+            st.metric("평균 펫 지출", f"£{target_customers['pet_spend'].mean():.2f}")
+            st.metric("평균 총 지출", f"£{target_customers['total_spend'].mean():.2f}")
+            club_plus_count = target_customers['club_plus_member'].sum()
+            st.metric("Club+ 회원", f"{club_plus_count}명 ({club_plus_count/len(target_customers)*100:.1f}%)")
+    
+    section("추천 카테고리")
+    with col2:
+        st.subheader("🛒 추천 제품/카테고리")
+        available_levels = [level for level in CATEGORY_LEVELS if level in set(frequency_changes['level'])]
+        category_level = st.selectbox(
+            "분류 수준", available_levels, index=available_levels.index('middle') if 'middle' in available_levels else 0,
+            format_func=CATEGORY_LEVEL_LABELS.get, key="upgrade_category_level"
+        )
+        top_categories = frequency_changes[frequency_changes['level'] == category_level].head(6)
+        
+        for _, category in top_categories.iterrows():
+            col_cat1, col_cat2, col_cat3 = st.columns([2, 1, 1])
+            
+            with col_cat1:
+                st.write(f"**{category['category']}**")
+            
+            with col_cat2:
+                st.metric("예상 매출 증가", f"£{category['sales_change']:.2f}")
+            
+            with col_cat3:
+                st.metric("증가율", f"{category['percentage_change']:.1f}%")
+            
+            # 증분(유지 가구 대비)이 음수인 카테고리도 있으므로 0~1 로 제한
+            progress = min(max(category['percentage_change'] / 1000, 0.0), 1.0)
+            st.progress(progress)
+            st.markdown("---")
@@ -0,0 +1,78 @@
+"""개인정보(전화번호) 토큰화/마스킹
+
+적재 시 한 번 전화번호를 무작위 대리 키(phone_token)와 마스킹용 앞자리(phone_mask)로 바꾸고,
+원번호는 PhoneVault 에만 둔다. 분석/표시 경로는 토큰과 마스킹 번호만 쓰고,
+원번호는 발송 경로(SmsDispatcher)에서 토큰으로만 조회한다.
+"""
+import numpy as np
+import pandas as pd
+
+PHONE_TEMPLATE = "000-0000-0000"
+# 앞자리 2자리(0 제외)와 가운데 4자리의 문자 위치 (PHONE_TEMPLATE 기준)
+PHONE_PREFIX_GROUPS = ((1, 2, 10_000), (4, 4, 1))
+
+def pack_phone_numbers(prefix, middle, last):
+    """휴대전화 번호 '0{prefix}-{middle}-{last}' (prefix 2자리, middle/last 4자리 정수 배열) → uint32"""
+    return (np.asarray(prefix, dtype=np.int64) * 100_000_000
+            + np.asarray(middle, dtype=np.int64) * 10_000
+            + np.asarray(last, dtype=np.int64)).astype(np.uint32)
+
+def _phone_strings(values, template, groups):
+    # 템플릿 문자 배열에 자릿수 그룹(문자 위치, 자릿수, 나눗수)을 더해 고정폭 문자열로 변환 (0 은 빈 문자열)
+    values = np.asarray(values, dtype=np.int64)
+    chars = np.tile(np.array([ord(c) for c in template], dtype=np.uint32), (len(values), 1))
+    for offset, width, divisor in groups:
+        group = values // divisor % 10 ** width
+        for pos in range(width):
+            chars[:, offset + pos] += ((group // 10 ** (width - 1 - pos)) % 10).astype(np.uint32)
+    return np.where(values > 0, chars.view(f'<U{len(template)}').ravel(), '')
+
+def format_phone_numbers(packed):
+    """pack_phone_numbers 결과를 '010-XXXX-XXXX' 문자열 배열로 변환 (0 은 빈 문자열)"""
+    return _phone_strings(packed, PHONE_TEMPLATE,
+                          ((1, 2, 100_000_000), (4, 4, 10_000), (9, 4, 1)))
+
+def mask_phone_numbers(phone_mask):
+    """phone_mask(원번호 // 10000) 배열을 '010-XXXX-****' 문자열 배열로 일괄 변환 (0 은 빈 문자열)"""
+    return _phone_strings(phone_mask, PHONE_TEMPLATE[:-4] + "****", PHONE_PREFIX_GROUPS)
+
+def mask_phone_strings(phone_numbers):
+    """전화번호 문자열 컬럼 일괄 마스킹 (4자리 이상이면 뒤 4자리를 ****로, 이미 마스킹된 값은 그대로)"""
+    phone_numbers = pd.Series(phone_numbers).astype('string')
+    return phone_numbers.where(phone_numbers.str.len() < 4, phone_numbers.str[:-4] + "****")
+
+class PhoneVault:
+    """전화번호 토큰 → 원번호 조회 (발송 경로 전용, 토큰 t 의 번호는 numbers[t - 1], 토큰 0 은 번호 없음)"""
+
+    def __init__(self, numbers):
+        self.numbers = numbers
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def resolve(self, tokens):
+        """토큰 배열 → '010-XXXX-XXXX' 원번호 문자열 배열 (없는 토큰은 빈 문자열)"""
+        tokens = np.asarray(tokens, dtype=np.int64)
+        valid = (tokens > 0) & (tokens <= len(self.numbers))
+        packed = np.zeros(len(tokens), dtype=np.int64)
+        packed[valid] = self.numbers[tokens[valid] - 1]
+        return format_phone_numbers(packed)
+
+def tokenize_phone_numbers(pet_customers, seed=None):
+    """phone_number(uint32) 컬럼을 phone_token/phone_mask 로 바꾼 고객 표와 PhoneVault
+
+    토큰은 번호가 있는 행에 1..N 을 무작위 순서로 부여한 대리 키라 번호나 행 순서와 관계가 없다.
+    순서는 seed 로 정해지므로, 토큰을 캐시 밖에서도 쓰려면 원천 데이터에서 얻은 같은 seed 를 넘겨야 한다.
+    """
+    packed = pet_customers['phone_number'].to_numpy(dtype=np.int64)
+    has_phone = packed > 0
+    tokens = np.zeros(len(packed), dtype=np.uint32)
+    tokens[has_phone] = np.random.default_rng(seed).permutation(np.count_nonzero(has_phone)) + 1
+    numbers = np.empty(np.count_nonzero(has_phone), dtype=np.uint32)
+    numbers[tokens[has_phone].astype(np.int64) - 1] = packed[has_phone]
+
+    position = pet_customers.columns.get_loc('phone_number')
+    pet_customers = pet_customers.drop(columns='phone_number')
+    pet_customers.insert(position, 'phone_token', tokens)
+    pet_customers.insert(position + 1, 'phone_mask', (packed // 10_000).astype(np.uint32))
+    return pet_customers, PhoneVault(numbers)
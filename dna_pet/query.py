@@ -0,0 +1,158 @@
+"""고객 조회 (가구 ID 색인, 고객 리스트 필터 조회 엔진)"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dna_pet.data import customer_names
+from dna_pet.metrics import count, timer
+
+# === 가구 ID 색인 (해시 조회로 행 위치, 정렬된 문자열 배열로 접두어 검색) ===
+CUSTOMER_PICKER_LIMIT = 100
+
+def normalize_customer_search(term):
+    """고객 검색어 정리 (앞뒤 공백과 '고객' 접두어 제거)"""
+    term = term.strip()
+    if term.startswith('고객'):
+        term = term[len('고객'):].strip()
+    return term
+
+class HouseholdIndex:
+    """household_key → 행 위치 해시 색인과 ID 접두어 검색용 정렬 배열"""
+
+    def __init__(self, household_keys):
+        self.household_keys = np.asarray(household_keys)
+        self._positions = pd.Index(self.household_keys)
+        key_strings = self.household_keys.astype(str)
+        self._key_order = np.argsort(key_strings, kind='stable')
+        self._key_sorted = key_strings[self._key_order]
+
+    def position(self, household_key):
+        """가구의 행 위치 (없으면 None)"""
+        try:
+            position = self._positions.get_loc(household_key)
+        except KeyError:
+            return None
+        return position if isinstance(position, (int, np.integer)) else int(np.flatnonzero(position)[0])
+
+    def positions(self, household_keys):
+        """가구 ID 배열의 행 위치 배열 (없는 ID 는 -1)"""
+        return self._positions.get_indexer(household_keys)
+
+    def prefix_positions(self, prefix):
+        """ID 가 접두어로 시작하는 가구의 행 위치 (ID 문자열 순)"""
+        lo = np.searchsorted(self._key_sorted, prefix, side='left')
+        hi = np.searchsorted(self._key_sorted, prefix + '\uffff', side='left')
+        return self._key_order[lo:hi]
+
+    def search(self, term, limit=CUSTOMER_PICKER_LIMIT):
+        """검색어에 맞는 가구 ID 최대 limit 개 (빈 검색어는 데이터 순 앞부분)"""
+        term = normalize_customer_search(term)
+        if not term:
+            return self.household_keys[:limit].tolist()
+        if not term.isdigit():
+            return []
+        # ID 문자열 순이므로 정확히 일치하는 ID 가 맨 앞에 온다
+        return self.household_keys[self.prefix_positions(term)[:limit]].tolist()
+
+# === 고객 리스트 필터 조회 (범주 코드/정렬된 지출 배열 기반, 필터 조합별 결과 LRU 캐시) ===
+CUSTOMER_SPEND_FILTERS = {
+    "£0-50": (0, 50), "£50-100": (50, 100), "£100-150": (100, 150), "£150+": (150, np.inf),
+}
+CLUB_FILTERS = {"Club+ 회원": True, "일반 회원": False}
+CUSTOMER_SORT_COLUMNS = {
+    "기본 순서": None, "펫지출": 'pet_spend', "총지출": 'total_spend',
+    "미방문일": 'last_purchase_days', "고객 ID": 'household_key',
+}
+
+class CustomerQueryEngine:
+    """고객 리스트 필터 조회 엔진
+
+    필터 조건은 사전 계산한 범주 코드 비교, 정렬된 지출 배열의 이진 탐색, 카테고리 비트맵으로
+    하나의 마스크 버퍼에 누적하고, 결과 행 위치는 필터 조합 튜플별로 LRU 캐시한다.
+    """
+
+    def __init__(self, pet_customers, category_index, household_index, cache_size=64):
+        self.customers = pet_customers
+        self.size = len(pet_customers)
+        self.category_index = category_index
+        self.household_index = household_index
+        frequency = pd.Categorical(pet_customers['frequency_category'])
+        profile = pd.Categorical(pet_customers['pet_profile'])
+        self.frequency_labels = pet_customers['frequency_category'].unique().tolist()
+        self.profile_labels = sorted(profile.categories.tolist())
+        self._frequency = (frequency.codes, {label: code for code, label in enumerate(frequency.categories)})
+        self._profile = (profile.codes, {label: code for code, label in enumerate(profile.categories)})
+        self._club = pet_customers['club_plus_member'].to_numpy(dtype=bool)
+
+        # 지출 구간은 정렬 순서의 연속 구간으로 조회
+        pet_spend = pet_customers['pet_spend'].to_numpy(dtype=np.float64)
+        self._spend_order = np.argsort(pet_spend, kind='stable')
+        self._spend_sorted = pet_spend[self._spend_order]
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._sort_orders = {}
+        self._lock = threading.Lock()
+
+    def _spend_positions(self, low, high):
+        lo = np.searchsorted(self._spend_sorted, low, side='left')
+        hi = np.searchsorted(self._spend_sorted, high, side='right')
+        return self._spend_order[lo:hi]
+
+    def _compute(self, frequency, pet_profile, club, spend_range, categories, search):
+        mask = self.category_index.match_all(list(categories)) if categories else np.ones(self.size, dtype=bool)
+        for value, (codes, lookup) in ((frequency, self._frequency), (pet_profile, self._profile)):
+            if value is not None:
+                mask &= codes == lookup.get(value, -2)
+        if club is not None:
+            mask &= self._club if club else ~self._club
+        for positions in (
+            self._spend_positions(*spend_range) if spend_range is not None else None,
+            self.household_index.prefix_positions(search) if search and search.isdigit() else None,
+        ):
+            if positions is not None:
+                selected = np.zeros(self.size, dtype=bool)
+                selected[positions] = True
+                mask &= selected
+        positions = np.flatnonzero(mask)
+        if search and not search.isdigit():
+            # 숫자가 아닌 검색어는 후보 고객명(가구 ID 로 생성)에 대해서만 부분 문자열 검색
+            names = customer_names(self.household_index.household_keys[positions])
+            positions = positions[names.str.contains(search, case=False, regex=False, na=False).to_numpy()]
+        positions.flags.writeable = False
+        return positions
+
+    def query(self, frequency=None, pet_profile=None, club=None, spend_range=None, categories=(), search=""):
+        """필터 조건에 맞는 고객 행 위치 (오름차순, 읽기 전용 배열; None/빈 값 조건은 전체)"""
+        search = normalize_customer_search(search)
+        key = (frequency, pet_profile, club, spend_range, tuple(sorted(categories)), search)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                count('query_cache_hit')
+                return self._cache[key]
+        count('query_cache_miss')
+        with timer('customer_query'):
+            positions = self._compute(*key)
+        with self._lock:
+            self._cache[key] = positions
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return positions
+
+    def sort_positions(self, positions, sort_by=None, ascending=True):
+        """조회 결과 위치를 컬럼 기준으로 정렬 (컬럼별 전체 정렬 순서를 한 번만 계산해 재사용)"""
+        if sort_by is None:
+            return positions if ascending else positions[::-1]
+        with self._lock:
+            order = self._sort_orders.get(sort_by)
+        if order is None:
+            order = np.argsort(self.customers[sort_by].to_numpy(), kind='stable')
+            with self._lock:
+                self._sort_orders[sort_by] = order
+        selected = np.zeros(self.size, dtype=bool)
+        selected[positions] = True
+        order = order[selected[order]]
+        return order if ascending else order[::-1]
@@ -0,0 +1,327 @@
+"""SMS 발송 (백그라운드 이벤트 루프에서 동시성/속도 제한과 재시도를 적용하는 발송기, 로컬 모의 게이트웨이)"""
+import asyncio
+import collections
+import functools
+import hashlib
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# 완료 후에도 상태를 조회할 수 있게 남겨 두는 작업 수 (오래된 완료 작업부터 정리)
+SMS_FINISHED_JOB_LIMIT = 50
+
+# === 비동기 SMS 발송 (백그라운드 이벤트 루프 + 동시성 제한 + 속도 제한 + 재시도) ===
+class TokenBucket:
+    """초당 rate 건, 최대 capacity 건까지 몰아서 허용하는 토큰 버킷 (이벤트 루프 내부 전용)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class SmsGatewayError(Exception):
+    """SMS 게이트웨이 응답 오류 (retryable 이면 재시도 대상)"""
+
+    def __init__(self, message, retryable):
+        super().__init__(message)
+        self.retryable = retryable
+
+def campaign_key(records):
+    """발송 기록의 (customer_id, message_type, message_content) 로 정한 캠페인 ID (같은 발송이면 같은 값)"""
+    hashes = pd.util.hash_pandas_object(records[['customer_id', 'message_type', 'message_content']], index=False)
+    return hashlib.blake2b(np.sort(hashes.to_numpy()).tobytes(), digest_size=6).hexdigest()
+
+class SmsDispatcher:
+    """SMS 발송 작업을 백그라운드 스레드의 asyncio 루프에서 처리하는 디스패처
+
+    작업(job)은 submit_job 으로 등록하고 job_status / job_records 로 상태를 조회한다.
+    작업이 끝나면 on_complete(records, job_id=...) 로 발송 결과를 저장한 뒤 메시지별 결과는 메모리에서 비우고
+    (저장에 실패하면 '기록 실패' 상태로 결과를 남김), 완료된 작업은 최근 finished_job_limit 건만 남긴다.
+    각 메시지는 '캠페인 ID:household_key' 멱등성 키로 보내므로 재시도하거나 같은 캠페인을 다시 등록해도
+    게이트웨이가 중복 발송하지 않는다. 속도 제한(rate_per_second)과 동시 연결 수(concurrency)는
+    모든 작업이 하나의 토큰 버킷과 연결 풀을 나눠 쓰므로 디스패처 전체에 적용된다.
+    """
+
+    def __init__(self, gateway_url, concurrency=16, rate_per_second=200, max_attempts=4,
+                 backoff_seconds=0.5, timeout_seconds=10, finished_job_limit=SMS_FINISHED_JOB_LIMIT,
+                 on_complete=None):
+        parsed = urllib.parse.urlsplit(gateway_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.path = parsed.path or '/'
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.finished_job_limit = finished_job_limit
+        self.on_complete = on_complete
+        self.jobs = {}
+        self.campaigns = {}
+        self.finished_jobs = collections.deque()
+        self.lock = threading.Lock()
+        # 작업 간 공유: 토큰 버킷과 연결 풀 (연결 슬롯 concurrency 개, None 은 아직 맺지 않은 연결)
+        self.bucket = TokenBucket(rate_per_second)
+        self.connections = asyncio.Queue()
+        for _ in range(concurrency):
+            self.connections.put_nowait(None)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="sms-dispatcher", daemon=True)
+        self.thread.start()
+
+    def submit_job(self, records, phone_vault=None, campaign_id=None):
+        """발송 기록 DataFrame(customer_id, phone_token, message_content 등)을 작업으로 등록하고 작업 ID 반환
+
+        phone_vault 가 있으면 phone_token 으로 원번호를 조회해 작업 안에만 두고(완료 후 폐기),
+        없으면 phone_number 컬럼 값으로 보낸다. campaign_id 를 주지 않으면 발송 내용으로 정하며(campaign_key),
+        같은 캠페인이 이미 등록되어 있으면 새 작업을 만들지 않고 기존 작업 ID 를 반환한다.
+        """
+        records = records.drop_duplicates('customer_id').reset_index(drop=True)
+        campaign_id = campaign_id or campaign_key(records)
+        with self.lock:
+            if self.campaigns.get(campaign_id) in self.jobs:
+                return self.campaigns[campaign_id]
+        job_id = uuid.uuid4().hex[:12]
+        if phone_vault is not None:
+            phones = phone_vault.resolve(records['phone_token'].to_numpy()).tolist()
+        else:
+            phones = records['phone_number'].tolist()
+        job = {
+            'job_id': job_id, 'campaign_id': campaign_id, 'state': '대기', 'total': len(records), 'sent': 0, 'failed': 0,
+            'records': records, 'status': np.full(len(records), "발송 대기", dtype=object),
+            # 루프에서 행 단위 접근 비용이 없도록 발송에 필요한 컬럼을 목록으로 미리 추출
+            'phones': phones,
+            'messages': records['message_content'].tolist(),
+            'message_types': records['message_type'].tolist(),
+            'customer_ids': records['customer_id'].tolist(),
+            'send_time': np.full(len(records), '', dtype=object),
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with self.lock:
+            if self.campaigns.get(campaign_id) in self.jobs:
+                return self.campaigns[campaign_id]
+            self.jobs[job_id] = job
+            self.campaigns[campaign_id] = job_id
+        asyncio.run_coroutine_threadsafe(self._run_job(job), self.loop)
+        return job_id
+
+    def job_status(self, job_id):
+        """작업 진행 상태 (state, total, sent, failed, pending), 없거나 정리된 작업이면 None"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {
+                'job_id': job_id, 'state': job['state'], 'total': job['total'], 'sent': job['sent'],
+                'failed': job['failed'], 'pending': job['total'] - job['sent'] - job['failed'],
+                'created_at': job['created_at'],
+            }
+
+    def job_records(self, job_id):
+        """작업의 메시지별 발송 결과가 반영된 발송 기록 (on_complete 로 저장된 뒤에는 KeyError)"""
+        with self.lock:
+            job = self.jobs[job_id]
+            if job['records'] is None:
+                raise KeyError(job_id)
+            return job['records'].assign(status=job['status'].copy(), send_time=job['send_time'].copy())
+
+    async def _run_job(self, job):
+        job['state'] = '발송 중'
+        queue = asyncio.Queue()
+        for position in range(job['total']):
+            queue.put_nowait(position)
+        try:
+            workers = [asyncio.create_task(self._worker(job, queue))
+                       for _ in range(min(self.concurrency, max(job['total'], 1)))]
+            await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            job['phones'] = None  # 원번호는 발송 중에만 보관
+            with self.lock:
+                # 처리되지 못한 메시지는 발송 실패로 기록
+                pending = job['status'] == "발송 대기"
+                job['status'][pending] = "발송 실패"
+                job['send_time'][pending] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                job['failed'] += int(pending.sum())
+            await self._finish_job(job)
+
+    async def _finish_job(self, job):
+        # 발송 결과 저장(SQLite 쓰기는 루프 밖 스레드에서) 후 메시지별 결과를 비우고, 보관 한도를 넘는 오래된 완료 작업은 정리
+        state, persisted = '완료', False
+        if self.on_complete is not None:
+            try:
+                await self.loop.run_in_executor(
+                    None, functools.partial(self.on_complete, self.job_records(job['job_id']), job_id=job['job_id'])
+                )
+                persisted = True
+            except Exception:
+                state = '기록 실패'
+        with self.lock:
+            if persisted:
+                for key in ('records', 'status', 'send_time', 'messages', 'message_types', 'customer_ids'):
+                    job[key] = None
+            job['state'] = state
+            self.finished_jobs.append(job['job_id'])
+            while len(self.finished_jobs) > self.finished_job_limit:
+                removed = self.jobs.pop(self.finished_jobs.popleft(), None)
+                if removed is not None and self.campaigns.get(removed['campaign_id']) == removed['job_id']:
+                    del self.campaigns[removed['campaign_id']]
+
+    async def _worker(self, job, queue):
+        """큐에서 메시지를 꺼내 공유 연결 풀의 연결로 발송 (연결은 메시지마다 풀에서 빌리고 반납)"""
+        while not queue.empty():
+            position = queue.get_nowait()
+            payload = {
+                'to': job['phones'][position],
+                'message': job['messages'][position],
+                'message_type': job['message_types'][position],
+            }
+            idempotency_key = f"{job['campaign_id']}:{job['customer_ids'][position]}"
+            connection = await self.connections.get()
+            try:
+                success, connection = await self._send(connection, payload, idempotency_key)
+            finally:
+                self.connections.put_nowait(connection)
+
+            with self.lock:
+                job['status'][position] = "발송 성공" if success else "발송 실패"
+                job['send_time'][position] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                job['sent' if success else 'failed'] += 1
+
+    async def _send(self, connection, payload, idempotency_key):
+        """메시지 하나를 재시도하며 발송하고 (성공 여부, 계속 쓸 연결) 반환"""
+        success = False
+        for attempt in range(self.max_attempts):
+            await self.bucket.acquire()
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout_seconds
+                    )
+                await asyncio.wait_for(
+                    self._post(connection, payload, idempotency_key), self.timeout_seconds
+                )
+                success = True
+                break
+            except SmsGatewayError as e:
+                if not e.retryable:
+                    break
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                # 연결 오류는 연결을 새로 맺어 재시도
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+            except Exception:
+                # 응답 파싱 오류 등 예상하지 못한 오류는 재시도 없이 발송 실패 (연결 상태를 알 수 없어 새로 맺음)
+                if connection is not None:
+                    connection[1].close()
+                connection = None
+                break
+            if attempt < self.max_attempts - 1:
+                await asyncio.sleep(self.backoff_seconds * (2 ** attempt) * (1 + random.random()))
+        return success, connection
+
+    async def _post(self, connection, payload, idempotency_key):
+        """keep-alive 연결로 JSON POST 요청 후 응답 상태 확인"""
+        reader, writer = connection
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        writer.write((
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Idempotency-Key: {idempotency_key}\r\n\r\n"
+        ).encode('ascii') + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("게이트웨이 연결이 종료되었습니다.")
+        status = int(status_line.split()[1])
+        content_length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                content_length = int(value.strip())
+        if content_length:
+            await reader.readexactly(content_length)
+        if status == 429 or status >= 500:
+            raise SmsGatewayError(f"게이트웨이 일시 오류 ({status})", retryable=True)
+        if status >= 400:
+            raise SmsGatewayError(f"발송 거부 ({status})", retryable=False)
+
+class MockSmsGateway:
+    """로컬 테스트용 SMS 게이트웨이 (POST 요청을 받아 일정 비율로 일시 오류 응답)
+
+    연락처가 없는 요청은 400 으로 거부하고, 이미 처리한 멱등성 키는 다시 보내지 않고 200 으로 응답한다.
+    """
+
+    def __init__(self, failure_rate=0.05, host='127.0.0.1', port=0):
+        self.failure_rate = failure_rate
+        self.delivered = {}
+        self.request_count = 0
+        gateway = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 keep-alive 지연 방지
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                key = self.headers.get('Idempotency-Key')
+                payload = json.loads(body or b'{}')
+                gateway.request_count += 1
+                if key in gateway.delivered:
+                    self._respond(200, {'duplicate': True})
+                elif not payload.get('to'):
+                    self._respond(400, {'error': 'missing recipient'})
+                elif random.random() < gateway.failure_rate:
+                    self._respond(503, {'error': 'temporarily unavailable'})
+                else:
+                    gateway.delivered[key] = payload
+                    self._respond(200, {'duplicate': False})
+
+            def _respond(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mock-sms-gateway", daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/sms"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,76 @@
+"""산출물 저장소 잠금과 공유 산출물 정리"""
+import os
+import time
+
+import pandas as pd
+
+from dna_pet.artifacts import (
+    ARTIFACT_LOCK_FILE, artifact_lock, current_artifact_version, prune_artifacts, publish_artifacts,
+)
+from dna_pet.build import shared_build
+from dna_pet.data import source_fingerprint
+
+def publish(artifact_dir, version):
+    return publish_artifacts(artifact_dir, version, {'table': pd.DataFrame({'a': [1, 2]})}, {}, {})
+
+def test_lock_is_exclusive_and_released(tmp_path):
+    artifact_dir = str(tmp_path / 'source')
+    with artifact_lock(artifact_dir) as acquired:
+        assert acquired
+        with artifact_lock(artifact_dir, wait=False) as other:
+            assert not other
+    assert not os.path.exists(os.path.join(artifact_dir, ARTIFACT_LOCK_FILE))
+    with artifact_lock(artifact_dir, wait=False) as acquired:
+        assert acquired
+
+def test_lock_heartbeat_keeps_long_build_from_going_stale(tmp_path):
+    artifact_dir = str(tmp_path / 'source')
+    lock_path = os.path.join(artifact_dir, ARTIFACT_LOCK_FILE)
+    with artifact_lock(artifact_dir, stale_seconds=0.5):
+        os.utime(lock_path, (0, 0))
+        time.sleep(0.3)
+        assert time.time() - os.path.getmtime(lock_path) < 0.5
+        with artifact_lock(artifact_dir, stale_seconds=0.5, wait=False) as other:
+            assert not other
+
+def test_abandoned_lock_is_taken_over(tmp_path):
+    artifact_dir = str(tmp_path / 'source')
+    os.makedirs(artifact_dir)
+    lock_path = os.path.join(artifact_dir, ARTIFACT_LOCK_FILE)
+    open(lock_path, 'w').close()
+    os.utime(lock_path, (0, 0))
+    with artifact_lock(artifact_dir, wait=False) as acquired:
+        assert acquired
+
+def test_prune_never_removes_current(tmp_path):
+    artifact_dir = str(tmp_path / 'source')
+    publish(artifact_dir, 'v2')
+    publish(artifact_dir, 'v1')  # 이름순으로는 오래됐지만 CURRENT
+    assert prune_artifacts(artifact_dir, keep=0) == ['v2']
+    assert current_artifact_version(artifact_dir) == os.path.join(artifact_dir, 'v1')
+
+def test_shared_build_prunes_other_sources_only_when_unlocked(tmp_path):
+    shared_dir = str(tmp_path)
+    source_dir = lambda count: os.path.join(shared_dir, source_fingerprint(count)[1])
+    first = shared_build(shared_dir, 300, keep=1, log=lambda _: None)
+
+    # 다른 원천으로 바뀌면 이전 원천은 CURRENT 만 떼고 버전은 남김 (이미 경로를 읽은 프로세스가 열 수 있음)
+    second = shared_build(shared_dir, 301, keep=1, log=lambda _: None)
+    assert current_artifact_version(source_dir(300)) is None
+    assert os.path.isdir(first)
+    assert current_artifact_version(source_dir(301)) == second
+
+    # 빌드 중(잠금)인 원천은 건드리지 않음
+    with artifact_lock(source_dir(301)):
+        shared_build(shared_dir, 302, keep=1, log=lambda _: None)
+    assert not os.path.exists(source_dir(300))
+    assert current_artifact_version(source_dir(301)) == second
+
+    # 잠금이 풀린 뒤 정리에서 사용 중지, 그다음 정리에서 버전 삭제
+    shared_build(shared_dir, 303, keep=1, log=lambda _: None)
+    assert current_artifact_version(source_dir(301)) is None
+    assert os.path.isdir(second)
+    shared_build(shared_dir, 304, keep=1, log=lambda _: None)
+    assert not os.path.exists(source_dir(301))
+    assert not os.path.exists(source_dir(302))
+    assert sorted(os.listdir(shared_dir)) == sorted([os.path.basename(source_dir(303)), os.path.basename(source_dir(304))])
@@ -0,0 +1,184 @@
+"""데이터 적재/분류 함수 (배열 버전과 스칼라 함수 일치)"""
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dna_pet.data import (
+    HOUSEHOLD_STATE_FILE, TRANSACTION_BATCH_DIR, build_frequency_uplift, build_product_lookup, classify_frequency, classify_frequency_array,
+    estimate_household_size, estimate_household_size_array, estimate_pet_profile, estimate_pet_profile_array,
+    fold_transaction_batch, load_household_state, load_product_extract, load_transaction_extracts,
+    refresh_household_state,
+)
+
+BOUNDARY_VALUES = [0, 0.5, 1, 2, 2.5, 3, 3.5, 4, 6, 6.5, 7, 30, 79.99, 80, 1999.99, 2000, 4000, 6000, np.nan]
+
+@pytest.mark.parametrize('value', BOUNDARY_VALUES)
+def test_classify_frequency_array_matches_scalar(value):
+    assert classify_frequency_array([value])[0] == classify_frequency(value)
+
+@pytest.mark.parametrize('value', BOUNDARY_VALUES)
+def test_estimate_household_size_array_matches_scalar(value):
+    assert estimate_household_size_array([value])[0] == estimate_household_size(value)
+
+# 랜덤 판정이 없는 조합 (강아지는 지출 기준, 고양이는 간식/장난감이 없으면 성묘)
+FIXED_PROFILE_CATEGORIES = [
+    'DOG-사료/간식', 'DOG-건강관리/영양제, CAT-사료/간식', 'CAT-모래/위생용품',
+    'OTHER-가금류', 'OTHER-물고기', 'OTHER-햄스터', 'OTHER-파충류', 'OTHER-기타', '',
+]
+
+@pytest.mark.parametrize('categories', FIXED_PROFILE_CATEGORIES)
+@pytest.mark.parametrize('pet_spend', [0, 29.99, 30, 79.99, 80, 200, np.nan])
+def test_estimate_pet_profile_array_matches_scalar(categories, pet_spend):
+    assert estimate_pet_profile_array([categories], [pet_spend])[0] == estimate_pet_profile(categories, pet_spend)
+
+@pytest.mark.parametrize('categories', ['CAT-사료/간식', 'CAT-장난감', 'CAT-모래/위생용품, CAT-사료/간식'])
+def test_estimate_pet_profile_array_cat_random_matches_scalar(categories):
+    # 스칼라 함수는 전역 RNG 의 np.random.choice(p=[0.3, 0.7]) — 같은 시드의 RandomState 를 넘기면 같은 난수열
+    count = 200
+    np.random.seed(7)
+    expected = [estimate_pet_profile(categories, 10) for _ in range(count)]
+    result = estimate_pet_profile_array([categories] * count, np.full(count, 10.0), rng=np.random.RandomState(7))
+    assert list(result) == expected
+    assert {"새끼고양이", "성묘"} == set(expected)
+
+def test_array_classifiers_keep_series_index():
+    values = pd.Series([0.5, 3, 7], index=[10, 20, 30])
+    assert list(classify_frequency_array(values).index) == [10, 20, 30]
+    assert list(estimate_household_size_array(values * 1000).index) == [10, 20, 30]
+
+# === 증분 집계 (배치별 누적 상태 = 전체 추출 파일 집계) ===
+def write_products(data_dir):
+    pd.DataFrame({
+        'PRODUCT_ID': [1, 2, 3, 4, 5, 6],
+        'DEPARTMENT': ['PET', 'PET', 'PET', 'GROCERY', 'GROCERY', 'PET'],
+        'COMMODITY_DESC': ['CAT FOOD', 'DOG FOODS', 'CAT LITTER', 'BEEF', 'SOFT DRINKS', 'BIRD SEED'],
+        'SUB_COMMODITY_DESC': ['DRY', 'CANNED', 'MISC', 'MISC', 'COLA', 'SEED'],
+    }).to_csv(os.path.join(data_dir, 'product.csv'), index=False)
+
+def sample_transactions(count=3000, seed=3):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'household_key': rng.integers(1, 120, count),
+        'BASKET_ID': rng.integers(1, 800, count),
+        'DAY': np.sort(rng.integers(1, 200, count)),
+        'PRODUCT_ID': rng.integers(1, 8, count),  # 7 은 상품 추출 파일에 없는 상품
+        'QUANTITY': rng.integers(1, 4, count),
+        'SALES_VALUE': rng.integers(50, 2000, count) / 100,
+        'COUPON_DISC': np.where(rng.random(count) < 0.05, -1.0, 0.0),
+    })
+
+def state_tables(state_path):
+    with closing(sqlite3.connect(state_path)) as conn:
+        return {table: pd.read_sql_query(f"SELECT * FROM {table} ORDER BY 1, 2", conn)
+                for table in ('household_state', 'pet_baskets', 'commodity_spend', 'product_totals')}
+
+def comparable(pet_customers):
+    # pet_profile 은 고양이 간식 구매 가구를 무작위로 나누므로 제외
+    return pet_customers.drop(columns='pet_profile').sort_values('household_key').reset_index(drop=True)
+
+def test_incremental_fold_matches_full_extract(tmp_path):
+    transactions = sample_transactions()
+    full_dir, batch_dir = tmp_path / 'full', tmp_path / 'batches'
+    os.makedirs(full_dir)
+    os.makedirs(batch_dir / TRANSACTION_BATCH_DIR)
+    for data_dir in (full_dir, batch_dir):
+        write_products(data_dir)
+    transactions.to_csv(full_dir / 'transaction_data.csv', index=False)
+    for i, positions in enumerate(np.array_split(np.arange(len(transactions)), 3)):
+        transactions.iloc[positions].to_csv(batch_dir / TRANSACTION_BATCH_DIR / f'day_{i:03d}.csv', index=False)
+
+    # 작은 청크로 읽어 청크 경계에 걸친 장바구니도 한 번만 세는지 확인
+    assert refresh_household_state(str(batch_dir), chunksize=400) == ['day_000.csv', 'day_001.csv', 'day_002.csv']
+    incremental = load_household_state(str(batch_dir))
+    full = load_transaction_extracts(str(full_dir), chunksize=700)
+
+    pd.testing.assert_frame_equal(comparable(incremental[0]), comparable(full[0]))
+    pd.testing.assert_frame_equal(incremental[1], full[1])
+    # 누적 상태는 수량을 REAL 로 저장하므로 값만 비교
+    pd.testing.assert_frame_equal(incremental[2].sort_values('product_id').reset_index(drop=True),
+                                  full[2].sort_values('product_id').reset_index(drop=True), check_dtype=False)
+
+def test_reapplying_batch_is_noop(tmp_path):
+    os.makedirs(tmp_path / TRANSACTION_BATCH_DIR)
+    write_products(tmp_path)
+    sample_transactions(1000).to_csv(tmp_path / TRANSACTION_BATCH_DIR / 'day_000.csv', index=False)
+    state_path = str(tmp_path / HOUSEHOLD_STATE_FILE)
+    assert refresh_household_state(str(tmp_path)) == ['day_000.csv']
+    before = state_tables(state_path)
+
+    assert refresh_household_state(str(tmp_path)) == []
+    product_lookup = build_product_lookup(load_product_extract(str(tmp_path)))
+    assert not fold_transaction_batch(state_path, str(tmp_path / TRANSACTION_BATCH_DIR / 'day_000.csv'), product_lookup)
+    after = state_tables(state_path)
+    for table in before:
+        pd.testing.assert_frame_equal(before[table], after[table])
+
+def test_extract_chunking_does_not_change_result(tmp_path):
+    # 청크 수가 PARTIAL_COMPACT_CHUNKS 를 넘어 중간 합치기가 일어나도 한 번에 읽은 결과와 같아야 함
+    write_products(tmp_path)
+    sample_transactions().to_csv(tmp_path / 'transaction_data.csv', index=False)
+    chunked = load_transaction_extracts(str(tmp_path), chunksize=50)
+    whole = load_transaction_extracts(str(tmp_path))
+    pd.testing.assert_frame_equal(comparable(chunked[0]), comparable(whole[0]))
+    pd.testing.assert_frame_equal(chunked[1], whole[1])
+    pd.testing.assert_frame_equal(chunked[2], whole[2])
+
+# === 주기상향 효과 (상향/유지 가구 분류와 이중차분, 손으로 계산한 값과 비교) ===
+def uplift_transactions():
+    rows = []
+
+    def basket(household, basket_id, day, *items):
+        rows.extend((household, basket_id, day, product, 1, sales) for product, sales in items)
+
+    # 상향 가구 1: 전반기 펫 장바구니 2개(월 1회, 월간구매) → 후반기 8개(월 4회, 고빈도)
+    basket(1, 1, 0, (1, 1.0), (2, 10.0))
+    basket(1, 2, 10, (1, 1.0), (3, 2.0))
+    basket(1, 3, 60, (1, 1.0), (2, 30.0))
+    basket(1, 4, 61, (1, 1.0), (3, 6.0))
+    for i in range(5, 11):
+        basket(1, i, 57 + i, (1, 1.0))
+    # 유지 가구 2: 전/후반기 모두 장바구니 2개 (월간구매)
+    basket(2, 11, 5, (1, 1.0), (2, 20.0))
+    basket(2, 12, 15, (1, 1.0))
+    basket(2, 13, 70, (1, 1.0), (2, 24.0))
+    basket(2, 14, 119, (1, 1.0))
+    # 가구 3: 전반기부터 상위 등급 (월 5회, 주간구매) → 어느 코호트에도 속하지 않음
+    for i in range(10):
+        basket(3, 20 + i, 20 + i, (1, 1.0), (2, 100.0))
+        basket(3, 30 + i, 80 + i, (1, 1.0), (2, 100.0))
+    return pd.DataFrame(rows, columns=['household_key', 'BASKET_ID', 'DAY', 'PRODUCT_ID', 'QUANTITY', 'SALES_VALUE'])
+
+def test_frequency_uplift_difference_in_differences(tmp_path):
+    pd.DataFrame({
+        'PRODUCT_ID': [1, 2, 3],
+        'DEPARTMENT': ['PET', 'GROCERY', 'GROCERY'],
+        'COMMODITY_DESC': ['CAT FOOD', 'BEEF', 'SOFT DRINKS'],
+        'SUB_COMMODITY_DESC': ['DRY', 'MISC', 'MISC'],  # 이름이 같은 소분류 (상위 분류가 다름)
+    }).to_csv(tmp_path / 'product.csv', index=False)
+    uplift_transactions().to_csv(tmp_path / 'transaction_data.csv', index=False)
+
+    # 거래일 0~119, 분할 60 → 기간별 2개월, 월평균 = 기간 합계 / 2
+    # 상향 가구: CAT FOOD 1 → 4, BEEF 5 → 15, SOFT DRINKS 1 → 3 / 유지 가구: CAT FOOD 1 → 1, BEEF 10 → 12
+    uplift = build_frequency_uplift(str(tmp_path), chunksize=7, split_day=60)
+    assert (uplift['movers'] == 1).all()
+    result = uplift.set_index(['level', 'category'])[
+        ['current_sales', 'target_sales', 'sales_change', 'control_change', 'percentage_change']
+    ]
+    expected = pd.DataFrame([
+        ('major', 'GROCERY', 6.0, 18.0, 10.0, 2.0, 166.67),
+        ('major', 'PET', 1.0, 4.0, 3.0, 0.0, 300.0),
+        ('middle', 'GROCERY > BEEF', 5.0, 15.0, 8.0, 2.0, 160.0),
+        ('middle', 'PET > CAT FOOD', 1.0, 4.0, 3.0, 0.0, 300.0),
+        ('middle', 'GROCERY > SOFT DRINKS', 1.0, 3.0, 2.0, 0.0, 200.0),
+        ('small', 'GROCERY > BEEF > MISC', 5.0, 15.0, 8.0, 2.0, 160.0),
+        ('small', 'PET > CAT FOOD > DRY', 1.0, 4.0, 3.0, 0.0, 300.0),
+        ('small', 'GROCERY > SOFT DRINKS > MISC', 1.0, 3.0, 2.0, 0.0, 200.0),
+    ], columns=['level', 'category', 'current_sales', 'target_sales', 'sales_change', 'control_change',
+                'percentage_change']).set_index(['level', 'category'])
+    pd.testing.assert_frame_equal(result.sort_index(), expected.sort_index(), check_dtype=False)
+    # 각 수준 안에서는 증분 순으로 정렬
+    assert list(uplift.loc[uplift['level'] == 'small', 'sales_change']) == [8.0, 3.0, 2.0]
@@ -0,0 +1,72 @@
+"""A/B 테스트 통계 (해시 배정, 두 비율 z-검정, 히스토그램 부트스트랩)"""
+import math
+
+import numpy as np
+import pytest
+
+from dna_pet.experiments import (
+    analyze_experiment, assign_experiment_arms, bootstrap_mean_difference, experiment_arm_statistics,
+    two_proportion_ztest,
+)
+
+HOUSEHOLDS = np.arange(1, 100_001)
+
+def test_assignment_is_deterministic():
+    first = assign_experiment_arms(HOUSEHOLDS, 'exp-1', 0.5)
+    np.testing.assert_array_equal(first, assign_experiment_arms(HOUSEHOLDS, 'exp-1', 0.5))
+    # 순서와 무관하게 가구별로 같은 배정
+    shuffled = np.random.default_rng(0).permutation(HOUSEHOLDS)
+    np.testing.assert_array_equal(assign_experiment_arms(shuffled, 'exp-1', 0.5), first[shuffled - 1])
+    # 실험 ID 가 다르면 독립적인 배정 (절반 정도만 일치)
+    other = assign_experiment_arms(HOUSEHOLDS, 'exp-2', 0.5)
+    assert abs((first == other).mean() - 0.5) < 0.01
+
+@pytest.mark.parametrize('share', [0.1, 0.5, 0.8])
+def test_assignment_is_balanced(share):
+    assert abs(assign_experiment_arms(HOUSEHOLDS, 'exp-1', share).mean() - share) < 0.01
+
+def test_assignment_grows_with_share():
+    # 비율을 늘리면 기존 실험군은 그대로 두고 가구만 추가됨
+    small = assign_experiment_arms(HOUSEHOLDS, 'exp-1', 0.2)
+    large = assign_experiment_arms(HOUSEHOLDS, 'exp-1', 0.5)
+    assert not (small & ~large).any()
+
+def test_two_proportion_ztest_textbook_example():
+    # 200/1000 vs 250/1000: 합동 비율 0.225, 표준오차 sqrt(0.225*0.775*(2/1000))
+    pooled = 450 / 2000
+    expected_z = 0.05 / math.sqrt(pooled * (1 - pooled) * (2 / 1000))
+    z, p_value = two_proportion_ztest(200, 1000, 250, 1000)
+    assert float(z) == pytest.approx(expected_z)
+    assert float(z) == pytest.approx(2.6774, abs=1e-4)
+    assert float(p_value) == pytest.approx(math.erfc(expected_z / math.sqrt(2)))
+    assert float(p_value) == pytest.approx(0.00742, abs=1e-5)
+
+def test_two_proportion_ztest_arrays_and_empty_arms():
+    z, p_value = two_proportion_ztest([200, 250, 0], [1000, 1000, 0], [250, 200, 0], [1000, 1000, 0])
+    np.testing.assert_allclose(z, [2.6774, -2.6774, 0.0], atol=1e-4)
+    np.testing.assert_allclose(p_value, [0.00742, 0.00742, 1.0], atol=1e-5)
+
+def test_bootstrap_interval_contains_true_difference():
+    rng = np.random.default_rng(42)
+    n = 20_000
+    # 대조군 평균 50, 실험군 평균 60 (지출 증가 없음 30%)
+    control = rng.exponential(50 / 0.7, n) * (rng.random(n) < 0.7)
+    treatment = rng.exponential(60 / 0.7, n) * (rng.random(n) < 0.7)
+    stats = experiment_arm_statistics(np.repeat([False, True], n), np.concatenate([control, treatment]),
+                                      np.ones(2 * n))
+    assert stats['households'].tolist() == [n, n]
+    assert stats['spend_sum'].tolist() == pytest.approx([control.sum(), treatment.sum()])
+
+    differences = bootstrap_mean_difference(stats.loc[0, 'bin_counts'], stats.loc[0, 'bin_sums'],
+                                            stats.loc[1, 'bin_counts'], stats.loc[1, 'bin_sums'], seed=3)
+    low, high = np.quantile(differences, [0.025, 0.975])
+    assert low < 10 < high
+    assert differences.mean() == pytest.approx(treatment.mean() - control.mean(), abs=0.2)
+    # 같은 seed 면 같은 재표본
+    np.testing.assert_array_equal(differences, bootstrap_mean_difference(
+        stats.loc[0, 'bin_counts'], stats.loc[0, 'bin_sums'],
+        stats.loc[1, 'bin_counts'], stats.loc[1, 'bin_sums'], seed=3))
+
+    result = analyze_experiment(stats)
+    assert result['spend_interval'][0] < 10 < result['spend_interval'][1]
+    assert result['spend_p_value'] < 0.05
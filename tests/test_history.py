@@ -0,0 +1,80 @@
+"""발송 기록 저장소 (job_id 단위 멱등 추가, 사전 집계 일치, 키셋 페이지)"""
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dna_pet.history import MessageHistoryStore
+
+def make_records(count, send_time, message_type="신제품 안내", start=0):
+    customer_ids = np.arange(start, start + count)
+    return pd.DataFrame({
+        'customer_id': customer_ids,
+        'customer_name': [f"고객{i}" for i in customer_ids],
+        'phone_number': "010-1234-****",
+        'message_type': message_type,
+        'message_content': "안녕하세요",
+        'send_time': send_time,
+        'status': np.where(customer_ids % 4 == 0, "발송 실패", "발송 성공"),
+    })
+
+@pytest.fixture
+def store(tmp_path):
+    return MessageHistoryStore(str(tmp_path / 'message_history.sqlite'))
+
+def table_counts(store):
+    with closing(sqlite3.connect(store.path)) as conn:
+        return dict(conn.execute("""
+            SELECT message_type, COUNT(*) || '/' || SUM(status = '발송 성공') FROM message_history GROUP BY message_type
+        """).fetchall())
+
+def test_append_is_idempotent_per_job(store):
+    first = make_records(40, "2024-01-01 10:00:00")
+    second = make_records(25, "2024-01-01 11:00:00", "재구매 안내", start=100)
+    assert store.append(first, job_id='job-1')
+    assert not store.append(first, job_id='job-1')
+    assert store.append(second, job_id='job-2')
+    assert not store.append(second, job_id='job-2')
+    assert not store.append(first.iloc[:0], job_id='job-3')
+
+    assert store.count() == 65
+    summary = store.summary()
+    # 사전 집계 테이블과 원본 행 집계가 같아야 함
+    assert {t: f"{row.sent}/{row.success}" for t, row in summary.iterrows()} == table_counts(store)
+    assert summary.loc["신제품 안내"].tolist() == [40, 30]
+    assert store.count(message_type="재구매 안내") == 25
+    assert store.count(customer_id=100) == 1
+
+@pytest.mark.parametrize('newest_first', [True, False])
+@pytest.mark.parametrize('message_type', [None, "신제품 안내"])
+def test_keyset_pages_match_full_order(store, newest_first, message_type):
+    # 한 작업의 행은 send_time 이 같으므로 id 가 페이지 경계를 가름
+    store.append(make_records(23, "2024-01-01 10:00:00"), job_id='a')
+    store.append(make_records(17, "2024-01-01 10:00:00", "재구매 안내", start=23), job_id='b')
+    store.append(make_records(12, "2024-01-02 09:00:00", start=40), job_id='c')
+    with closing(sqlite3.connect(store.path)) as conn:
+        where = " WHERE message_type = ?" if message_type else ""
+        direction = "DESC" if newest_first else "ASC"
+        expected = [row[0] for row in conn.execute(
+            f"SELECT id FROM message_history{where} ORDER BY send_time {direction}, id {direction}",
+            [message_type] if message_type else []
+        )]
+
+    page_size = 10
+    pages, after = [], None
+    while True:
+        records = store.page(page_size=page_size, message_type=message_type, newest_first=newest_first, after=after)
+        if records.empty:
+            break
+        pages.append(records)
+        after = store.page_key(records)
+    assert [i for records in pages for i in records.index] == expected
+
+    # 페이지 번호로 바로 읽어도 같은 페이지
+    for number, records in enumerate(pages, start=1):
+        pd.testing.assert_frame_equal(
+            store.page(number, page_size, message_type=message_type, newest_first=newest_first), records
+        )
+    assert store.page(len(pages) + 1, page_size, message_type=message_type, newest_first=newest_first).empty
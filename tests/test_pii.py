@@ -0,0 +1,53 @@
+"""전화번호 토큰화/마스킹 (원번호 복원, 마스킹 형식, 같은 원천에서 같은 토큰)"""
+import numpy as np
+import pandas as pd
+
+from dna_pet.data import load_customer_tables, source_fingerprint
+from dna_pet.pii import (
+    format_phone_numbers, mask_phone_numbers, mask_phone_strings, pack_phone_numbers, tokenize_phone_numbers,
+)
+
+def phone_customers():
+    packed = pack_phone_numbers([10, 10, 0, 11, 10], [1234, 5, 0, 9876, 100], [5678, 42, 0, 1, 9999])
+    packed[2] = 0  # 번호 없음
+    return pd.DataFrame({'household_key': [1, 2, 3, 4, 5], 'phone_number': packed, 'pet_spend': 1.0})
+
+def test_format_phone_numbers():
+    packed = pack_phone_numbers([10, 11], [1234, 5], [5678, 42])
+    assert list(format_phone_numbers(np.append(packed, 0))) == ['010-1234-5678', '011-0005-0042', '']
+
+def test_tokens_resolve_to_original_numbers():
+    customers = phone_customers()
+    tokenized, vault = tokenize_phone_numbers(customers, seed=1)
+    assert 'phone_number' not in tokenized.columns
+    assert list(tokenized.columns[:3]) == ['household_key', 'phone_token', 'phone_mask']
+    assert tokenized['phone_token'].iloc[2] == 0
+    assert sorted(tokenized['phone_token'].iloc[[0, 1, 3, 4]]) == [1, 2, 3, 4]
+    assert list(vault.resolve(tokenized['phone_token'])) == list(format_phone_numbers(customers['phone_number']))
+    # 범위를 벗어난 토큰은 빈 문자열
+    assert list(vault.resolve([0, len(vault) + 1])) == ['', '']
+
+def test_phone_mask_renders_masked_number():
+    tokenized, _ = tokenize_phone_numbers(phone_customers(), seed=1)
+    assert list(mask_phone_numbers(tokenized['phone_mask'])) == [
+        '010-1234-****', '010-0005-****', '', '011-9876-****', '010-0100-****'
+    ]
+    assert list(mask_phone_strings(['010-1234-5678', '010-1234-****', ''])) == ['010-1234-****', '010-1234-****', '']
+
+def test_tokens_are_stable_for_same_seed():
+    first, first_vault = tokenize_phone_numbers(phone_customers(), seed=7)
+    second, second_vault = tokenize_phone_numbers(phone_customers(), seed=7)
+    pd.testing.assert_frame_equal(first, second)
+    np.testing.assert_array_equal(first_vault.numbers, second_vault.numbers)
+
+def test_tokens_are_stable_for_unchanged_source():
+    # 같은 원천(샘플 고객 수)이면 다시 적재해도 같은 토큰이 같은 번호를 가리킴
+    first, _, _, first_vault = load_customer_tables(3000)
+    second, _, _, second_vault = load_customer_tables(3000)
+    np.testing.assert_array_equal(first['phone_token'].to_numpy(), second['phone_token'].to_numpy())
+    np.testing.assert_array_equal(first_vault.resolve(first['phone_token']), second_vault.resolve(second['phone_token']))
+
+    # 원천이 바뀌면 지문과 토큰 배정도 바뀜
+    assert source_fingerprint(3000)[1] != source_fingerprint(3001)[1]
+    other, _, _, _ = load_customer_tables(3001)
+    assert not np.array_equal(first['phone_token'].to_numpy(), other['phone_token'].to_numpy()[:3000])
@@ -0,0 +1,114 @@
+"""SmsDispatcher 를 MockSmsGateway 에 연결해 재시도/실패/속도 제한/중복 등록/작업 정리/결과 저장 확인"""
+import time
+
+import pandas as pd
+import pytest
+
+from dna_pet.history import MessageHistoryStore
+from dna_pet.sms import MockSmsGateway, SmsDispatcher
+
+def message_records(count, phone_number='010-1234-5678', content='안녕하세요'):
+    return pd.DataFrame({
+        'customer_id': range(1, count + 1),
+        'customer_name': [f'고객 {i}' for i in range(1, count + 1)],
+        'phone_number': phone_number,
+        'message_type': '테스트',
+        'message_content': content,
+        'send_time': '',
+        'status': '발송 대기',
+    })
+
+def wait_finished(dispatcher, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = dispatcher.job_status(job_id)
+        if status is not None and status['state'] in ('완료', '기록 실패'):
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"작업이 끝나지 않았습니다: {dispatcher.job_status(job_id)}")
+
+@pytest.fixture
+def gateway():
+    gateway = MockSmsGateway(failure_rate=0.0)
+    yield gateway
+    gateway.stop()
+
+def make_dispatcher(gateway, **kwargs):
+    options = {'concurrency': 4, 'rate_per_second': 1000, 'backoff_seconds': 0.001, 'timeout_seconds': 5}
+    return SmsDispatcher(gateway.url, **{**options, **kwargs})
+
+def test_all_messages_delivered(gateway):
+    dispatcher = make_dispatcher(gateway)
+    status = wait_finished(dispatcher, dispatcher.submit_job(message_records(50)))
+    assert (status['sent'], status['failed'], status['pending']) == (50, 0, 0)
+    assert len(gateway.delivered) == 50
+
+def test_retryable_errors_exhaust_attempts(gateway):
+    gateway.failure_rate = 1.0
+    dispatcher = make_dispatcher(gateway, max_attempts=3)
+    status = wait_finished(dispatcher, dispatcher.submit_job(message_records(10)))
+    assert (status['sent'], status['failed']) == (0, 10)
+    assert gateway.request_count == 10 * 3
+    assert not gateway.delivered
+
+def test_non_retryable_error_is_not_retried(gateway):
+    dispatcher = make_dispatcher(gateway, max_attempts=4)
+    # 연락처가 없으면 게이트웨이가 400 으로 거부
+    status = wait_finished(dispatcher, dispatcher.submit_job(message_records(5, phone_number='')))
+    assert (status['sent'], status['failed']) == (0, 5)
+    assert gateway.request_count == 5
+
+def test_duplicate_campaign_is_not_resent(gateway):
+    dispatcher = make_dispatcher(gateway)
+    records = message_records(20)
+    job_id = dispatcher.submit_job(records)
+    assert dispatcher.submit_job(records.copy()) == job_id
+    wait_finished(dispatcher, job_id)
+    assert dispatcher.submit_job(records) == job_id
+
+    # 작업이 정리된 뒤(또는 다른 프로세스)에 다시 등록해도 멱등성 키가 같아 게이트웨이가 중복 발송하지 않음
+    other = make_dispatcher(gateway)
+    wait_finished(other, other.submit_job(records))
+    assert len(gateway.delivered) == 20
+
+    changed = message_records(20, content='다른 내용')
+    assert dispatcher.submit_job(changed) != job_id
+
+def test_rate_limit_is_shared_across_jobs(gateway):
+    dispatcher = make_dispatcher(gateway, rate_per_second=50)
+    started = time.monotonic()
+    job_ids = [dispatcher.submit_job(message_records(50, content=f'캠페인 {i}')) for i in range(2)]
+    for job_id in job_ids:
+        wait_finished(dispatcher, job_id)
+    # 초기 버킷 50건 + 나머지 50건을 초당 50건으로 → 약 1초 (작업별 버킷이면 즉시 끝남)
+    assert time.monotonic() - started >= 0.9
+    assert dispatcher.connections.qsize() == dispatcher.concurrency
+
+def test_finished_jobs_are_pruned(gateway):
+    dispatcher = make_dispatcher(gateway, finished_job_limit=1)
+    first = dispatcher.submit_job(message_records(3, content='첫 번째'))
+    wait_finished(dispatcher, first)
+    second = dispatcher.submit_job(message_records(3, content='두 번째'))
+    wait_finished(dispatcher, second)
+    assert dispatcher.job_status(first) is None
+    assert dispatcher.job_status(second)['sent'] == 3
+    assert list(dispatcher.jobs) == [second]
+
+def test_on_complete_persists_results(gateway, tmp_path):
+    store = MessageHistoryStore(str(tmp_path / 'history.sqlite'))
+    dispatcher = make_dispatcher(gateway, on_complete=store.append)
+    job_id = dispatcher.submit_job(message_records(30))
+    assert wait_finished(dispatcher, job_id)['state'] == '완료'
+    assert store.count() == 30
+    assert int(store.summary().loc['테스트', 'success']) == 30
+    with pytest.raises(KeyError):
+        dispatcher.job_records(job_id)
+
+def test_on_complete_failure_keeps_results(gateway):
+    def fail(records, job_id=None):
+        raise OSError("disk full")
+
+    dispatcher = make_dispatcher(gateway, on_complete=fail)
+    job_id = dispatcher.submit_job(message_records(5))
+    assert wait_finished(dispatcher, job_id)['state'] == '기록 실패'
+    assert (dispatcher.job_records(job_id)['status'] == '발송 성공').all()